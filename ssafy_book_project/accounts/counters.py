@@ -0,0 +1,56 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def changed_pks(sender, instance, action, reverse, pk_set, source_field, target_field):
+    """
+    m2m_changed 시그널에서 실제로 추가/삭제된 상대편 pk 집합과 부호(+1/-1) 반환
+    - post_add의 pk_set은 이미 새로 추가된 것만 들어있음
+    - remove/clear는 pre 단계에서 실제 존재하는 행을 instance에 저장해뒀다가 post 단계에서 사용
+      (같은 through에 receiver가 여러 개일 수 있으므로 post 단계에서 지우지 않고 다음 pre 단계에서 덮어씀)
+    source_field: m2m을 정의한 모델 쪽 through 필드명, target_field: 상대편 through 필드명
+    """
+    own_field, other_field = (target_field, source_field) if reverse else (source_field, target_field)
+    if action in ('pre_remove', 'pre_clear'):
+        rows = sender.objects.filter(**{f'{own_field}_id': instance.pk})
+        if action == 'pre_remove':
+            rows = rows.filter(**{f'{other_field}_id__in': pk_set})
+        instance._m2m_removed_pks = set(rows.values_list(f'{other_field}_id', flat=True))
+        return 0, set()
+    if action == 'post_add':
+        return 1, set(pk_set or ())
+    if action in ('post_remove', 'post_clear'):
+        return -1, instance.__dict__.get('_m2m_removed_pks', set())
+    return 0, set()
+
+
+def count_subquery(model, field):
+    counts = (
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(count=Count('*'))
+        .values('count')
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+def reconcile_user_counters():
+    """
+    팔로워/팔로잉 카운터를 실제 관계 수로 다시 계산하고, 값이 달랐던 유저 수 반환
+    """
+    from .models import User
+
+    through = User.followers.through
+    actual = User.objects.annotate(
+        actual_followers=count_subquery(through, 'from_user'),
+        actual_following=count_subquery(through, 'to_user'),
+    )
+    drifted = actual.exclude(
+        follower_count=F('actual_followers'), following_count=F('actual_following')
+    ).count()
+    User.objects.update(
+        follower_count=count_subquery(through, 'from_user'),
+        following_count=count_subquery(through, 'to_user'),
+    )
+    return drifted
@@ -0,0 +1,63 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from .models import User
+from .signals import follow_toggled
+
+# a.followers.add(b) → (from_user=a, to_user=b): b가 a를 팔로우
+Follow = User.followers.through
+
+
+def toggle_follow(follower_id, target_id):
+    """
+    팔로우/언팔로우를 한 트랜잭션에서 처리하고 (following, target의 follower_count) 반환
+    - 먼저 DELETE 해보고 지워진 행이 없으면 INSERT (exists() 확인 후 add/remove 하는 경쟁 조건 없음)
+    - 동시에 두 번 눌러 INSERT가 겹치면 (from_user, to_user) unique 제약으로 한쪽은 실패 → 카운터는 한 번만 증가
+    """
+    with transaction.atomic():
+        removed, _ = Follow.objects.filter(from_user_id=target_id, to_user_id=follower_id).delete()
+        if removed:
+            following, delta = False, -1
+        else:
+            try:
+                with transaction.atomic():
+                    Follow.objects.create(from_user_id=target_id, to_user_id=follower_id)
+                following, delta = True, 1
+            except IntegrityError:
+                following, delta = True, 0
+        if delta:
+            User.objects.filter(pk=target_id).update(follower_count=F('follower_count') + delta)
+            User.objects.filter(pk=follower_id).update(following_count=F('following_count') + delta)
+            follow_toggled.send(sender=User, follower_id=follower_id, target_id=target_id, following=following)
+        follower_count = User.objects.values_list('follower_count', flat=True).get(pk=target_id)
+    return following, follower_count
+
+
+def follow_status(user_id, other_id):
+    """
+    user와 other 사이의 팔로우 관계 (쿼리 1번)
+    """
+    directions = set(
+        Follow.objects.filter(
+            Q(from_user_id=other_id, to_user_id=user_id) | Q(from_user_id=user_id, to_user_id=other_id)
+        ).values_list('from_user_id', flat=True)
+    )
+    following = other_id in directions
+    followed_by = user_id in directions
+    return {'following': following, 'followed_by': followed_by, 'mutual': following and followed_by}
+
+
+def suggested_follows(user_id, limit=20):
+    """
+    내가 팔로우하는 사람들이 팔로우하는 사람(friends-of-friends)을 겹치는 수 순으로 (GROUP BY 쿼리 1번)
+    [(user_id, 겹치는 수)] 반환, 나 자신과 이미 팔로우 중인 사람은 제외
+    """
+    following = Follow.objects.filter(to_user_id=user_id).values('from_user_id')
+    return list(
+        Follow.objects.filter(to_user_id__in=following)
+        .exclude(from_user_id=user_id)
+        .exclude(from_user_id__in=following)
+        .values('from_user_id')
+        .annotate(mutuals=Count('*'))
+        .order_by('-mutuals', 'from_user_id')
+        .values_list('from_user_id', 'mutuals')[:limit]
+    )
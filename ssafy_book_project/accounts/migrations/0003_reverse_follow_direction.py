@@ -0,0 +1,81 @@
+from collections import defaultdict
+from django.conf import settings
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(model, field):
+    counts = (
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(count=Count('*'))
+        .values('count')
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+def reverse_follow_rows(apps, schema_editor):
+    """
+    예전 follow 뷰는 request.user.followers.add(target)으로 (from_user=요청자, to_user=대상)을 저장했음
+    → "대상이 요청자를 팔로우"로 읽히므로 모든 행을 (from_user=대상, to_user=요청자)로 뒤집음
+    (예전 뷰 말고는 팔로우 행을 만드는 곳이 없었음, 되돌릴 때도 같은 연산)
+    뒤집은 관계로 팔로워/팔로잉 카운터와 홈 피드 타임라인도 다시 만듦
+    """
+    User = apps.get_model('accounts', 'User')
+    Follow = User.followers.through
+    pairs = set(Follow.objects.values_list('from_user_id', 'to_user_id'))
+    Follow.objects.all().delete()
+    Follow.objects.bulk_create(
+        [Follow(from_user_id=to_user_id, to_user_id=from_user_id) for from_user_id, to_user_id in pairs],
+        batch_size=1000,
+    )
+    User.objects.update(
+        follower_count=count_subquery(Follow, 'from_user'),
+        following_count=count_subquery(Follow, 'to_user'),
+    )
+    rebuild_timelines(apps, Follow)
+
+
+def rebuild_timelines(apps, Follow):
+    # books.feed.backfill_timeline과 같은 규칙 (작성자별 최근 FEED_BACKFILL개, 팔로워가 많은 작성자는 제외)
+    User = apps.get_model('accounts', 'User')
+    Thread = apps.get_model('books', 'Thread')
+    TimelineEntry = apps.get_model('books', 'TimelineEntry')
+    TimelineEntry.objects.all().delete()
+    followers = defaultdict(list)
+    for author_id, owner_id in Follow.objects.values_list('from_user_id', 'to_user_id').iterator(chunk_size=2000):
+        followers[author_id].append(owner_id)
+    high_follower = set(
+        User.objects.filter(follower_count__gt=settings.FEED_FANOUT_MAX_FOLLOWERS).values_list('pk', flat=True)
+    )
+    for author_id, owner_ids in followers.items():
+        if author_id in high_follower:
+            continue
+        recent = (
+            Thread.objects.filter(user_id=author_id)
+            .order_by('-created_at', '-id')
+            .values_list('id', 'created_at')[:settings.FEED_BACKFILL]
+        )
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(owner_id=owner_id, thread_id=thread_id, author_id=author_id, created_at=created_at)
+                for thread_id, created_at in recent
+                for owner_id in owner_ids
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_follower_count_user_following_count'),
+        ('books', '0009_timelineentry_thread_user_created_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(reverse_follow_rows, reverse_follow_rows),
+    ]
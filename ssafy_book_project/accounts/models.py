@@ -25,6 +25,9 @@ class CustomUserManager(BaseUserManager):
 class User(AbstractUser):
     # 팔로우 유저 정보를 저장하는 필드 (Many-to-Many 관계)
     followers = models.ManyToManyField('self', symmetrical=False, related_name='following', blank=True)
+    # 비정규화 카운터 (signals에서 F()로 갱신)
+    follower_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
 
     objects = CustomUserManager()  # 사용자 모델에 CustomUserManager 연결
 
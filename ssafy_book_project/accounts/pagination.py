@@ -0,0 +1,6 @@
+from books.pagination import BaseCursorPagination
+
+
+class UserCursorPagination(BaseCursorPagination):
+    # 팔로워/팔로잉 목록: 유저 id 역순 (id는 유일하고 변하지 않아 커서 기준으로 안정적)
+    ordering = '-id'
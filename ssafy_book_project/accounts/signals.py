@@ -0,0 +1,20 @@
+from django.db.models import F
+from django.db.models.signals import m2m_changed
+from django.dispatch import Signal, receiver
+from .counters import changed_pks
+from .models import User
+
+# toggle_follow는 through 행을 직접 추가/삭제하므로 m2m_changed 대신 이 시그널을 보냄
+# (follower_id, target_id, following)
+follow_toggled = Signal()
+
+
+@receiver(m2m_changed, sender=User.followers.through)
+def update_follow_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    # a.followers.add(b) → (from_user=a, to_user=b): a의 팔로워 +1, b의 팔로잉 +1
+    sign, pks = changed_pks(sender, instance, action, reverse, pk_set, 'from_user', 'to_user')
+    if not pks:
+        return
+    own_field, other_field = ('following_count', 'follower_count') if reverse else ('follower_count', 'following_count')
+    User.objects.filter(pk=instance.pk).update(**{own_field: F(own_field) + sign * len(pks)})
+    User.objects.filter(pk__in=pks).update(**{other_field: F(other_field) + sign})
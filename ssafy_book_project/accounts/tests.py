@@ -1,3 +1,124 @@
-from django.test import TestCase
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from .counters import reconcile_user_counters
+from .follows import Follow, follow_status, suggested_follows, toggle_follow
+from .models import User
 
-# Create your tests here.
+
+def make_users(*names):
+    return [User.objects.create_user(username=name, email=f"{name}@example.com", password='pw') for name in names]
+
+
+class FollowToggleTests(TestCase):
+    def setUp(self):
+        self.alice, self.bob = make_users('alice', 'bob')
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def counters(self, user):
+        user.refresh_from_db()
+        return user.follower_count, user.following_count
+
+    def test_follow_records_requester_as_follower_of_target(self):
+        response = self.client.post(reverse('follow', args=[self.bob.pk]))
+        self.assertEqual(response.json(), {'following': True, 'follower_count': 1})
+        # (from_user=대상, to_user=요청자): bob.followers에 alice
+        self.assertEqual(list(Follow.objects.values_list('from_user', 'to_user')), [(self.bob.pk, self.alice.pk)])
+        self.assertEqual(list(self.bob.followers.all()), [self.alice])
+        self.assertEqual(list(self.alice.following.all()), [self.bob])
+        self.assertEqual(self.counters(self.bob), (1, 0))
+        self.assertEqual(self.counters(self.alice), (0, 1))
+
+    def test_second_toggle_unfollows(self):
+        self.client.post(reverse('follow', args=[self.bob.pk]))
+        response = self.client.post(reverse('follow', args=[self.bob.pk]))
+        self.assertEqual(response.json(), {'following': False, 'follower_count': 0})
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(self.counters(self.bob), (0, 0))
+        self.assertEqual(self.counters(self.alice), (0, 0))
+
+    def test_cannot_follow_self(self):
+        response = self.client.post(reverse('follow', args=[self.alice.pk]))
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_follow_status(self):
+        toggle_follow(self.alice.pk, self.bob.pk)
+        self.assertEqual(follow_status(self.alice.pk, self.bob.pk), {'following': True, 'followed_by': False, 'mutual': False})
+        self.assertEqual(follow_status(self.bob.pk, self.alice.pk), {'following': False, 'followed_by': True, 'mutual': False})
+        toggle_follow(self.bob.pk, self.alice.pk)
+        response = self.client.get(reverse('follow_status', args=[self.bob.pk]))
+        self.assertEqual(response.json(), {'following': True, 'followed_by': True, 'mutual': True})
+
+
+class FollowCounterTests(TestCase):
+    def counters(self):
+        return {username: (followers, following) for username, followers, following in
+                User.objects.order_by('username').values_list('username', 'follower_count', 'following_count')}
+
+    def test_counters_follow_m2m_changes_from_both_sides(self):
+        alice, bob, carol = make_users('alice', 'bob', 'carol')
+        # alice.followers.add(bob): bob이 alice를 팔로우
+        alice.followers.add(bob, carol)
+        alice.followers.add(bob)
+        bob.following.add(carol)
+        self.assertEqual(self.counters(), {'alice': (2, 0), 'bob': (0, 2), 'carol': (1, 1)})
+        alice.followers.remove(carol)
+        self.assertEqual(self.counters(), {'alice': (1, 0), 'bob': (0, 2), 'carol': (1, 0)})
+        bob.following.clear()
+        self.assertEqual(self.counters(), {'alice': (0, 0), 'bob': (0, 0), 'carol': (0, 0)})
+
+    def test_reconcile_user_counters(self):
+        alice, bob = make_users('alice', 'bob')
+        toggle_follow(bob.pk, alice.pk)
+        User.objects.update(follower_count=7, following_count=7)
+        self.assertEqual(reconcile_user_counters(), 2)
+        self.assertEqual(self.counters(), {'alice': (1, 0), 'bob': (0, 1)})
+        self.assertEqual(reconcile_user_counters(), 0)
+
+
+class FollowSuggestionTests(TestCase):
+    def test_friends_of_friends_ranked_by_mutuals(self):
+        alice, bob, carol, dave, erin = make_users('alice', 'bob', 'carol', 'dave', 'erin')
+        for follower, target in (
+            (alice, bob), (alice, carol),
+            (bob, dave), (carol, dave), (bob, erin),
+            # 이미 팔로우 중인 사람과 나 자신은 제외
+            (bob, carol), (carol, alice),
+        ):
+            toggle_follow(follower.pk, target.pk)
+        self.assertEqual(suggested_follows(alice.pk), [(dave.pk, 2), (erin.pk, 1)])
+        client = APIClient()
+        client.force_authenticate(alice)
+        response = client.get(reverse('follow_suggestions'), {'limit': 1})
+        self.assertEqual(
+            [(row['username'], row['mutual_follows']) for row in response.json()], [('dave', 2)]
+        )
+
+
+class FollowDirectionMigrationTests(TransactionTestCase):
+    before = [('accounts', '0002_user_follower_count_user_following_count')]
+    after = [('accounts', '0003_reverse_follow_direction')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def test_old_rows_are_reversed_and_counters_rebuilt(self):
+        apps = self.migrate(self.before)
+        self.addCleanup(lambda: self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes()))
+        OldUser = apps.get_model('accounts', 'User')
+        alice, bob = (OldUser.objects.create(username=name, email=f"{name}@example.com") for name in ('alice', 'bob'))
+        # 예전 뷰: alice가 bob을 팔로우하면 alice.followers.add(bob)
+        alice.followers.add(bob)
+        apps = self.migrate(self.after)
+        NewUser = apps.get_model('accounts', 'User')
+        Through = NewUser.followers.through
+        self.assertEqual(list(Through.objects.values_list('from_user', 'to_user')), [(bob.pk, alice.pk)])
+        counters = dict(NewUser.objects.values_list('username', 'follower_count'))
+        self.assertEqual(counters, {'alice': 0, 'bob': 1})
+        self.assertEqual(NewUser.objects.get(pk=alice.pk).following_count, 1)
@@ -25,4 +25,14 @@ urlpatterns = [
 
     # 팔로우
     path('follow/<int:user_id>/', views.follow, name='follow'),  # <int:user_id>는 팔로우할 사용자의 ID를 URL에서 받아옴
+    path('follow/<int:user_id>/status/', views.follow_status_view, name='follow_status'),
+
+    # 팔로워/팔로잉 목록 (username 생략 시 내 목록)
+    path('followers/', views.followers, name='followers'),
+    path('followers/<str:username>/', views.followers, name='user_followers'),
+    path('following/', views.following, name='following'),
+    path('following/<str:username>/', views.following, name='user_following'),
+
+    # 알 수도 있는 사람
+    path('suggestions/', views.follow_suggestions, name='follow_suggestions'),
 ]
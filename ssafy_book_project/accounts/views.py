@@ -15,6 +15,8 @@ from .serializers import (
     UserLoginSerializer,
 )
 from books.models import Thread
+from .follows import toggle_follow, follow_status, suggested_follows
+from .pagination import UserCursorPagination
 
 # 로그인
 @extend_schema(request=UserLoginSerializer, responses=UserSerializer)
@@ -95,18 +97,29 @@ def profile(request, username=None):
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 # 팔로우/언팔로우
-@extend_schema(responses={204: None})
+@extend_schema(request=None, responses={200: None})
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def follow(request, user_id):
-    user_to_follow = get_object_or_404(User, id=user_id)
+    get_object_or_404(User.objects.only('id'), id=user_id)
     if request.user.id == user_id:
         return Response(status=status.HTTP_400_BAD_REQUEST)
-    if request.user.followers.filter(id=user_id).exists():
-        request.user.followers.remove(user_to_follow)
-    else:
-        request.user.followers.add(user_to_follow)
-    return Response(status=status.HTTP_204_NO_CONTENT)
+    following, follower_count = toggle_follow(request.user.pk, user_id)
+    return Response({"following": following, "follower_count": follower_count}, status=status.HTTP_200_OK)
+
+# 팔로우 관계 조회 (내가 팔로우 중인지, 나를 팔로우하는지, 맞팔인지)
+@extend_schema(responses={200: None})
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def follow_status_view(request, user_id):
+    get_object_or_404(User.objects.only('id'), id=user_id)
+    return Response(follow_status(request.user.pk, user_id), status=status.HTTP_200_OK)
+
+def paginated_users(request, queryset):
+    paginator = UserCursorPagination()
+    page = paginator.paginate_queryset(queryset.only('id', 'username', 'email'), request)
+    serializer = UserSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
 
 # 팔로워 목록
 @extend_schema(responses=UserSerializer(many=True))
@@ -116,10 +129,8 @@ def followers(request, username=None):
     if username is None:
         user = request.user
     else:
-        user = get_object_or_404(User, username=username)
-    followers_list = user.followers.all()
-    serializer = UserSerializer(followers_list, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+        user = get_object_or_404(User.objects.only('id'), username=username)
+    return paginated_users(request, user.followers.all())
 
 # 팔로잉 목록
 @extend_schema(responses=UserSerializer(many=True))
@@ -129,7 +140,24 @@ def following(request, username=None):
     if username is None:
         user = request.user
     else:
-        user = get_object_or_404(User, username=username)
-    following_list = user.following.all()
-    serializer = UserSerializer(following_list, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+        user = get_object_or_404(User.objects.only('id'), username=username)
+    return paginated_users(request, user.following.all())
+
+# 알 수도 있는 사람 (내가 팔로우하는 사람들이 많이 팔로우하는 순)
+@extend_schema(responses=UserSerializer(many=True))
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def follow_suggestions(request):
+    try:
+        limit = min(int(request.query_params.get('limit', 20)), 100)
+    except ValueError:
+        return Response({"detail": "limit는 정수여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+    suggestions = suggested_follows(request.user.pk, limit)
+    users = User.objects.only('id', 'username', 'email').in_bulk([pk for pk, _ in suggestions])
+    results = []
+    for pk, mutuals in suggestions:
+        if pk in users:
+            data = UserSerializer(users[pk]).data
+            data['mutual_follows'] = mutuals
+            results.append(data)
+    return Response(results, status=status.HTTP_200_OK)
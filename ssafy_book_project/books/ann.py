@@ -0,0 +1,300 @@
+import itertools
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+from django.conf import settings
+from .similarity import normalize_rows
+
+
+class IVFIndex:
+    """
+    NumPy로 구현한 IVF(inverted file) 근사 최근접 이웃 인덱스
+    - 벡터를 k-means 중심(nlist개)에 배정해두고, 검색할 때는 query와 가까운
+      중심 nprobe개에 속한 벡터만 점수를 계산
+    - nprobe를 키우면 recall↑ latency↑, nprobe >= nlist 이면 전수 검색과 동일
+    - 중심별 위치 목록(posting list)을 따로 두어서 검색 시 probe한 목록만 읽음
+    """
+
+    def __init__(self, nprobe=8):
+        self.nprobe = nprobe
+        self.centroids = None
+        self.keys = []
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+        self.assignments = np.empty(0, dtype=np.int32)
+        self._positions = {}
+        self._lists = []  # 중심 번호 → 그 중심에 배정된 위치 set
+        self._size = 0
+        self.synced_at = None  # 이 시각(epoch 초) 이후 바뀐 임베딩은 아직 반영 안 됨
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, key):
+        return key in self._positions
+
+    @property
+    def nlist(self):
+        return 0 if self.centroids is None else len(self.centroids)
+
+    def build(self, keys, vectors, nlist=None, iterations=10, seed=0):
+        keys = list(keys)
+        vectors = normalize_rows(np.vstack(vectors)) if keys else np.empty((0, 0), dtype=np.float32)
+        if nlist is None:
+            nlist = int(np.sqrt(len(keys)))
+        self.centroids = self._train(vectors, nlist, iterations, seed) if nlist > 1 else None
+        self.keys = keys
+        self.vectors = vectors
+        self._size = len(keys)
+        self._positions = {key: i for i, key in enumerate(keys)}
+        self.assignments = self._assign(vectors)
+        self._build_lists()
+        return self
+
+    def _build_lists(self):
+        # 배정 번호로 정렬한 위치를 중심별 구간으로 잘라서 posting list 생성 (O(N log N), build/load 때만)
+        if self.centroids is None:
+            self._lists = []
+            return
+        order = np.argsort(self.assignments[:self._size], kind='stable')
+        offsets = np.cumsum(np.bincount(self.assignments[:self._size], minlength=self.nlist))[:-1]
+        self._lists = [set(chunk.tolist()) for chunk in np.split(order, offsets)]
+
+    def _train(self, vectors, nlist, iterations, seed):
+        # spherical k-means (학습 샘플은 중심당 최대 256개)
+        rng = np.random.default_rng(seed)
+        sample_size = min(len(vectors), nlist * 256)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[labels == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids = normalize_rows(centroids)
+        return centroids
+
+    def _assign(self, vectors):
+        if self.centroids is None or not len(vectors):
+            return np.zeros(len(vectors), dtype=np.int32)
+        labels = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), 8192):
+            chunk = vectors[start:start + 8192]
+            labels[start:start + 8192] = np.argmax(chunk @ self.centroids.T, axis=1)
+        return labels
+
+    def add(self, key, vector):
+        vector = normalize_rows(vector)
+        if key in self._positions:
+            self.remove(key)
+        if self._size == 0 and not self.vectors.size:
+            self.vectors = np.empty((0, vector.shape[0]), dtype=np.float32)
+        if self._size == len(self.vectors):
+            # 용량을 두 배씩 늘려서 add를 amortized O(d)로 유지
+            capacity = max(16, len(self.vectors) * 2)
+            grown = np.empty((capacity, vector.shape[0]), dtype=np.float32)
+            grown[:self._size] = self.vectors[:self._size]
+            self.vectors = grown
+            assignments = np.empty(capacity, dtype=np.int32)
+            assignments[:self._size] = self.assignments[:self._size]
+            self.assignments = assignments
+        position = self._size
+        self.vectors[position] = vector
+        self.assignments[position] = self._assign(vector[None, :])[0]
+        if self._lists:
+            self._lists[self.assignments[position]].add(position)
+        self.keys.append(key)
+        self._positions[key] = position
+        self._size += 1
+
+    def remove(self, key):
+        position = self._positions.pop(key, None)
+        if position is None:
+            return False
+        # 마지막 행을 빈 자리로 옮겨서 O(d)에 삭제
+        last = self._size - 1
+        if self._lists:
+            self._lists[self.assignments[position]].discard(position)
+        if position != last:
+            if self._lists:
+                self._lists[self.assignments[last]].discard(last)
+                self._lists[self.assignments[last]].add(position)
+            moved = self.keys[last]
+            self.vectors[position] = self.vectors[last]
+            self.assignments[position] = self.assignments[last]
+            self.keys[position] = moved
+            self._positions[moved] = position
+        self.keys.pop()
+        self._size -= 1
+        return True
+
+    def vector(self, key):
+        return self.vectors[self._positions[key]]
+
+    def search(self, query, k, nprobe=None, exclude=()):
+        """
+        query와 가까운 순서대로 [(key, score), ...] 반환
+        """
+        if not self._size or k <= 0:
+            return []
+        query = normalize_rows(query)
+        vectors = self.vectors[:self._size]
+        # nprobe는 [1, nlist] 범위로 (0 이하면 argpartition의 kth가 음수가 됨)
+        nprobe = max(1, nprobe or self.nprobe)
+        if self.centroids is not None and nprobe < self.nlist:
+            probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+            members = itertools.chain.from_iterable(self._lists[c] for c in probes)
+            candidates = np.fromiter(members, dtype=np.int64)
+        else:
+            candidates = np.arange(self._size)
+        excluded = {self._positions[key] for key in exclude if key in self._positions}
+        if excluded:
+            candidates = candidates[~np.isin(candidates, list(excluded))]
+        if not len(candidates):
+            return []
+        scores = vectors[candidates] @ query
+        k = min(k, len(candidates))
+        if k < len(candidates):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.argsort(-scores[top])]
+        return [(self.keys[candidates[i]], float(scores[i])) for i in top]
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp.npz')
+        np.savez(
+            tmp_path,
+            keys=np.asarray(self.keys, dtype=np.int64),
+            vectors=self.vectors[:self._size],
+            assignments=self.assignments[:self._size],
+            centroids=self.centroids if self.centroids is not None else np.empty((0, 0), dtype=np.float32),
+            nprobe=np.asarray(self.nprobe),
+            synced_at=np.asarray(self.synced_at if self.synced_at is not None else np.nan),
+        )
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            index = cls(nprobe=int(data['nprobe']))
+            centroids = data['centroids']
+            index.centroids = centroids if centroids.size else None
+            index.keys = data['keys'].tolist()
+            index.vectors = data['vectors'].copy()
+            index.assignments = data['assignments'].copy()
+            synced_at = float(data['synced_at']) if 'synced_at' in data else np.nan
+        index.synced_at = None if np.isnan(synced_at) else synced_at
+        index._size = len(index.keys)
+        index._positions = {key: i for i, key in enumerate(index.keys)}
+        index._build_lists()
+        return index
+
+
+_book_index = None
+_book_index_mtime = None  # 불러온 인덱스 파일의 mtime (다른 프로세스가 새로 저장하면 다시 불러옴)
+_book_index_lock = threading.RLock()
+
+
+def build_book_index(nlist=None, nprobe=None):
+    from .models import BookEmbedding
+
+    started = time.time()
+    keys, vectors = [], []
+    rows = BookEmbedding.objects.values_list('book_id', 'vector')
+    for book_id, vector in rows.iterator(chunk_size=2000):
+        keys.append(book_id)
+        vectors.append(np.frombuffer(vector, dtype=np.float32))
+    index = IVFIndex(nprobe=nprobe or settings.ANN_NPROBE)
+    index.build(keys, vectors, nlist=nlist)
+    index.synced_at = started
+    return index
+
+
+def sync_book_index(index):
+    """
+    파일에서 불러온 인덱스에 저장 이후 바뀐 임베딩을 반영 (수정/추가는 updated_at, 삭제는 책 id 비교)
+    """
+    from .models import BookEmbedding
+
+    started = time.time()
+    changed = BookEmbedding.objects.values_list('book_id', 'vector')
+    if index.synced_at is not None:
+        changed = changed.filter(updated_at__gte=datetime.fromtimestamp(index.synced_at, tz=timezone.utc))
+    for book_id, vector in changed.iterator(chunk_size=2000):
+        index.add(book_id, np.frombuffer(vector, dtype=np.float32))
+    existing = set(BookEmbedding.objects.values_list('book_id', flat=True).iterator(chunk_size=10000))
+    for key in [key for key in index.keys if key not in existing]:
+        index.remove(key)
+    index.synced_at = started
+    return index
+
+
+def _index_file_mtime():
+    try:
+        return Path(settings.ANN_INDEX_PATH).stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def get_book_index():
+    """
+    프로세스 단위 책 임베딩 인덱스
+    - 디스크에 저장된 인덱스가 있으면 불러와서 DB와 맞추고, 파일이 새로 저장되면(mtime 변경) 다시 불러옴
+    - 파일이 없으면 빈 인덱스로 시작 (전체 카탈로그 빌드는 요청/시그널 안에서 하지 않음)
+      → 배포 시 build_ann_index 커맨드로 파일을 만들어 두면 다음 호출부터 불러옴
+    """
+    global _book_index, _book_index_mtime
+    with _book_index_lock:
+        mtime = _index_file_mtime()
+        if mtime is not None and mtime != _book_index_mtime:
+            _book_index = sync_book_index(IVFIndex.load(settings.ANN_INDEX_PATH))
+            _book_index_mtime = mtime
+        elif _book_index is None:
+            print(f"ANN 인덱스 파일이 없습니다: {settings.ANN_INDEX_PATH} (manage.py build_ann_index 로 생성)")
+            _book_index = IVFIndex(nprobe=settings.ANN_NPROBE)
+        return _book_index
+
+
+def set_book_index(index):
+    global _book_index, _book_index_mtime
+    with _book_index_lock:
+        _book_index = index
+        # 넘겨받은 인덱스가 지금 있는 파일로 바로 교체되지 않게
+        _book_index_mtime = _index_file_mtime() if index is not None else None
+
+
+def save_book_index():
+    global _book_index_mtime
+    with _book_index_lock:
+        if _book_index is not None:
+            _book_index.save(settings.ANN_INDEX_PATH)
+            _book_index_mtime = _index_file_mtime()
+
+
+def index_book(book_id, vector):
+    with _book_index_lock:
+        get_book_index().add(book_id, vector)
+        if settings.ANN_INDEX_AUTOSAVE:
+            save_book_index()
+
+
+def unindex_book(book_id):
+    with _book_index_lock:
+        if get_book_index().remove(book_id) and settings.ANN_INDEX_AUTOSAVE:
+            save_book_index()
+
+
+def search_similar_books(book_id, vector, k, nprobe=None):
+    with _book_index_lock:
+        return get_book_index().search(vector, k, nprobe=nprobe, exclude=(book_id,))
+
+
+def search_vector(vector, k, nprobe=None):
+    # 책이 아닌 임의의 벡터(검색어 임베딩 등)와 가까운 책
+    with _book_index_lock:
+        return get_book_index().search(vector, k, nprobe=nprobe)
@@ -0,0 +1,82 @@
+import hashlib
+import threading
+import unicodedata
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from .models import AuthorProfile
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def normalize_author(author):
+    # 유니코드 정규화(NFC) + 공백 정리 + 소문자 ("헤르만  헤세" == "헤르만 헤세")
+    author = unicodedata.normalize('NFC', author or '')
+    return ' '.join(author.split()).lower()
+
+
+def author_key(author):
+    return hashlib.sha256(normalize_author(author).encode('utf-8')).hexdigest()
+
+
+def get_author_profile(author):
+    """
+    TTL 안의 캐시가 있으면 AuthorProfile, 없으면 None
+    """
+    profile = AuthorProfile.objects.filter(key=author_key(author)).first()
+    now = timezone.now()
+    if profile is None or profile.fetched_at < now - timedelta(seconds=settings.AUTHOR_CACHE_TTL):
+        _count('misses')
+        return None
+    _count('hits')
+    AuthorProfile.objects.filter(pk=profile.pk).update(last_used_at=now)
+    return profile
+
+
+def store_author_profile(author, **fields):
+    now = timezone.now()
+    profile, _ = AuthorProfile.objects.update_or_create(
+        key=author_key(author),
+        defaults={'author': author, 'fetched_at': now, 'last_used_at': now, **fields},
+    )
+    evict_author_profiles()
+    return profile
+
+
+def evict_author_profiles(max_entries=None):
+    """
+    max_entries를 넘는 만큼 가장 오래 사용되지 않은 작가부터 삭제
+    """
+    max_entries = settings.AUTHOR_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+    overflow = AuthorProfile.objects.count() - max_entries
+    if overflow <= 0:
+        return 0
+    stale = AuthorProfile.objects.order_by('last_used_at').values_list('pk', flat=True)[:overflow]
+    deleted, _ = AuthorProfile.objects.filter(pk__in=list(stale)).delete()
+    _count('evictions', deleted)
+    return deleted
+
+
+def cache_stats():
+    """
+    프로세스 단위 hit/miss 카운터 + 저장된 작가 수
+    """
+    with _stats_lock:
+        hits, misses, evictions = _stats['hits'], _stats['misses'], _stats['evictions']
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'evictions': evictions,
+        'hit_rate': hits / lookups if lookups else 0.0,
+        'entries': AuthorProfile.objects.count(),
+        'max_entries': settings.AUTHOR_CACHE_MAX_ENTRIES,
+        'ttl': settings.AUTHOR_CACHE_TTL,
+    }
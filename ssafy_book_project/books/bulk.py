@@ -0,0 +1,251 @@
+import csv
+import io
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
+from .models import Book, Category, EnrichmentJob, EnrichmentStatus
+from .cache import bump_version
+from .search import book_document, get_search_backend
+from .serializers import BookSerializer
+
+# 가져오기/내보내기 대상 컬럼 (카테고리는 category에 이름으로 주고받고, pk는 category_id 컬럼으로만 받음)
+BOOK_FIELDS = (
+    'title', 'description', 'customer_review_rank', 'author', 'author_profile_img',
+    'author_info', 'author_works', 'cover_image', 'isbn', 'isbn_raw',
+)
+# 업로드 파일이 아니라 경로/URL 문자열로 들어오는 필드 (BookSerializer 검증에서 제외)
+FILE_FIELDS = ('author_profile_img', 'cover_image')
+# 검증 없이 문자열 그대로 저장하는 필드
+RAW_FIELDS = FILE_FIELDS + ('isbn_raw',)
+VALIDATED_FIELDS = [name for name in BOOK_FIELDS if name not in RAW_FIELDS]
+UPDATE_FIELDS = [name for name in BOOK_FIELDS if name != 'isbn'] + ['category', 'recommendations_dirty']
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    created: int = 0
+    updated: int = 0
+    invalid: int = 0
+    enqueued: int = 0
+    errors: list = field(default_factory=list)  # [(줄 번호, 에러)]
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+
+def open_source(path):
+    if str(path) == '-':
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
+    return open(path, encoding='utf-8-sig', newline='')
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    return 'csv' if Path(str(path)).suffix.lower() == '.csv' else 'jsonl'
+
+
+def iter_rows(file, fmt):
+    """
+    (줄 번호, dict 또는 파싱 에러) 를 한 줄씩 (파일 전체를 메모리에 올리지 않음)
+    JSON Lines는 dumpdata 형식({"model", "pk", "fields"}) 한 줄도 허용
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_no, line in enumerate(file, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, e
+            continue
+        if isinstance(row, dict) and isinstance(row.get('fields'), dict):
+            row = dict(row['fields'])
+            # dumpdata의 category는 이름이 아니라 pk
+            if 'category' in row:
+                row['category_id'] = row.pop('category')
+        yield line_no, row
+
+
+class BookImporter:
+    """
+    BookSerializer 검증 규칙으로 행을 검사하고(isbn은 ISBN-13으로 정규화), batch_size마다 isbn 기준 upsert
+    - isbn unique 인덱스에 INSERT ... ON CONFLICT DO UPDATE 한 문장 (배치 안 중복 isbn은 마지막 행 사용)
+    - isbn이 비어 있고 isbn_raw 컬럼이 있는 행(정규화하지 못한 ISBN을 내보낸 행)은 (제목, 작가, isbn_raw)로 갱신
+    - bulk 작업은 시그널을 보내지 않으므로 검색 색인/추천 dirty/응답 캐시는 배치마다 직접 갱신
+    - enrich=True면 새로 만든 책의 보강 job을 대기 상태로 등록 (run_enrichment_jobs가 처리)
+    """
+
+    def __init__(self, batch_size=1000, enrich=False, allow_blank=()):
+        self.batch_size = batch_size
+        self.enrich = enrich
+        self.stats = ImportStats()
+        # 한 인스턴스로 모든 행을 검증 (행마다 serializer를 새로 만들지 않음)
+        self.validator = BookSerializer(fields=VALIDATED_FIELDS)
+        # 이미 있는 isbn은 에러가 아니라 갱신 대상
+        isbn_field = self.validator.fields['isbn']
+        isbn_field.validators = [v for v in isbn_field.validators if not isinstance(v, UniqueValidator)]
+        isbn_field.allow_null = True  # isbn_raw 컬럼이 있는 행만 (validate에서 확인)
+        # 보강 작업이 채우는 필드(author_info 등)는 빈 값 허용 가능
+        for name in allow_blank:
+            self.validator.fields[name].allow_blank = True
+        self.categories = {}  # 이름 -> pk
+        self.category_pks = {}  # category_id 컬럼 값 -> 확인된 pk
+
+    def run(self, rows, progress=None):
+        batch = {}
+        for line_no, row in rows:
+            self.stats.read += 1
+            values = self.validate(line_no, row)
+            if values is None:
+                continue
+            batch[values['isbn'] or (None, values['title'], values['author'], values['isbn_raw'])] = values
+            if len(batch) >= self.batch_size:
+                self.write_batch(list(batch.values()))
+                batch = {}
+                if progress:
+                    progress(self.stats)
+        if batch:
+            self.write_batch(list(batch.values()))
+        if self.stats.created or self.stats.updated:
+            bump_version('books')
+        return self.stats
+
+    def fail(self, line_no, error):
+        self.stats.invalid += 1
+        self.stats.errors.append((line_no, error))
+
+    def validate(self, line_no, row):
+        if not isinstance(row, dict):
+            self.fail(line_no, str(row) if isinstance(row, Exception) else "객체가 아닌 행")
+            return None
+        data = {name: row.get(name) for name in VALIDATED_FIELDS if name in row}
+        if not data.get('isbn'):
+            if 'isbn_raw' in row:
+                # 내보낸 카탈로그의 ISBN 없는 책 (원래 값은 isbn_raw에 있음)
+                data['isbn'] = None
+            else:
+                # 그 밖의 행은 isbn 필수
+                data.pop('isbn', None)
+        try:
+            values = self.validator.run_validation(data)
+        except serializers.ValidationError as e:
+            self.fail(line_no, e.detail)
+            return None
+        for name in RAW_FIELDS:
+            values[name] = row.get(name) or ''
+        if row.get('category_id') not in (None, ''):
+            try:
+                values['category_id'] = self.category_pk(row['category_id'])
+            except (Category.DoesNotExist, TypeError, ValueError):
+                self.fail(line_no, {'category_id': f"없는 카테고리: {row['category_id']}"})
+                return None
+        else:
+            values['category_id'] = self.category_id(row.get('category'))
+        return values
+
+    def category_id(self, name):
+        # category 컬럼은 항상 이름 ("2024" 같은 숫자 이름도 이름으로 취급, 없으면 새로 만듦)
+        if name in (None, ''):
+            return None
+        name = str(name).strip()
+        if name not in self.categories:
+            self.categories[name] = Category.objects.get_or_create(name=name)[0].pk
+        return self.categories[name]
+
+    def category_pk(self, value):
+        # pk는 명시적인 category_id 컬럼으로만 받음
+        pk = int(value)
+        if pk not in self.category_pks:
+            self.category_pks[pk] = Category.objects.values_list('pk', flat=True).get(pk=pk)
+        return self.category_pks[pk]
+
+    def new_book(self, values, created):
+        book = Book(recommendations_dirty=True, **values)
+        if self.enrich and created:
+            book.enrichment_status = EnrichmentStatus.PENDING
+        return book
+
+    def write_batch(self, batch):
+        with transaction.atomic():
+            keyed = [values for values in batch if values['isbn']]
+            isbns = [values['isbn'] for values in keyed]
+            existing = set(Book.objects.filter(isbn__in=isbns).values_list('isbn', flat=True))
+            books = [self.new_book(values, values['isbn'] not in existing) for values in keyed]
+            # 조회와 저장 사이에 다른 요청이 같은 isbn을 만들어도 충돌 없이 갱신으로 처리됨
+            Book.objects.bulk_create(
+                books,
+                batch_size=self.batch_size,
+                update_conflicts=True,
+                unique_fields=['isbn'],
+                update_fields=UPDATE_FIELDS,
+            )
+            # ON CONFLICT 사용 시 bulk_create가 pk를 채우지 않으므로 isbn으로 다시 조회
+            pks = dict(Book.objects.filter(isbn__in=isbns).values_list('isbn', 'pk'))
+            for book in books:
+                book.pk = pks[book.isbn]
+            created = [book for book in books if book.isbn not in existing]
+            unkeyed, unkeyed_created = self.write_without_isbn([values for values in batch if not values['isbn']])
+            books += unkeyed
+            created += unkeyed_created
+            get_search_backend().index_many((book.pk, book_document(book)) for book in books)
+            if self.enrich and created:
+                EnrichmentJob.objects.bulk_create([EnrichmentJob(book=book) for book in created])
+                self.stats.enqueued += len(created)
+        self.stats.created += len(created)
+        self.stats.updated += len(books) - len(created)
+
+    def write_without_isbn(self, rows):
+        # unique 키가 없어서 ON CONFLICT를 쓸 수 없으므로 (제목, 작가, isbn_raw)가 같은 ISBN 없는 책을 찾아 갱신
+        if not rows:
+            return [], []
+        matches = {
+            key[1:]: key[0]
+            for key in Book.objects.filter(
+                isbn__isnull=True, isbn_raw__in={values['isbn_raw'] for values in rows},
+            ).values_list('pk', 'title', 'author', 'isbn_raw')
+        }
+        books, created = [], []
+        for values in rows:
+            pk = matches.get((values['title'], values['author'], values['isbn_raw']))
+            book = self.new_book(values, pk is None)
+            book.pk = pk
+            books.append(book)
+            if pk is None:
+                created.append(book)
+        Book.objects.bulk_update([book for book in books if book.pk], UPDATE_FIELDS, batch_size=self.batch_size)
+        Book.objects.bulk_create(created, batch_size=self.batch_size)
+        return books, created
+
+
+def export_row(values):
+    row = dict(zip(BOOK_FIELDS, values))
+    row['category'] = values[-1]
+    return row
+
+
+def iter_export_lines(queryset=None, chunk_size=2000):
+    """
+    카탈로그를 JSON Lines로 한 줄씩 (import_books로 다시 불러올 수 있는 형식)
+    """
+    queryset = Book.objects.all() if queryset is None else queryset
+    rows = queryset.order_by('pk').values_list(*BOOK_FIELDS, 'category__name')
+    for values in rows.iterator(chunk_size=chunk_size):
+        yield json.dumps(export_row(values), ensure_ascii=False) + '\n'
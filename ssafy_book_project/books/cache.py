@@ -0,0 +1,102 @@
+import hashlib
+import time
+from functools import wraps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from mypjt.routers import replica_alias, reading_from_replica
+
+KEY_PREFIX = 'response'
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _version_key(resource):
+    return f"{KEY_PREFIX}:version:{resource}"
+
+
+def resource_versions(resources):
+    """
+    리소스별 현재 버전 문자열 (모델이 바뀔 때마다 bump_version으로 올라감)
+    """
+    cache = get_cache()
+    keys = [_version_key(resource) for resource in resources]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # 버전 키가 없거나 캐시에서 밀려났으면 새 값으로 시작 (이전 응답 키와 겹치지 않게)
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return '.'.join(str(versions[key]) for key in keys)
+
+
+def _changed_key(resource):
+    return f"{KEY_PREFIX}:changed:{resource}"
+
+
+def bump_version(resource):
+    cache = get_cache()
+    try:
+        cache.incr(_version_key(resource))
+    except ValueError:
+        cache.set(_version_key(resource), time.time_ns(), timeout=None)
+    if replica_alias() and settings.DATABASE_REPLICA_PIN_SECONDS:
+        # 커밋 후 replica가 따라잡을 때까지(DATABASE_REPLICA_PIN_SECONDS) 바뀐 리소스로 표시
+        def mark_changed():
+            cache.set(_changed_key(resource), True, timeout=settings.DATABASE_REPLICA_PIN_SECONDS)
+        mark_changed()
+        transaction.on_commit(mark_changed)
+
+
+def replica_may_be_stale(resources):
+    """
+    replica에서 읽은 응답이 방금 바뀐 리소스를 아직 반영하지 못했을 수 있는지
+    (이런 응답을 새 버전 키로 캐시하면 RESPONSE_CACHE_TIMEOUT 동안 오래된 내용이 나감)
+    """
+    return reading_from_replica() and bool(get_cache().get_many([_changed_key(resource) for resource in resources]))
+
+
+def cache_response(*resources, timeout=None):
+    """
+    GET 응답 데이터를 (뷰, 리소스 버전, URL) 단위로 캐시하고 ETag/If-None-Match(304) 처리
+    resources 중 하나라도 바뀌면 버전이 달라져서 자동으로 새로 계산
+    캐시 적중 시에도 Response(data)를 돌려줘서 DRF 콘텐츠 협상(?format=, 탐색형 API)을 그대로 거침
+    @api_view 아래(뷰 함수 바로 위)에 붙여서 사용
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            cache = get_cache()
+            url_hash = hashlib.md5(request.build_absolute_uri().encode('utf-8')).hexdigest()
+            key = f"{KEY_PREFIX}:{view_func.__name__}:{resource_versions(resources)}:{url_hash}"
+            entry = cache.get(key)
+            if entry is None:
+                response = view_func(request, *args, **kwargs)
+                if response.status_code != 200 or not hasattr(response, 'data'):
+                    return response
+                entry = (response.data, hashlib.md5(JSONRenderer().render(response.data)).hexdigest())
+                if not replica_may_be_stale(resources):
+                    cache.set(key, entry, timeout if timeout is not None else settings.RESPONSE_CACHE_TIMEOUT)
+            data, digest = entry
+            # 표현(미디어 타입)마다 본문이 다르므로 ETag에 협상된 미디어 타입을 포함
+            media_type = getattr(request, 'accepted_media_type', '')
+            etag = f'"{hashlib.md5(f"{digest}:{media_type}".encode("utf-8")).hexdigest()}"'
+            if_none_match = request.headers.get('If-None-Match')
+            if if_none_match and etag in parse_etags(if_none_match):
+                response = HttpResponseNotModified()
+            else:
+                response = Response(data)
+            response['ETag'] = etag
+            patch_vary_headers(response, ('Accept',))
+            return response
+        return wrapper
+    return decorator
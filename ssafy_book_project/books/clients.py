@@ -0,0 +1,148 @@
+import json
+import queue
+import random
+import threading
+import time
+import uuid
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from django.conf import settings
+
+
+class EmbeddingAPIError(ValueError):
+    pass
+
+
+class EmbeddingThrottled(EmbeddingAPIError):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class EmbeddingClient:
+    """
+    Clova Studio 임베딩 API 클라이언트
+    - keep-alive 커넥션을 풀에 보관해서 재사용 (요청마다 TLS 핸드셰이크 X)
+    - 임베딩 API는 요청당 텍스트 1개만 받으므로 embed_many는 max_connections 만큼 동시에 요청
+    - 429 / 5xx / 42901(요청 한도 초과)는 지수 백오프로 재시도
+    """
+
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+    THROTTLE_CODES = {'42900', '42901'}
+
+    def __init__(self, host, path, api_key=None, use_https=True, port=None,
+                 max_connections=8, max_retries=4, backoff=0.5, timeout=30):
+        self.host = host
+        self.path = path
+        self.api_key = api_key
+        self.use_https = use_https
+        self.port = port
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(maxsize=max_connections)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _new_connection(self):
+        connection_class = http.client.HTTPSConnection if self.use_https else http.client.HTTPConnection
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self._new_connection()
+
+    def _release(self, connection):
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _post(self, body):
+        headers = {
+            'Content-Type': 'application/json; charset=utf-8',
+            'Authorization': self.api_key or '',
+            'X-NCP-CLOVASTUDIO-REQUEST-ID': uuid.uuid4().hex,
+        }
+        connection = self._acquire()
+        try:
+            connection.request('POST', self.path, json.dumps(body), headers)
+            response = connection.getresponse()
+            payload = response.read()
+        except (http.client.HTTPException, OSError):
+            # 서버가 끊은 keep-alive 커넥션은 버리고 새로 연결
+            connection.close()
+            raise
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(connection)
+
+        retry_after = response.getheader('Retry-After')
+        if response.status in self.RETRY_STATUS:
+            raise EmbeddingThrottled(
+                f"Embedding API HTTP {response.status}",
+                retry_after=float(retry_after) if retry_after else None,
+            )
+        result = json.loads(payload.decode('utf-8'))
+        code = result['status']['code']
+        if code in self.THROTTLE_CODES:
+            raise EmbeddingThrottled(f"Embedding API Error: {result['status']['message']}")
+        if code != '20000':
+            raise EmbeddingAPIError(f"Embedding API Error: {result['status']['message']}")
+        return result['result']
+
+    def embed(self, text):
+        for attempt in range(self.max_retries + 1):
+            try:
+                result = self._post({'text': text})
+                return np.array(result['embedding'], dtype=np.float32)
+            except (EmbeddingThrottled, http.client.HTTPException, OSError) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = getattr(e, 'retry_after', None) or self.backoff * (2 ** attempt)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+
+    def embed_many(self, texts):
+        """
+        texts 순서대로 임베딩 리스트 반환 (최대 max_connections개 동시 요청)
+        """
+        texts = list(texts)
+        if len(texts) <= 1:
+            return [self.embed(text) for text in texts]
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_connections, thread_name_prefix='embedding'
+                )
+        return list(self._executor.map(self.embed, texts))
+
+
+_default_client = None
+
+
+def get_embedding_client():
+    global _default_client
+    if _default_client is None:
+        _default_client = EmbeddingClient(
+            host=settings.CLOVA_EMBEDDING_HOST,
+            path=settings.CLOVA_EMBEDDING_PATH,
+            api_key=settings.CLOVA_API_KEY,
+            max_connections=settings.EMBEDDING_MAX_CONNECTIONS,
+            max_retries=settings.EMBEDDING_MAX_RETRIES,
+        )
+    return _default_client
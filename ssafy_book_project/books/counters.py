@@ -0,0 +1,72 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from accounts.counters import count_subquery, reconcile_user_counters
+from .models import Comment, Thread
+from .cache import bump_version
+
+
+def add_comment_count(thread_id, delta):
+    Thread.objects.filter(pk=thread_id).update(comment_count=F('comment_count') + delta)
+
+
+def toggle_like(thread_id, user_id):
+    """
+    좋아요/좋아요 취소를 한 트랜잭션에서 처리하고 (liked, like_count) 반환
+    - 먼저 DELETE 해보고 지워진 행이 없으면 INSERT (exists() 확인 후 add/remove 하는 경쟁 조건 없음)
+    - 동시에 두 번 눌러 INSERT가 겹치면 (thread, user) unique 제약으로 한쪽은 실패 → 카운터는 한 번만 증가
+    """
+    likes = Thread.likes.through
+    with transaction.atomic():
+        removed, _ = likes.objects.filter(thread_id=thread_id, user_id=user_id).delete()
+        if removed:
+            liked, delta = False, -1
+        else:
+            try:
+                with transaction.atomic():
+                    likes.objects.create(thread_id=thread_id, user_id=user_id)
+                liked, delta = True, 1
+            except IntegrityError:
+                liked, delta = True, 0
+        if delta:
+            Thread.objects.filter(pk=thread_id).update(like_count=F('like_count') + delta)
+        like_count = Thread.objects.values_list('like_count', flat=True).get(pk=thread_id)
+    if delta:
+        bump_version('threads')
+    return liked, like_count
+
+
+def liked_thread_ids(user_id, thread_ids):
+    """
+    thread_ids 중 user가 좋아요 누른 쓰레드 id 집합 (쿼리 1번)
+    """
+    likes = Thread.likes.through
+    return set(
+        likes.objects.filter(user_id=user_id, thread_id__in=thread_ids).values_list('thread_id', flat=True)
+    )
+
+
+def reconcile_thread_counters():
+    """
+    댓글/좋아요 카운터를 실제 행 수로 다시 계산하고, 값이 달랐던 쓰레드 수 반환
+    """
+    likes = Thread.likes.through
+    actual = Thread.objects.annotate(
+        actual_comments=count_subquery(Comment, 'thread'),
+        actual_likes=count_subquery(likes, 'thread'),
+    )
+    drifted = actual.exclude(
+        comment_count=F('actual_comments'), like_count=F('actual_likes')
+    ).count()
+    Thread.objects.update(
+        comment_count=count_subquery(Comment, 'thread'),
+        like_count=count_subquery(likes, 'thread'),
+    )
+    bump_version('threads')
+    return drifted
+
+
+def reconcile_counters():
+    return {
+        'threads': reconcile_thread_counters(),
+        'users': reconcile_user_counters(),
+    }
@@ -0,0 +1,95 @@
+import hashlib
+import numpy as np
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from .models import Book, BookEmbedding
+from .jobs import get_executor
+from .utils import get_embedding, get_embeddings
+
+
+def description_hash(text):
+    """
+    description + 임베딩 모델 버전으로 만든 해시 (변경 감지용)
+    """
+    payload = f"{settings.EMBEDDING_MODEL_VERSION}:{text or ''}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def save_embedding(book, vector, content_hash=None):
+    vector = np.asarray(vector, dtype=np.float32)
+    embedding, _ = BookEmbedding.objects.update_or_create(
+        book=book,
+        defaults={
+            'content_hash': content_hash or description_hash(book.description),
+            'model_version': settings.EMBEDDING_MODEL_VERSION,
+            'dimension': vector.shape[0],
+            'vector': vector.tobytes(),
+        },
+    )
+    return embedding
+
+
+def ensure_embedding(book, embedding_fn=get_embedding, force=False):
+    """
+    저장된 임베딩이 없거나 description이 바뀐 경우에만 임베딩 API 호출
+    """
+    content_hash = description_hash(book.description)
+    embedding = BookEmbedding.objects.filter(book=book).first()
+    if embedding and embedding.content_hash == content_hash and not force:
+        return embedding
+    vector = embedding_fn(book.description)
+    return save_embedding(book, vector, content_hash)
+
+
+def schedule_embedding(book):
+    """
+    커밋 후 임베딩 계산 (EMBEDDING_ASYNC면 백그라운드 풀에서, 저장 요청은 임베딩 API를 기다리지 않음)
+    """
+    def run():
+        if settings.EMBEDDING_ASYNC:
+            get_executor('embeddings', settings.EMBEDDING_WORKERS).submit(_run_ensure_embedding, book.pk)
+        else:
+            _ensure_saved_embedding(book.pk)
+    transaction.on_commit(run)
+
+
+def _ensure_saved_embedding(book_pk):
+    # 커밋 사이에 description이 또 바뀌었을 수 있으므로 저장된 값으로 계산
+    book = Book.objects.filter(pk=book_pk).only('id', 'description').first()
+    if book is not None:
+        ensure_embedding(book)
+
+
+def _run_ensure_embedding(book_pk):
+    close_old_connections()
+    try:
+        _ensure_saved_embedding(book_pk)
+    except Exception as e:
+        print("책 임베딩 생성 에러:", e)
+    finally:
+        close_old_connections()
+
+
+def load_embeddings(books, embeddings_fn=get_embeddings):
+    """
+    books의 임베딩을 한 번의 쿼리로 불러옴 {book.pk: np.ndarray}
+    저장되지 않았거나 오래된 임베딩만 한꺼번에 새로 계산해서 저장
+    """
+    books = list(books)
+    stored = {
+        embedding.book_id: embedding
+        for embedding in BookEmbedding.objects.filter(book__in=books)
+    }
+    vectors, missing = {}, []
+    for book in books:
+        content_hash = description_hash(book.description)
+        embedding = stored.get(book.pk)
+        if embedding is None or embedding.content_hash != content_hash:
+            missing.append((book, content_hash))
+        else:
+            vectors[book.pk] = embedding.as_array()
+    if missing:
+        computed = embeddings_fn([book.description for book, _ in missing])
+        for (book, content_hash), vector in zip(missing, computed):
+            vectors[book.pk] = save_embedding(book, vector, content_hash).as_array()
+    return vectors
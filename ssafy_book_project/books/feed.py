@@ -0,0 +1,152 @@
+import base64
+import heapq
+from datetime import datetime
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from accounts.models import User
+from .models import Thread, TimelineEntry
+from .jobs import get_executor
+
+
+def is_high_follower(follower_count):
+    # 팔로워가 너무 많은 작성자는 쓰기 시 fan-out 대신 읽을 때 합침
+    return follower_count > settings.FEED_FANOUT_MAX_FOLLOWERS
+
+
+def follower_ids(user_id):
+    # a.followers.add(b) → (from_user=a, to_user=b): b가 a를 팔로우
+    through = User.followers.through
+    return list(through.objects.filter(from_user_id=user_id).values_list('to_user_id', flat=True))
+
+
+def _bulk_write(entries, batch_size):
+    TimelineEntry.objects.bulk_create(entries, batch_size=batch_size, ignore_conflicts=True)
+    return len(entries)
+
+
+def fan_out_thread(thread, batch_size=1000):
+    """
+    쓰레드를 작성자 팔로워들의 타임라인에 기록하고 기록한 수 반환
+    팔로워가 FEED_FANOUT_MAX_FOLLOWERS보다 많은 작성자는 기록하지 않음 (read_feed에서 합침)
+    """
+    if thread.user_id is None:
+        return 0
+    follower_count = User.objects.filter(pk=thread.user_id).values_list('follower_count', flat=True).first()
+    if follower_count is None or is_high_follower(follower_count):
+        return 0
+    entries = [
+        TimelineEntry(owner_id=owner_id, thread_id=thread.pk, author_id=thread.user_id, created_at=thread.created_at)
+        for owner_id in follower_ids(thread.user_id)
+    ]
+    return _bulk_write(entries, batch_size)
+
+
+def _run_fan_out(thread_id):
+    close_old_connections()
+    try:
+        thread = Thread.objects.filter(pk=thread_id).only('id', 'user_id', 'created_at').first()
+        if thread is not None:
+            fan_out_thread(thread)
+    except Exception as e:
+        print("피드 fan-out 에러:", e)
+    finally:
+        close_old_connections()
+
+
+def schedule_fan_out(thread):
+    """
+    커밋 후 fan-out 실행 (FEED_FANOUT_ASYNC면 백그라운드 풀에서)
+    """
+    def run():
+        if settings.FEED_FANOUT_ASYNC:
+            get_executor('feed', settings.FEED_FANOUT_WORKERS).submit(_run_fan_out, thread.pk)
+        else:
+            fan_out_thread(thread)
+    transaction.on_commit(run)
+
+
+def backfill_timeline(owner_id, author_id, limit=None):
+    """
+    새로 팔로우한 작성자의 최근 쓰레드를 타임라인에 채움
+    """
+    limit = settings.FEED_BACKFILL if limit is None else limit
+    follower_count = User.objects.filter(pk=author_id).values_list('follower_count', flat=True).first()
+    if follower_count is None or is_high_follower(follower_count) or limit <= 0:
+        return 0
+    recent = Thread.objects.filter(user_id=author_id).order_by('-created_at', '-id').values_list('id', 'created_at')[:limit]
+    entries = [
+        TimelineEntry(owner_id=owner_id, thread_id=thread_id, author_id=author_id, created_at=created_at)
+        for thread_id, created_at in recent
+    ]
+    return _bulk_write(entries, 1000)
+
+
+def prune_timeline(owner_id, author_ids):
+    deleted, _ = TimelineEntry.objects.filter(owner_id=owner_id, author_id__in=author_ids).delete()
+    return deleted
+
+
+def encode_cursor(created_at, thread_id):
+    raw = f"{created_at.isoformat()}|{thread_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    (created_at, thread_id), 잘못된 커서면 ValueError
+    """
+    try:
+        created_at, thread_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(thread_id)
+    except (UnicodeError, ValueError, TypeError) as e:
+        raise ValueError(cursor) from e
+
+
+def _before(queryset, id_field, position):
+    if position is None:
+        return queryset
+    created_at, thread_id = position
+    return queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, **{f'{id_field}__lt': thread_id}))
+
+
+def read_feed(user, page_size, cursor=None):
+    """
+    홈 피드 한 페이지: ([(thread_id, created_at)], 다음 커서 또는 None)
+    - 타임라인 테이블 (owner, created_at, thread) 인덱스 범위 읽기
+    - 팔로우 중인 팔로워 많은 작성자의 쓰레드는 (user, created_at, id) 인덱스로 읽어서 병합
+    둘 다 (created_at, id) 역순 keyset 조건이라 페이지가 깊어져도 OFFSET 없이 읽음
+    """
+    position = decode_cursor(cursor) if cursor else None
+    fetch = page_size + 1
+
+    timeline = _before(TimelineEntry.objects.filter(owner=user), 'thread_id', position)
+    sources = [
+        [(created_at, thread_id) for thread_id, created_at in
+         timeline.order_by('-created_at', '-thread_id').values_list('thread_id', 'created_at')[:fetch]]
+    ]
+    high_follower_ids = list(
+        User.objects.filter(followers=user, follower_count__gt=settings.FEED_FANOUT_MAX_FOLLOWERS)
+        .values_list('pk', flat=True)
+    )
+    if high_follower_ids:
+        threads = _before(Thread.objects.filter(user_id__in=high_follower_ids), 'id', position)
+        sources.append([
+            (created_at, thread_id) for thread_id, created_at in
+            threads.order_by('-created_at', '-id').values_list('id', 'created_at')[:fetch]
+        ])
+
+    rows, seen = [], set()
+    for created_at, thread_id in heapq.merge(*sources, reverse=True):
+        # 작성자의 팔로워 수가 기준을 넘나든 경우 두 곳에 모두 있을 수 있음
+        if thread_id in seen:
+            continue
+        seen.add(thread_id)
+        rows.append((thread_id, created_at))
+        if len(rows) == fetch:
+            break
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0])
+    return rows, next_cursor
@@ -0,0 +1,101 @@
+import hashlib
+import time
+import unicodedata
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+from .ann import search_vector
+from .jobs import get_executor
+from .search import SearchIndexNotReady, search_books
+from .utils import get_embedding
+
+RRF_K = 60
+
+
+def normalize_query(query):
+    # "  헤르만   헤세 " == "헤르만 헤세" (같은 검색어는 임베딩 캐시 공유)
+    query = unicodedata.normalize('NFKC', query or '')
+    return ' '.join(query.split()).lower()
+
+
+def _embedding_key(normalized):
+    digest = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+    return f"search:embedding:{settings.EMBEDDING_MODEL_VERSION}:{digest}"
+
+
+def cached_query_embedding(normalized):
+    vector = caches[settings.SEARCH_EMBEDDING_CACHE_ALIAS].get(_embedding_key(normalized))
+    return None if vector is None else np.frombuffer(vector, dtype=np.float32)
+
+
+def compute_query_embedding(normalized, embedding_fn=get_embedding):
+    vector = np.asarray(embedding_fn(normalized), dtype=np.float32)
+    caches[settings.SEARCH_EMBEDDING_CACHE_ALIAS].set(
+        _embedding_key(normalized), vector.tobytes(), settings.SEARCH_EMBEDDING_CACHE_TIMEOUT
+    )
+    return vector
+
+
+def reciprocal_rank_fusion(*rankings, k=RRF_K):
+    """
+    여러 순위 리스트([id, ...])를 RRF로 합침: score(id) = Σ 1 / (k + rank)
+    점수 척도가 다른 BM25와 코사인 유사도를 정규화 없이 섞을 수 있음
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def hybrid_search(query, limit=20, budget=None, embedding_fn=get_embedding):
+    """
+    제목/작가 BM25 검색과 쿼리 임베딩 벡터 top-k를 RRF로 합친 결과
+    - 임베딩은 캐시(정규화한 검색어 기준)에 없을 때만 한 번 계산하고, 그동안 lexical 검색을 같이 진행
+    - budget(초) 안에 임베딩이 안 오면 lexical 결과만 반환 (임베딩은 백그라운드에서 마저 계산되어 다음 검색부터 사용)
+    반환: (순위 리스트 [{'id', 'score', 'lexical_rank', 'semantic_rank'}], semantic 사용 여부)
+    """
+    if limit <= 0:
+        return [], False
+    budget = settings.SEARCH_LATENCY_BUDGET if budget is None else budget
+    started = time.perf_counter()
+    normalized = normalize_query(query)
+    depth = max(limit, settings.SEARCH_CANDIDATES)
+
+    vector = cached_query_embedding(normalized)
+    future = None
+    if vector is None:
+        future = get_executor('search', settings.SEARCH_EMBEDDING_WORKERS).submit(
+            compute_query_embedding, normalized, embedding_fn
+        )
+
+    try:
+        lexical = [pk for pk, _ in search_books(normalized, limit=depth, fields=('title', 'author'))]
+    except SearchIndexNotReady:
+        # 메모리 역색인을 빌드하는 동안은 임베딩 결과만 사용
+        lexical = []
+
+    if future is not None:
+        remaining = budget - (time.perf_counter() - started)
+        try:
+            vector = future.result(timeout=max(remaining, 0))
+        except FutureTimeoutError:
+            vector = None
+        except Exception as e:
+            print("검색어 임베딩 에러:", e)
+            vector = None
+
+    semantic = [] if vector is None else [pk for pk, _ in search_vector(vector, depth)]
+    lexical_ranks = {pk: rank for rank, pk in enumerate(lexical, start=1)}
+    semantic_ranks = {pk: rank for rank, pk in enumerate(semantic, start=1)}
+    results = [
+        {
+            'id': pk,
+            'score': score,
+            'lexical_rank': lexical_ranks.get(pk),
+            'semantic_rank': semantic_ranks.get(pk),
+        }
+        for pk, score in reciprocal_rank_fusion(lexical, semantic)[:limit]
+    ]
+    return results, vector is not None
@@ -0,0 +1,37 @@
+import re
+
+SEPARATORS = re.compile(r'[\s\-]')
+
+
+def clean_isbn(value):
+    # 하이픈/공백 제거, ISBN-10 체크 문자 x → X
+    return SEPARATORS.sub('', str(value or '')).upper()
+
+
+def isbn13_check_digit(first12):
+    total = sum(int(digit) * (3 if i % 2 else 1) for i, digit in enumerate(first12))
+    return str((10 - total % 10) % 10)
+
+
+def isbn10_check_digit(first9):
+    total = sum(int(digit) * (10 - i) for i, digit in enumerate(first9))
+    check = (11 - total % 11) % 11
+    return 'X' if check == 10 else str(check)
+
+
+def normalize_isbn(value):
+    """
+    ISBN-10/13 (하이픈/공백 허용)을 하이픈 없는 ISBN-13으로 변환
+    형식이나 체크 숫자가 틀리면 ValueError
+    """
+    isbn = clean_isbn(value)
+    if len(isbn) == 10 and isbn[:9].isdigit() and (isbn[9].isdigit() or isbn[9] == 'X'):
+        if isbn10_check_digit(isbn[:9]) != isbn[9]:
+            raise ValueError(f"ISBN-10 체크 숫자가 맞지 않습니다: {value}")
+        first12 = '978' + isbn[:9]
+        return first12 + isbn13_check_digit(first12)
+    if len(isbn) == 13 and isbn.isdigit():
+        if isbn13_check_digit(isbn[:12]) != isbn[12]:
+            raise ValueError(f"ISBN-13 체크 숫자가 맞지 않습니다: {value}")
+        return isbn
+    raise ValueError(f"ISBN-10 또는 ISBN-13 형식이 아닙니다: {value}")
@@ -0,0 +1,220 @@
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from .models import Book, EnrichmentJob, EnrichmentStatus
+from .utils import (
+    WIKI_NOT_FOUND,
+    get_wikipedia_content,
+    fetch_author_image,
+    generate_author_gpt_info,
+    generate_audio_script,
+    create_tts_audio,
+)
+from .author_cache import get_author_profile, store_author_profile
+from .cache import bump_version
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name, max_workers):
+    """
+    이름별 프로세스 공용 스레드 풀
+    (job 풀과 stage 풀을 분리해서 job이 stage를 기다리다 풀이 고갈되지 않게 함)
+    """
+    with _executors_lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        return _executors[name]
+
+
+def enqueue_enrichment(book):
+    """
+    보강 작업을 job store에 등록하고, 커밋 후 워커 풀에 넘김
+    """
+    job = EnrichmentJob.objects.create(book=book)
+    set_enrichment_status(book, EnrichmentStatus.PENDING)
+    if settings.ENRICHMENT_ASYNC:
+        transaction.on_commit(lambda: submit_job(job.pk))
+    else:
+        transaction.on_commit(lambda: run_job(job.pk))
+    return job
+
+
+def set_enrichment_status(book, status):
+    # update()는 post_save를 보내지 않으므로 응답 캐시 버전을 직접 올림
+    Book.objects.filter(pk=book.pk).update(enrichment_status=status)
+    book.enrichment_status = status
+    bump_version('books')
+
+
+def submit_job(job_id):
+    executor = get_executor('enrichment', settings.ENRICHMENT_WORKERS)
+    return executor.submit(run_job_in_thread, job_id)
+
+
+def run_job_in_thread(job_id):
+    close_old_connections()
+    try:
+        return run_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def claim_job(job_id):
+    # 다른 워커가 이미 가져간 job이면 0건 업데이트
+    # update()는 auto_now를 채우지 않으므로 updated_at(heartbeat)을 직접 기록
+    claimed = EnrichmentJob.objects.filter(pk=job_id, status=EnrichmentStatus.PENDING).update(
+        status=EnrichmentStatus.RUNNING, updated_at=timezone.now()
+    )
+    return claimed == 1
+
+
+def requeue_stale_jobs():
+    """
+    워커가 죽어서 running으로 남은 job을 되살림 (단계가 바뀔 때마다 갱신되는 updated_at이 heartbeat)
+    ENRICHMENT_STALE_SECONDS 동안 소식이 없으면 시도 횟수가 남은 job은 pending, 다 쓴 job은 failed
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.ENRICHMENT_STALE_SECONDS)
+    stale = EnrichmentJob.objects.filter(status=EnrichmentStatus.RUNNING, updated_at__lt=cutoff)
+    requeued = 0
+    for status, jobs in (
+        (EnrichmentStatus.PENDING, stale.filter(attempts__lt=settings.ENRICHMENT_MAX_ATTEMPTS)),
+        (EnrichmentStatus.FAILED, stale),
+    ):
+        book_ids = list(jobs.values_list('book_id', flat=True))
+        if not book_ids:
+            continue
+        count = jobs.update(status=status, error="작업 시간 초과 (워커 중단)", updated_at=timezone.now())
+        Book.objects.filter(pk__in=book_ids).update(enrichment_status=status)
+        bump_version('books')
+        if status == EnrichmentStatus.PENDING:
+            requeued = count
+    return requeued
+
+
+def set_stage(job, stage):
+    job.stage = stage
+    job.save(update_fields=['stage', 'updated_at'])
+
+
+def run_job(job_id):
+    if not claim_job(job_id):
+        return False
+    job = EnrichmentJob.objects.select_related('book').get(pk=job_id)
+    book = job.book
+    job.attempts += 1
+    job.save(update_fields=['attempts', 'updated_at'])
+    set_enrichment_status(book, EnrichmentStatus.RUNNING)
+    try:
+        enrich_book(job, book)
+    except Exception as e:
+        traceback.print_exc()
+        job.error = str(e)
+        if job.attempts < settings.ENRICHMENT_MAX_ATTEMPTS:
+            # 시도 횟수가 남았으면 다시 대기 상태로 돌려서 재시도
+            job.status = EnrichmentStatus.PENDING
+            job.save(update_fields=['status', 'error', 'updated_at'])
+            set_enrichment_status(book, EnrichmentStatus.PENDING)
+            schedule_retry(job)
+        else:
+            job.status = EnrichmentStatus.FAILED
+            job.save(update_fields=['status', 'error', 'updated_at'])
+            set_enrichment_status(book, EnrichmentStatus.FAILED)
+        return False
+    job.status = EnrichmentStatus.DONE
+    job.stage = ''
+    job.save(update_fields=['status', 'stage', 'updated_at'])
+    set_enrichment_status(book, EnrichmentStatus.DONE)
+    return True
+
+
+def schedule_retry(job):
+    """
+    실패한 job을 지수 백오프 후 워커 풀에 다시 넘김
+    (동기 모드에서는 요청 스레드를 붙잡지 않도록 run_enrichment_jobs 커맨드가 처리)
+    """
+    if not settings.ENRICHMENT_ASYNC:
+        return None
+    delay = settings.ENRICHMENT_RETRY_BACKOFF * 2 ** (job.attempts - 1)
+    timer = threading.Timer(delay, submit_job, args=(job.pk,))
+    timer.daemon = True
+    timer.start()
+    return timer
+
+
+def enrich_book(job, book):
+    profile = get_author_profile(book.author)
+    if profile is not None:
+        # 이미 캐시된 작가면 위키피디아/GPT 호출 없이 재사용
+        wiki_summary = profile.wiki_summary
+        book.author_profile_img = profile.profile_img
+        book.author_info, book.author_works = profile.author_info, profile.author_works
+        book.save(update_fields=['author_profile_img', 'author_info', 'author_works'])
+    else:
+        wiki_summary = fetch_author_profile(job, book)
+
+    # 3단계: 오디오 스크립트 + TTS
+    set_stage(job, 'audio')
+    audio_script = generate_audio_script(book, wiki_summary)
+
+    def publish_first_chunk(index, chunk_path):
+        # 전체 합성이 끝나기 전에 첫 문장 청크부터 들을 수 있게 먼저 연결
+        if index == 0 and not book.audio_file:
+            Book.objects.filter(pk=book.pk).update(audio_file=chunk_path)
+            bump_version('books')
+
+    audio_file_path = create_tts_audio(book, audio_script, on_chunk=publish_first_chunk)
+    if audio_file_path:
+        book.audio_file = audio_file_path
+        book.save(update_fields=['audio_file'])
+
+
+def fetch_author_profile(job, book):
+    # 1단계: 위키피디아 요약과 작가 사진은 서로 독립적이라 동시에 가져옴
+    set_stage(job, 'wikipedia')
+    stage_pool = get_executor('enrichment-stage', settings.ENRICHMENT_STAGE_WORKERS)
+    content_future = stage_pool.submit(get_wikipedia_content, book.author)
+    image_future = stage_pool.submit(fetch_author_image, book.author)
+    wiki_data = content_future.result()
+    wiki_summary = wiki_data.get("summary", "") if wiki_data else WIKI_NOT_FOUND
+    # 사진은 이미 내려받아 저장됐을 수 있으므로 요약이 없어도 버리지 않고 연결 (media에 고아 파일 방지)
+    image_path = image_future.result()
+    if image_path:
+        book.author_profile_img = image_path
+        book.save(update_fields=['author_profile_img'])
+
+    # 2단계: GPT 작가 정보
+    set_stage(job, 'author_info')
+    book.author_info, book.author_works = generate_author_gpt_info(book, wiki_summary)
+    book.save(update_fields=['author_info', 'author_works'])
+
+    if wiki_data:
+        # 위키피디아에서 찾지 못한 작가는 다음 책에서 다시 시도하도록 캐시하지 않음
+        store_author_profile(
+            book.author,
+            wiki_summary=wiki_summary,
+            profile_img=image_path or '',
+            author_info=book.author_info,
+            author_works=book.author_works,
+        )
+    return wiki_summary
+
+
+def run_pending_jobs(limit=None):
+    """
+    대기 중인 job을 워커 풀에서 처리하고 처리한 job 수 반환 (서버 재시작 후 복구용)
+    멈춘 running job도 먼저 대기 상태로 되돌려서 같이 처리
+    """
+    requeue_stale_jobs()
+    job_ids = list(
+        EnrichmentJob.objects.filter(status=EnrichmentStatus.PENDING)
+        .order_by('created_at')
+        .values_list('pk', flat=True)[:limit]
+    )
+    futures = [submit_job(job_id) for job_id in job_ids]
+    return sum(1 for future in futures if future.result())
@@ -0,0 +1,359 @@
+import itertools
+import json
+import random
+import re
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, F
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import URLPattern, reverse
+from accounts import urls as accounts_urls
+from accounts.models import User
+from books import urls as books_urls
+from books.ann import build_book_index, set_book_index
+from books.counters import reconcile_counters
+from books.embeddings import description_hash
+from books.isbn import isbn13_check_digit
+from books.models import (
+    Book, BookEmbedding, BookRecommendation, Category, Comment, EnrichmentJob, Thread, TimelineEntry,
+)
+from books.search import rebuild_search_index, set_search_backend
+
+PASSWORD = 'audit-password-1234'
+SQLITE_SCAN_RE = re.compile(r'SCAN (?!CONSTANT ROW)(\S+)(?: USING (?:COVERING )?INDEX (\S+))?')
+EXPLAINED = ('SELECT', 'UPDATE', 'DELETE', 'WITH')
+
+# 의도적으로 테이블 전체를 읽는 URL (URL 이름 → 허용 테이블)
+ALLOWED_SCANS = {
+    'books:category_list': {'books_category'},  # 카테고리 전체 목록 (작은 코드 테이블)
+    'books:export': {'books_book', 'books_category'},  # 카탈로그 전체 스트리밍 내보내기
+    'books:author_cache_stats': {'books_authorprofile'},  # 관리자용 캐시 통계 (COUNT)
+}
+# 연쇄 삭제는 지워지는 행 수만큼 배치 쿼리가 늘어나므로 --max-queries 대신 --baseline으로만 비교
+UNBOUNDED_QUERIES = {'books:delete', 'books:thread_delete', 'delete_profile'}
+
+
+def isbn13(n):
+    first12 = f"979{n:09d}"
+    return first12 + isbn13_check_digit(first12)
+
+
+class QueryRecorder:
+    # connection.execute_wrapper로 요청 중 실행된 (sql, params)를 그대로 기록
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append((sql, params[0] if many and params else params))
+        return execute(sql, params, many, context)
+
+
+def explain(sql, params):
+    """
+    [(계획 한 줄, 전체 스캔 테이블 또는 None)]
+    - SQLite: EXPLAIN QUERY PLAN의 SCAN. 다음 경우는 제외
+      · WHERE 없이 인덱스/rowid 순서로 앞에서 LIMIT개만 읽는 경우 (목록 첫 페이지, 읽는 행 수 = LIMIT)
+        WHERE가 있으면 조건에 맞는 행이 나올 때까지 테이블 끝까지 읽을 수 있으므로 제외하지 않음
+      · 조건에 맞는 행만 담은 부분 인덱스를 읽는 경우
+    - PostgreSQL: EXPLAIN (FORMAT JSON)의 Seq Scan
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            rows = cursor.fetchall()
+            details = [detail for _, _, _, detail in rows]
+            limited = (
+                re.search(r'\bLIMIT\b', sql) and not re.search(r'\bWHERE\b', sql)
+                and not any('USE TEMP B-TREE' in detail for detail in details)
+            )
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql LIKE '% WHERE %'")
+            partial = {name for name, in cursor.fetchall()}
+            plan = []
+            for i, (_, parent, _, detail) in enumerate(rows):
+                match = SQLITE_SCAN_RE.match(detail)
+                scanned = (
+                    match and 'VIRTUAL TABLE' not in detail and match.group(2) not in partial
+                    and not (limited and i == 0 and parent == 0)
+                )
+                plan.append((detail, match.group(1) if scanned else None))
+            return plan
+        if connection.vendor == 'postgresql':
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = []
+            nodes = [(cursor.fetchone()[0][0]['Plan'], 0)]
+            while nodes:
+                node, depth = nodes.pop()
+                relation = node.get('Relation Name')
+                plan.append(('  ' * depth + node['Node Type'] + (f" on {relation}" if relation else ''),
+                             relation if node['Node Type'] == 'Seq Scan' else None))
+                nodes.extend((child, depth + 1) for child in reversed(node.get('Plans', [])))
+            return plan
+    raise CommandError(f"{connection.vendor} DB의 실행 계획은 지원하지 않습니다.")
+
+
+def audit_settings(tmp):
+    return override_settings(
+        ALLOWED_HOSTS=['testserver'],
+        ANN_INDEX_PATH=Path(tmp) / 'books_ivf.npz',
+        ANN_INDEX_AUTOSAVE=False,
+        RECOMMENDATION_ASYNC=False,
+        # 테스트 DB는 default에만 만들어지므로 replica가 설정돼 있어도 모든 조회를 default로
+        DATABASE_REPLICA_ALIAS=None,
+        # 응답 캐시에 걸리면 두 번째 요청부터 쿼리가 안 보이므로 캐시를 끔
+        CACHES={**settings.CACHES, 'query_audit': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        RESPONSE_CACHE_ALIAS='query_audit',
+    )
+
+
+def load_baseline(path):
+    """
+    {(URL 이름, 메서드): 쿼리 수}, --output 보고서 또는 {"이름 메서드": 쿼리 수} 형식
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return {tuple(key.rsplit(' ', 1)): count for key, count in data.items()}
+    return {(row['name'], row['method']): len(row['queries']) for row in data}
+
+
+def find_problems(row, max_queries, baseline):
+    allowed = ALLOWED_SCANS.get(row['name'], set())
+    scans = sorted({table for query in row['queries'] for table in query['full_scans']} - allowed)
+    key = (row['name'], row['method'])
+    problems = []
+    if scans:
+        problems.append(f"full scan: {', '.join(scans)}")
+    if row['name'] not in UNBOUNDED_QUERIES and len(row['queries']) > max_queries:
+        problems.append(f"쿼리 {len(row['queries'])}개 > {max_queries}")
+    if key in baseline and len(row['queries']) > baseline[key]:
+        problems.append(f"쿼리 {baseline[key]} → {len(row['queries'])}개")
+    if row['status'] >= 500:
+        problems.append(f"HTTP {row['status']}")
+    return problems
+
+
+class Command(BaseCommand):
+    help = (
+        "테스트 DB에 약 10만 행을 채우고 books/accounts의 모든 URL을 호출해서 "
+        "URL별 쿼리 수와 실행 계획을 기록합니다. 허용되지 않은 전체 스캔이 있으면 실패합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5000)
+        parser.add_argument('--books', type=int, default=10000)
+        parser.add_argument('--threads', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=40000)
+        parser.add_argument('--likes', type=int, default=15000)
+        parser.add_argument('--follows', type=int, default=10000)
+        parser.add_argument('--max-queries', type=int, default=20, help="URL 하나가 넘으면 실패하는 쿼리 수")
+        parser.add_argument(
+            '--baseline',
+            help="이전 --output 결과 또는 {\"이름 메서드\": 쿼리 수} JSON, 쿼리 수가 늘어난 URL이 있으면 실패",
+        )
+        parser.add_argument('--output', help="URL별 쿼리 수/실행 계획을 JSON으로 저장")
+        parser.add_argument('--show-plans', action='store_true', help="모든 쿼리의 실행 계획 출력")
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with tempfile.TemporaryDirectory() as tmp, audit_settings(tmp):
+                report = self.run(options)
+        finally:
+            set_search_backend(None)
+            set_book_index(None)
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        self.check_report(report, options)
+
+    def seed(self, options):
+        rng = random.Random(0)
+        started = time.perf_counter()
+        User.objects.bulk_create(
+            [User(username=f"user{i}", email=f"user{i}@example.com", password='!') for i in range(options['users'])],
+            batch_size=2000,
+        )
+        auditor = User.objects.create(
+            username='auditor', email='auditor@example.com', password=make_password(PASSWORD),
+            is_staff=True, is_superuser=True,
+        )
+        user_ids = list(User.objects.order_by('id').values_list('id', flat=True))
+        categories = Category.objects.bulk_create([Category(name=f"카테고리{i}") for i in range(20)])
+        Book.objects.bulk_create([
+            Book(
+                title=f"책 {i}", description=f"설명 {i} " + ' '.join(rng.choices(['소설', '역사', '과학', '여행'], k=5)),
+                customer_review_rank=rng.randint(0, 10), author=f"작가{i % 500}", author_info='-',
+                author_works='-', isbn=isbn13(i), category=rng.choice(categories), recommendations_dirty=False,
+            )
+            for i in range(options['books'])
+        ], batch_size=2000)
+        book_ids = list(Book.objects.order_by('id').values_list('id', flat=True))
+
+        # 인기 있는 책/쓰레드/유저에 행이 몰리는 Zipf 분포 (가장 무거운 경우를 감사)
+        def zipf(ids):
+            return list(itertools.accumulate(1 / rank for rank in range(1, len(ids) + 1)))
+
+        Thread.objects.bulk_create([
+            Thread(book_id=book_id, title=f"t{i}", content='-', reading_date='2024-01-01', user_id=rng.choice(user_ids))
+            for i, book_id in enumerate(rng.choices(book_ids, cum_weights=zipf(book_ids), k=options['threads']))
+        ], batch_size=2000)
+        thread_ids = list(Thread.objects.order_by('id').values_list('id', flat=True))
+        Comment.objects.bulk_create([
+            Comment(thread_id=thread_id, content='-', user_id=rng.choice(user_ids))
+            for thread_id in rng.choices(thread_ids, cum_weights=zipf(thread_ids), k=options['comments'])
+        ], batch_size=2000)
+        Thread.likes.through.objects.bulk_create([
+            Thread.likes.through(thread_id=thread_id, user_id=rng.choice(user_ids))
+            for thread_id in rng.choices(thread_ids, cum_weights=zipf(thread_ids), k=options['likes'])
+        ], batch_size=2000, ignore_conflicts=True)
+        follows = User.followers.through
+        follows.objects.bulk_create([
+            follows(from_user_id=author, to_user_id=rng.choice(user_ids))
+            for author in rng.choices(user_ids, cum_weights=zipf(user_ids), k=options['follows'])
+        ] + [follows(from_user_id=author, to_user_id=auditor.pk) for author in user_ids[:100]],
+            batch_size=2000, ignore_conflicts=True)
+        follows.objects.filter(from_user_id=F('to_user_id')).delete()
+        TimelineEntry.objects.bulk_create([
+            TimelineEntry(owner=auditor, thread_id=thread_id, author_id=author_id, created_at=created_at)
+            for thread_id, author_id, created_at in
+            Thread.objects.filter(user_id__in=user_ids[:100]).values_list('id', 'user_id', 'created_at')
+        ], batch_size=2000, ignore_conflicts=True)
+        reconcile_counters()
+
+        vectors = np.random.default_rng(0).standard_normal((len(book_ids), 32)).astype(np.float32)
+        BookEmbedding.objects.bulk_create([
+            BookEmbedding(book_id=book_id, content_hash=description_hash(description), dimension=32,
+                          model_version=settings.EMBEDDING_MODEL_VERSION, vector=vector.tobytes())
+            for (book_id, description), vector in zip(Book.objects.order_by('id').values_list('id', 'description'), vectors)
+        ], batch_size=2000)
+        BookRecommendation.objects.bulk_create([
+            BookRecommendation(book_id=book_id, recommended_id=recommended_id, rank=rank, score=1.0)
+            for book_id in book_ids
+            for rank, recommended_id in enumerate(rng.sample(book_ids, 5))
+        ], batch_size=5000)
+        EnrichmentJob.objects.bulk_create([EnrichmentJob(book_id=book_id) for book_id in book_ids[::10]])
+        set_search_backend(None)
+        rebuild_search_index()
+        set_book_index(build_book_index())
+
+        total = sum(model.objects.count() for model in (
+            User, Book, Thread, Comment, Thread.likes.through, follows, TimelineEntry,
+        ))
+        self.stdout.write(f"seed: {total:,} rows in {time.perf_counter() - started:.1f}s")
+        return auditor
+
+    def url_kwargs(self, auditor):
+        """
+        URL 인자 값: 쓰레드가 가장 많은 책, 그 책에서 댓글이 가장 많은 쓰레드, 팔로워가 가장 많은 유저
+        (수정/삭제 뷰가 끝까지 실행되도록 책/쓰레드/댓글 작성자를 감사용 유저로 바꿈)
+        """
+        book = Book.objects.get(pk=Thread.objects.values('book_id').annotate(n=Count('id'))
+                                .order_by('-n').values_list('book_id', flat=True)[0])
+        thread = Thread.objects.filter(book=book).order_by('-comment_count').first()
+        comment = Comment.objects.filter(thread=thread).first()
+        Book.objects.filter(pk=book.pk).update(user=auditor)
+        Thread.objects.filter(pk=thread.pk).update(user=auditor)
+        Comment.objects.filter(pk=comment.pk).update(user=auditor)
+        user = User.objects.exclude(pk=auditor.pk).order_by('-follower_count').first()
+        return {
+            'book_pk': book.pk, 'thread_pk': thread.pk, 'comment_pk': comment.pk,
+            'user_id': user.pk, 'username': user.username, 'isbn': book.isbn,
+        }
+
+    def payloads(self, auditor):
+        return {
+            'books:create': {
+                'title': '새 책', 'description': '-', 'customer_review_rank': 5, 'author': '-',
+                'author_info': '-', 'author_works': '-', 'isbn': isbn13(10 ** 8),
+            },
+            'books:update': {'title': '수정된 책'},
+            'books:create_thread': {'title': '새 쓰레드', 'content': '-', 'reading_date': '2024-01-01'},
+            'books:thread_update': {'title': '수정된 쓰레드'},
+            'books:create_comment': {'content': '새 댓글'},
+            'books:update_comment': {'content': '수정된 댓글'},
+            'login': {'username': auditor.username, 'password': PASSWORD},
+            'signup': {'username': 'newuser', 'email': 'newuser@example.com', 'password': PASSWORD},
+            'update_profile': {'email': 'auditor2@example.com'},
+            'change_password': {'old_password': PASSWORD, 'new_password': PASSWORD + '!'},
+        }
+
+    def iter_urls(self, kwargs):
+        # (URL 이름, 경로, HTTP 메서드)
+        for namespace, module in (('books:', books_urls), ('', accounts_urls)):
+            for pattern in module.urlpatterns:
+                if not isinstance(pattern, URLPattern):
+                    continue
+                name = namespace + pattern.name
+                path = reverse(name, kwargs={key: kwargs[key] for key in pattern.pattern.converters})
+                view_class = getattr(pattern.callback, 'cls', None)
+                methods = getattr(view_class, 'http_method_names', ['get'])
+                for method in methods:
+                    if method not in ('options', 'head'):
+                        yield name, path, method
+
+    def run(self, options):
+        auditor = self.seed(options)
+        kwargs = self.url_kwargs(auditor)
+        payloads = self.payloads(auditor)
+        client = Client(raise_request_exception=False)
+        report = []
+        for name, path, method in self.iter_urls(kwargs):
+            # 로그아웃/비밀번호 변경 요청 뒤에도 같은 유저로 요청하도록 매번 로그인
+            client.force_login(auditor)
+            recorder = QueryRecorder()
+            # 쓰기 요청도 실제로 실행하되 롤백해서 다음 URL이 같은 데이터를 보게 함 (on_commit 작업도 실행되지 않음)
+            with transaction.atomic():
+                started = time.perf_counter()
+                with connection.execute_wrapper(recorder):
+                    response = getattr(client, method)(path, payloads.get(name, {}), content_type='application/json') \
+                        if method != 'get' else client.get(path, {'q': '소설'} if 'search' in name else {})
+                elapsed = time.perf_counter() - started
+                transaction.set_rollback(True)
+            queries = []
+            for sql, params in recorder.queries:
+                plan = explain(sql, params) if sql.lstrip().upper().startswith(EXPLAINED) else []
+                queries.append({
+                    'sql': sql,
+                    'plan': [detail for detail, _ in plan],
+                    'full_scans': sorted({table for _, table in plan if table}),
+                })
+            report.append({
+                'name': name, 'method': method.upper(), 'path': path, 'status': response.status_code,
+                'ms': round(elapsed * 1000, 1), 'queries': queries,
+            })
+        return report
+
+    def check_report(self, report, options):
+        baseline = load_baseline(options['baseline']) if options['baseline'] else {}
+        failures = []
+        for row in report:
+            key = (row['name'], row['method'])
+            repeated = max(Counter(query['sql'] for query in row['queries']).values(), default=0)
+            problems = find_problems(row, options['max_queries'], baseline)
+            scans = any(problem.startswith('full scan') for problem in problems)
+            line = (f"{row['method']:6} {row['path']:<48} {row['status']} queries={len(row['queries']):>2} "
+                    f"same_sql_max={repeated:>2} {row['ms']:7.1f}ms")
+            if problems:
+                failures.append((key, problems))
+                self.stdout.write(self.style.ERROR(f"{line}  {'; '.join(problems)}"))
+            else:
+                self.stdout.write(line)
+            if options['show_plans'] or scans:
+                for query in row['queries']:
+                    if query['plan'] and (options['show_plans'] or query['full_scans']):
+                        self.stdout.write(f"    {query['sql'][:160]}")
+                        for detail in query['plan']:
+                            self.stdout.write(f"      {detail}")
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=1)
+        if failures:
+            raise CommandError(f"쿼리 감사 실패: URL {len(failures)}개")
+        self.stdout.write(self.style.SUCCESS(f"URL {len(report)}개 통과"))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from books.models import Book
+from books.embeddings import description_hash, save_embedding
+from books.utils import get_embeddings
+
+
+class Command(BaseCommand):
+    help = "저장된 임베딩이 없거나 description/모델 버전이 바뀐 책의 임베딩을 계산합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="모든 책의 임베딩을 다시 계산")
+        parser.add_argument('--batch-size', type=int, default=64, help="한 번에 동시 요청할 책 수")
+
+    def handle(self, *args, **options):
+        force = options['force']
+        self.created, self.failed = 0, 0
+        skipped, batch = 0, []
+        for book in Book.objects.select_related('embedding').iterator(chunk_size=500):
+            stored = getattr(book, 'embedding', None)
+            if not force and stored and stored.content_hash == description_hash(book.description):
+                skipped += 1
+                continue
+            batch.append(book)
+            if len(batch) >= options['batch_size']:
+                self.embed_batch(batch)
+                batch = []
+        if batch:
+            self.embed_batch(batch)
+        self.stdout.write(self.style.SUCCESS(
+            f"임베딩 계산 {self.created}권, 건너뜀 {skipped}권, 실패 {self.failed}권"
+        ))
+
+    def embed_batch(self, books):
+        try:
+            vectors = get_embeddings([book.description for book in books])
+        except Exception as e:
+            self.failed += len(books)
+            self.stderr.write(f"[{books[0].pk}~{books[-1].pk}] 임베딩 생성 실패: {e}")
+            return
+        for book, vector in zip(books, vectors):
+            save_embedding(book, vector)
+            self.created += 1
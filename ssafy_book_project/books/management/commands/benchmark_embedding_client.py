@@ -0,0 +1,35 @@
+import time
+from django.core.management.base import BaseCommand
+from books.tests import FakeEmbeddingServer
+
+
+class Command(BaseCommand):
+    help = "로컬 가짜 임베딩 서버를 띄워 EmbeddingClient의 초당 호출 수를 측정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--texts', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8, 16])
+        parser.add_argument('--latency-ms', type=float, default=20.0, help="가짜 서버 응답 지연")
+        parser.add_argument('--throttle-every', type=int, default=0, help="N번째 요청마다 42901 응답")
+        parser.add_argument('--dim', type=int, default=1024)
+
+    def handle(self, *args, **options):
+        server = FakeEmbeddingServer(
+            latency=options['latency_ms'] / 1000, throttle_every=options['throttle_every'], dim=options['dim'],
+        )
+        texts = [f"책 설명 {i}" for i in range(options['texts'])]
+        try:
+            for concurrency in options['concurrency']:
+                server.requests = server.connections = 0
+                client = server.client(max_connections=concurrency, backoff=0.01)
+                started = time.perf_counter()
+                client.embed_many(texts)
+                elapsed = time.perf_counter() - started
+                client.close()
+                self.stdout.write(
+                    f"concurrency={concurrency:>3} texts={len(texts)} "
+                    f"calls/s={len(texts) / elapsed:8.1f} "
+                    f"requests={server.requests} connections={server.connections}"
+                )
+        finally:
+            server.stop()
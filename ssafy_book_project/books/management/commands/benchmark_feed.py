@@ -0,0 +1,108 @@
+import itertools
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+from accounts.counters import reconcile_user_counters
+from accounts.models import User
+from books.feed import fan_out_thread, read_feed
+from books.models import Book, Thread, TimelineEntry
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def summary(samples):
+    return (f"p50={percentile(samples, 0.5) * 1000:7.2f}ms p99={percentile(samples, 0.99) * 1000:8.2f}ms "
+            f"max={max(samples) * 1000:8.2f}ms")
+
+
+class Command(BaseCommand):
+    help = "팔로워 수가 Zipf 분포인 팔로우 그래프로 홈 피드 fan-out(쓰기/읽기) 성능을 측정합니다 (테스트 DB 사용)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--follows', type=int, default=30, help="유저당 팔로우 수")
+        parser.add_argument('--threads', type=int, default=1000)
+        parser.add_argument('--reads', type=int, default=200)
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--threshold', type=int, default=500,
+                            help="하이브리드 모드에서 fan-out on read로 넘기는 팔로워 수 기준")
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run(self, options):
+        rng = random.Random(0)
+        n = options['users']
+        User.objects.bulk_create(
+            [User(username=f"user{i}", email=f"user{i}@example.com", password='!') for i in range(n)],
+            batch_size=2000,
+        )
+        user_ids = list(User.objects.order_by('id').values_list('id', flat=True))
+        # 순위가 높을수록 많이 팔로우되는 Zipf 인기도
+        cum_weights = list(itertools.accumulate(1 / rank for rank in range(1, n + 1)))
+        through = User.followers.through
+        started = time.perf_counter()
+        rows = []
+        for follower in user_ids:
+            for author in set(rng.choices(user_ids, cum_weights=cum_weights, k=options['follows'])):
+                if author != follower:
+                    rows.append(through(from_user_id=author, to_user_id=follower))
+        through.objects.bulk_create(rows, batch_size=5000, ignore_conflicts=True)
+        reconcile_user_counters()
+        counts = sorted(User.objects.values_list('follower_count', flat=True), reverse=True)
+        self.stdout.write(
+            f"users={n} follows={len(rows)} graph={time.perf_counter() - started:.1f}s "
+            f"max_followers={counts[0]} p99_followers={counts[len(counts) // 100]} median={counts[len(counts) // 2]}"
+        )
+
+        book = Book.objects.bulk_create([Book(
+            title="bench", description="-", customer_review_rank=0, author="-", author_info="-",
+            author_works="-", isbn="-",
+        )])[0]
+        # 글 쓰는 빈도는 팔로워 수와 무관하게 균등 (인기 작가도 보통 유저만큼 씀)
+        authors = rng.choices(user_ids, k=options['threads'])
+        Thread.objects.bulk_create([
+            Thread(book=book, title=f"t{i}", content="-", reading_date="2024-01-01", user_id=author)
+            for i, author in enumerate(authors)
+        ], batch_size=2000)
+        threads = list(Thread.objects.only('id', 'user_id', 'created_at').order_by('id'))
+        readers = rng.sample(user_ids, min(options['reads'], n))
+
+        for label, threshold in (("fan-out on write", 10 ** 9), ("hybrid", options['threshold'])):
+            TimelineEntry.objects.all().delete()
+            with override_settings(FEED_FANOUT_MAX_FOLLOWERS=threshold):
+                writes = []
+                for thread in threads:
+                    started = time.perf_counter()
+                    fan_out_thread(thread)
+                    writes.append(time.perf_counter() - started)
+                reads = []
+                for reader in readers:
+                    user = User(pk=reader)
+                    started = time.perf_counter()
+                    read_feed(user, options['page_size'])
+                    reads.append(time.perf_counter() - started)
+            self.stdout.write(
+                f"{label:>17}: rows={TimelineEntry.objects.count():>9,} write total={sum(writes):6.2f}s "
+                f"{summary(writes)} | read {summary(reads)}"
+            )
+
+        reads = []
+        for reader in readers:
+            started = time.perf_counter()
+            following = User.objects.filter(followers__pk=reader).values_list('pk', flat=True)
+            list(Thread.objects.filter(user__in=following).order_by('-created_at', '-id')
+                 .values_list('id', 'created_at')[:options['page_size']])
+            reads.append(time.perf_counter() - started)
+        self.stdout.write(f"{'naive filter':>17}: read {summary(reads)} mean={statistics.mean(reads) * 1000:.2f}ms")
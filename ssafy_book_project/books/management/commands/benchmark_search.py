@@ -0,0 +1,119 @@
+import random
+import sqlite3
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from books.search import SEARCH_FIELDS, FTS5Backend, InvertedIndex, tokenize
+
+SYLLABLES = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추쿠투푸후기니디리미비시이지치키티피히"
+SURNAMES = "김이박최정강조윤장임한오서신권황안송류홍"
+PARTICLES = ['은', '는', '이', '가', '을', '를', '의', '']
+
+
+def make_vocabulary(rng, size):
+    words = {"사랑", "전쟁", "평화", "바다", "소년", "소녀", "시간", "여행", "기억", "도시"}
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+class Catalog:
+    """
+    단어 빈도가 Zipf 분포를 따르는 합성 도서 카탈로그 (실제 텍스트처럼 흔한 단어와 드문 단어가 섞임)
+    """
+    def __init__(self, rng, vocabulary_size=20000):
+        self.rng = rng
+        self.vocabulary = make_vocabulary(rng, vocabulary_size)
+        self.weights = [1 / rank for rank in range(1, len(self.vocabulary) + 1)]
+        rng.shuffle(self.vocabulary)
+
+    def words(self, k):
+        return self.rng.choices(self.vocabulary, weights=self.weights, k=k)
+
+    def book(self):
+        rng = self.rng
+        return {
+            'title': ' '.join(self.words(rng.randint(1, 3))),
+            'author': rng.choice(SURNAMES) + ''.join(rng.choice(SYLLABLES) for _ in range(2)),
+            'description': ' '.join(word + rng.choice(PARTICLES) for word in self.words(rng.randint(10, 25))),
+            'author_works': ', '.join(self.words(rng.randint(1, 3))),
+        }
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+class Command(BaseCommand):
+    help = "합성 도서 카탈로그로 FTS5 / 메모리 역색인 검색 성능을 측정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=100000)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--updates', type=int, default=1000, help="증분 색인(저장 1건) 측정 횟수")
+        parser.add_argument('--scan-queries', type=int, default=20,
+                            help="기존 방식(전체 목록을 받아 부분 문자열 필터) 비교 쿼리 수")
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        generator = Catalog(rng)
+        catalog = [generator.book() for _ in range(options['books'])]
+        started = time.perf_counter()
+        documents = [(pk, {field: tokenize(book[field]) for field in SEARCH_FIELDS})
+                     for pk, book in enumerate(catalog, start=1)]
+        self.stdout.write(f"books={len(catalog)} tokenize={time.perf_counter() - started:.2f}s")
+
+        # 제목 단어 검색 / 제목 단어 + 작가 이름 검색을 반반
+        queries = []
+        for _ in range(options['queries']):
+            book = catalog[rng.randrange(len(catalog))]
+            word = book['title'].split()[0]
+            queries.append(word if rng.random() < 0.5 else f"{word} {book['author']}")
+
+        backends = [InvertedIndex()]
+        connection = sqlite3.connect(':memory:')
+        fts = FTS5Backend(connection=connection)
+        try:
+            fts.create_table()
+            backends.insert(0, fts)
+        except sqlite3.OperationalError:
+            self.stdout.write("FTS5를 사용할 수 없는 SQLite라 메모리 역색인만 측정합니다.")
+
+        for backend in backends:
+            started = time.perf_counter()
+            for i in range(0, len(documents), 5000):
+                backend.index_many(documents[i:i + 5000])
+            build = time.perf_counter() - started
+
+            latencies = []
+            for query in queries:
+                started = time.perf_counter()
+                backend.search(tokenize(query), options['limit'])
+                latencies.append(time.perf_counter() - started)
+
+            updates = []
+            for _ in range(options['updates']):
+                pk = rng.randrange(1, len(catalog) + 1)
+                document = {field: tokenize(value) for field, value in generator.book().items()}
+                started = time.perf_counter()
+                backend.index(pk, document)
+                updates.append(time.perf_counter() - started)
+
+            self.stdout.write(
+                f"{backend.name:>6}: build={build:6.2f}s ({len(documents) / build:,.0f} books/s) "
+                f"query p50={percentile(latencies, 0.5) * 1000:7.2f}ms "
+                f"p95={percentile(latencies, 0.95) * 1000:7.2f}ms "
+                f"mean={statistics.mean(latencies) * 1000:7.2f}ms "
+                f"update p50={percentile(updates, 0.5) * 1000:6.3f}ms"
+            )
+
+        scan = []
+        for query in queries[:options['scan_queries']]:
+            started = time.perf_counter()
+            needle = query.split()[0]
+            [book for book in catalog if any(needle in book[field] for field in SEARCH_FIELDS)]
+            scan.append(time.perf_counter() - started)
+        self.stdout.write(f"  scan: query mean={statistics.mean(scan) * 1000:7.2f}ms (전체 목록 부분 문자열 필터)")
+        connection.close()
@@ -0,0 +1,57 @@
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from books.similarity import SimilarityMatrix
+
+
+def legacy_top_k(query, vectors, k):
+    # 기존 recommend_books 방식: 후보마다 1×d 코사인 유사도 계산 후 전체 정렬
+    similarities = []
+    for i, vec in enumerate(vectors):
+        sim = float(query @ vec / (np.linalg.norm(query) * np.linalg.norm(vec)))
+        similarities.append((i, sim))
+    similarities.sort(key=lambda x: x[1], reverse=True)
+    return similarities[:k]
+
+
+class Command(BaseCommand):
+    help = "SimilarityMatrix top-k 처리량을 책 수별로 측정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+        parser.add_argument('--dim', type=int, default=1024)
+        parser.add_argument('--queries', type=int, default=50)
+        parser.add_argument('--top-k', type=int, default=5)
+        parser.add_argument('--legacy-limit', type=int, default=10000,
+                            help="이 크기 이하에서만 기존 루프 방식도 측정")
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(0)
+        dim, top_k, n_queries = options['dim'], options['top_k'], options['queries']
+        for size in options['sizes']:
+            vectors = rng.standard_normal((size, dim), dtype=np.float32)
+            queries = rng.standard_normal((n_queries, dim), dtype=np.float32)
+
+            started = time.perf_counter()
+            engine = SimilarityMatrix(range(size), vectors)
+            build_ms = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            for query in queries:
+                engine.top_k(query, top_k)
+            elapsed = time.perf_counter() - started
+            line = (
+                f"books={size:>7} build={build_ms:8.1f}ms "
+                f"query={elapsed / n_queries * 1000:8.2f}ms "
+                f"qps={n_queries / elapsed:9.1f} "
+                f"books/s={size * n_queries / elapsed:,.0f}"
+            )
+
+            if size <= options['legacy_limit']:
+                legacy_queries = queries[:max(1, n_queries // 10)]
+                started = time.perf_counter()
+                for query in legacy_queries:
+                    legacy_top_k(query, vectors, top_k)
+                legacy = (time.perf_counter() - started) / len(legacy_queries)
+                line += f" legacy_query={legacy * 1000:8.2f}ms speedup={legacy / (elapsed / n_queries):6.1f}x"
+            self.stdout.write(line)
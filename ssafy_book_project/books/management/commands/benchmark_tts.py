@@ -0,0 +1,46 @@
+import tempfile
+import time
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from books.tts import OfflineTTSBackend, split_sentences, synthesize_script
+
+
+class Command(BaseCommand):
+    help = "오프라인 TTS 백엔드로 청크 병렬 합성과 해시 캐시 효과를 측정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sentences', type=int, default=40)
+        parser.add_argument('--latency-ms', type=float, default=100.0, help="청크 하나 합성에 걸리는 시간")
+        parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+
+    def handle(self, *args, **options):
+        backend = OfflineTTSBackend(latency=options['latency_ms'] / 1000)
+        sentences = [f"{i}번째 문장은 책과 작가를 소개하는 오디오 스크립트의 일부입니다." for i in range(options['sentences'])]
+        script = ' '.join(sentences)
+        self.stdout.write(f"청크 {len(split_sentences(script))}개, 스크립트 {len(script)}자")
+
+        for workers in options['workers']:
+            with tempfile.TemporaryDirectory() as media_root, \
+                    override_settings(MEDIA_ROOT=media_root, TTS_WORKERS=workers):
+                first_chunk = []
+                started = time.perf_counter()
+                synthesize_script(
+                    script, backend=backend,
+                    on_chunk=lambda index, path: first_chunk.append(time.perf_counter()) if index == 0 else None,
+                )
+                cold = time.perf_counter() - started
+                first = first_chunk[0] - started
+
+                started = time.perf_counter()
+                synthesize_script(script, backend=backend)
+                warm = time.perf_counter() - started
+
+                # 마지막 문장만 바뀐 스크립트: 나머지 청크는 재사용
+                started = time.perf_counter()
+                synthesize_script(script + " 마지막에 한 문장을 덧붙였습니다.", backend=backend)
+                edited = time.perf_counter() - started
+
+                self.stdout.write(
+                    f"workers={workers:>2} first_chunk={first * 1000:8.1f}ms cold={cold * 1000:8.1f}ms "
+                    f"warm(hash hit)={warm * 1000:6.2f}ms edited={edited * 1000:8.1f}ms"
+                )
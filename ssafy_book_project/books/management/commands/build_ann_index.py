@@ -0,0 +1,23 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from books.ann import build_book_index, save_book_index, set_book_index
+
+
+class Command(BaseCommand):
+    help = "저장된 책 임베딩으로 IVF 인덱스를 새로 만들어 디스크에 저장합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--nlist', type=int, default=None, help="클러스터 수 (기본: sqrt(책 수))")
+        parser.add_argument('--nprobe', type=int, default=None, help="기본 검색 클러스터 수")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        index = build_book_index(nlist=options['nlist'], nprobe=options['nprobe'])
+        set_book_index(index)
+        save_book_index()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(index)}권, nlist={index.nlist}, nprobe={index.nprobe} 인덱스 저장 완료 "
+            f"({elapsed:.2f}s) → {settings.ANN_INDEX_PATH}"
+        ))
@@ -0,0 +1,28 @@
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from books.models import AuthorProfile, Book
+from books.utils import AUTHOR_IMAGE_DIR, store_content_addressed
+
+
+class Command(BaseCommand):
+    help = "책마다 따로 저장된 작가 사진(author_{pk}_*.jpg)을 내용 해시 경로로 옮겨 중복을 제거합니다."
+
+    def handle(self, *args, **options):
+        media_root = Path(settings.MEDIA_ROOT)
+        legacy_paths = (
+            Book.objects.filter(author_profile_img__startswith=f"{AUTHOR_IMAGE_DIR}/author_")
+            .values_list('author_profile_img', flat=True)
+            .distinct()
+        )
+        moved, missing = 0, 0
+        for old_path in list(legacy_paths):
+            source = media_root / old_path
+            if not source.exists():
+                missing += 1
+                continue
+            new_path = store_content_addressed(source, source.suffix.lower())
+            Book.objects.filter(author_profile_img=old_path).update(author_profile_img=new_path)
+            AuthorProfile.objects.filter(profile_img=old_path).update(profile_img=new_path)
+            moved += 1
+        self.stdout.write(self.style.SUCCESS(f"작가 사진 {moved}개 정리 완료 (파일 없음 {missing}개)"))
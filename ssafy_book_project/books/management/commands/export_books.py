@@ -0,0 +1,27 @@
+import sys
+import time
+from django.core.management.base import BaseCommand
+from books.bulk import iter_export_lines
+
+
+class Command(BaseCommand):
+    help = "도서 카탈로그를 JSON Lines로 내보냅니다 (import_books 입력 형식과 같음)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='-', help="출력 파일 경로 (기본: 표준 출력)")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = 0
+        output = sys.stdout if options['output'] == '-' else open(options['output'], 'w', encoding='utf-8')
+        try:
+            for line in iter_export_lines(chunk_size=options['chunk_size']):
+                output.write(line)
+                count += 1
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        elapsed = time.perf_counter() - started
+        # 표준 출력은 데이터가 나가므로 통계는 stderr로
+        self.stderr.write(f"{count}행 내보냄 ({elapsed:.2f}s, {count / elapsed if elapsed else 0:,.0f} rows/s)")
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from books.bulk import BookImporter, detect_format, iter_rows, open_source
+
+
+class Command(BaseCommand):
+    help = "JSON Lines/CSV 도서 파일을 한 줄씩 읽어 isbn 기준으로 일괄 upsert 합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="입력 파일 경로 (- 이면 표준 입력)")
+        parser.add_argument('--format', choices=['jsonl', 'csv'], default=None, help="기본: 확장자로 판단")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--enrich', action='store_true', help="새로 만든 책의 보강 job 등록")
+        parser.add_argument('--allow-blank', nargs='+', default=[], choices=['author', 'author_info', 'author_works'],
+                            help="빈 값을 허용할 필드 (예: 보강 전 fixture는 author author_info)")
+        parser.add_argument('--show-errors', type=int, default=20, help="출력할 검증 실패 행 수")
+
+    def handle(self, *args, **options):
+        fmt = detect_format(options['path'], options['format'])
+        importer = BookImporter(
+            batch_size=options['batch_size'], enrich=options['enrich'], allow_blank=options['allow_blank']
+        )
+        try:
+            source = open_source(options['path'])
+        except OSError as e:
+            raise CommandError(e)
+        with source:
+            stats = importer.run(iter_rows(source, fmt), progress=self.progress)
+
+        for line_no, error in stats.errors[:options['show_errors']]:
+            self.stderr.write(f"{line_no}번째 줄: {error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats.read}행 읽음: 생성 {stats.created}, 갱신 {stats.updated}, 실패 {stats.invalid} "
+            f"({stats.elapsed:.2f}s, {stats.rows_per_second:,.0f} rows/s)"
+        ))
+        if stats.enqueued:
+            self.stdout.write(f"보강 job {stats.enqueued}건 등록 → run_enrichment_jobs 로 처리")
+        if stats.created or stats.updated:
+            self.stdout.write("임베딩은 backfill_embeddings, 추천은 recompute_recommendations 로 갱신하세요.")
+
+    def progress(self, stats):
+        self.stdout.write(f"  {stats.read}행 ({stats.rows_per_second:,.0f} rows/s)")
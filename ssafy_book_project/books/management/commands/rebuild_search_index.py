@@ -0,0 +1,18 @@
+import time
+from django.core.management.base import BaseCommand
+from books.search import get_search_backend, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "전체 책을 검색 역색인에 다시 색인합니다 (bulk 작업/fixture 로드 후 실행)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_search_index(batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{get_search_backend().name} 검색 색인 {count}권 완료 ({elapsed:.2f}s)"
+        ))
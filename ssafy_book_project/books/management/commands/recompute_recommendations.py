@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from books.ann import get_book_index, save_book_index
+from books.models import Book
+from books.recommendations import recompute_recommendations
+
+
+class Command(BaseCommand):
+    help = "추천 결과가 dirty인 책만 카테고리별로 다시 계산하고 카테고리 크기별 소요 시간을 출력합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="모든 책을 dirty로 표시하고 전체 재계산")
+        parser.add_argument('--top-k', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if options['all']:
+            Book.objects.update(recommendations_dirty=True)
+        timings = recompute_recommendations(top_k=options['top_k'])
+        for category_id, size, recomputed, elapsed in sorted(timings, key=lambda row: row[1]):
+            self.stdout.write(
+                f"category={category_id} books={size:>6} recomputed={recomputed:>6} "
+                f"elapsed={elapsed * 1000:9.1f}ms"
+            )
+        # ANN 인덱스 파일은 이 커맨드가 단일 writer로 저장 (웹 프로세스들은 파일이 바뀌면 다시 불러옴)
+        get_book_index()
+        save_book_index()
+        total = sum(row[2] for row in timings)
+        self.stdout.write(self.style.SUCCESS(f"{len(timings)}개 카테고리, {total}권 재계산 완료"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from books.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "댓글/좋아요/팔로워 카운터를 실제 관계 수로 다시 계산합니다."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drifted = reconcile_counters()
+        self.stdout.write(self.style.SUCCESS(
+            f"카운터 보정 완료: 쓰레드 {drifted['threads']}개, 유저 {drifted['users']}명 값이 달랐습니다."
+        ))
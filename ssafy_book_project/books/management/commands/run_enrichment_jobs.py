@@ -0,0 +1,37 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from books.jobs import run_pending_jobs
+from books.models import EnrichmentJob, EnrichmentStatus
+
+
+class Command(BaseCommand):
+    help = "대기 중인 책 정보 보강 job을 처리합니다. (서버 재시작으로 남은 job 복구 / 별도 워커 프로세스)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requeue-running', action='store_true',
+                            help="running 상태 job을 모두 즉시 대기 상태로 돌림 "
+                                 "(없어도 ENRICHMENT_STALE_SECONDS 동안 멈춘 job은 매번 자동으로 되살림)")
+        parser.add_argument('--requeue-failed', action='store_true',
+                            help="시도 횟수가 ENRICHMENT_MAX_ATTEMPTS 미만인 failed job을 다시 대기 상태로 돌림")
+        parser.add_argument('--loop', action='store_true', help="계속 대기하면서 새 job 처리")
+        parser.add_argument('--interval', type=float, default=5.0, help="--loop 폴링 간격(초)")
+
+    def handle(self, *args, **options):
+        if options['requeue_running']:
+            requeued = EnrichmentJob.objects.filter(status=EnrichmentStatus.RUNNING).update(
+                status=EnrichmentStatus.PENDING
+            )
+            self.stdout.write(f"running job {requeued}건을 다시 대기 상태로 돌렸습니다.")
+        if options['requeue_failed']:
+            requeued = EnrichmentJob.objects.filter(
+                status=EnrichmentStatus.FAILED, attempts__lt=settings.ENRICHMENT_MAX_ATTEMPTS
+            ).update(status=EnrichmentStatus.PENDING)
+            self.stdout.write(f"failed job {requeued}건을 다시 대기 상태로 돌렸습니다.")
+        while True:
+            done = run_pending_jobs()
+            if done:
+                self.stdout.write(self.style.SUCCESS(f"job {done}건 처리 완료"))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.5 on 2026-10-18 09:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0002_bookembedding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='enrichment_status',
+            field=models.CharField(choices=[('pending', '대기 중'), ('running', '진행 중'), ('done', '완료'), ('failed', '실패')], default='done', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='EnrichmentJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', '대기 중'), ('running', '진행 중'), ('done', '완료'), ('failed', '실패')], db_index=True, default='pending', max_length=10)),
+                ('stage', models.CharField(blank=True, max_length=20)),
+                ('error', models.TextField(blank=True)),
+                ('attempts', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrichment_jobs', to='books.book')),
+            ],
+        ),
+    ]
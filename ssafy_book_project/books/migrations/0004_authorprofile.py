@@ -0,0 +1,27 @@
+# Generated by Django 4.2.5 on 2026-10-18 09:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0003_book_enrichment_status_enrichmentjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('author', models.CharField(max_length=100)),
+                ('wiki_summary', models.TextField(blank=True)),
+                ('profile_img', models.CharField(blank=True, max_length=255)),
+                ('author_info', models.TextField(blank=True)),
+                ('author_works', models.CharField(blank=True, max_length=255)),
+                ('fetched_at', models.DateTimeField()),
+                ('last_used_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.5 on 2026-10-18 09:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0004_authorprofile'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='thread',
+            index=models.Index(fields=['book', '-created_at', '-id'], name='thread_book_created_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.5 on 2026-10-18 09:35
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(model, field):
+    counts = (
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(count=Count('*'))
+        .values('count')
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+def fill_counters(apps, schema_editor):
+    Thread = apps.get_model('books', 'Thread')
+    Comment = apps.get_model('books', 'Comment')
+    Thread.objects.update(
+        comment_count=count_subquery(Comment, 'thread'),
+        like_count=count_subquery(Thread.likes.through, 'thread'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0005_thread_thread_book_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='thread',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='thread',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.5 on 2026-10-18 10:05
+
+import re
+import unicodedata
+from django.db import migrations
+from django.db.utils import OperationalError
+
+SEARCH_FIELDS = ('title', 'author', 'description', 'author_works')
+WORD_RE = re.compile(r'[0-9a-z]+|[^\W0-9a-z_]+')
+
+
+def tokenize(text):
+    # books.search.tokenize 시점 복사본
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    tokens = []
+    for word in WORD_RE.findall(text):
+        if word.isascii() or len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def create_fts_table(apps, schema_editor):
+    # FTS5 확장이 없는 SQLite나 다른 DB에서는 메모리 역색인을 사용하므로 건너뜀
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS books_book_fts "
+            "USING fts5(title, author, description, author_works)"
+        )
+    except OperationalError:
+        return
+    Book = apps.get_model('books', 'Book')
+    rows = [
+        [book.pk, *(' '.join(tokenize(getattr(book, field))) for field in SEARCH_FIELDS)]
+        for book in Book.objects.only('id', *SEARCH_FIELDS).iterator(chunk_size=2000)
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            "INSERT INTO books_book_fts(rowid, title, author, description, author_works) VALUES (%s, %s, %s, %s, %s)",
+            rows,
+        )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS books_book_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0007_book_recommendations_dirty_bookrecommendation_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.5 on 2026-10-18 10:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0009_timelineentry_thread_user_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['thread', 'created_at', 'id'], name='comment_thread_created_idx'),
+        ),
+    ]
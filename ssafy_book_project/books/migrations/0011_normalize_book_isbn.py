@@ -0,0 +1,105 @@
+# Generated by Django 4.2.5 on 2026-10-18 10:23
+
+import re
+from collections import defaultdict
+from django.db import migrations, models
+
+SEPARATORS = re.compile(r'[\s\-]')
+
+
+def isbn13_check_digit(first12):
+    total = sum(int(digit) * (3 if i % 2 else 1) for i, digit in enumerate(first12))
+    return str((10 - total % 10) % 10)
+
+
+def isbn10_check_digit(first9):
+    total = sum(int(digit) * (10 - i) for i, digit in enumerate(first9))
+    check = (11 - total % 11) % 11
+    return 'X' if check == 10 else str(check)
+
+
+def normalize_isbn(value):
+    # books.isbn.normalize_isbn 시점 복사본 (형식/체크 숫자가 틀리면 None)
+    isbn = SEPARATORS.sub('', str(value or '')).upper()
+    if len(isbn) == 10 and isbn[:9].isdigit() and isbn10_check_digit(isbn[:9]) == isbn[9]:
+        first12 = '978' + isbn[:9]
+        return first12 + isbn13_check_digit(first12)
+    if len(isbn) == 13 and isbn.isdigit() and isbn13_check_digit(isbn[:12]) == isbn[12]:
+        return isbn
+    return None
+
+
+def normalize_and_dedupe(apps, schema_editor):
+    """
+    - 올바른 ISBN은 ISBN-13으로 통일하고, 같은 ISBN인 책은 가장 먼저 등록된 책 하나만 남김
+      (지워지는 책의 쓰레드는 남는 책으로 옮기고, 임베딩/추천/보강 job은 CASCADE 삭제)
+    - 잘못된 ISBN은 isbn을 NULL로 두고 원래 값을 isbn_raw에 그대로 보관 (합치지 않음)
+    """
+    Book = apps.get_model('books', 'Book')
+    Thread = apps.get_model('books', 'Thread')
+    groups = defaultdict(list)
+    categories = {}
+    invalid = []
+    for pk, isbn, category_id in Book.objects.order_by('pk').values_list('pk', 'isbn', 'category_id').iterator(chunk_size=2000):
+        categories[pk] = category_id
+        normalized = normalize_isbn(isbn)
+        if normalized:
+            groups[normalized].append(pk)
+        else:
+            invalid.append((pk, isbn or ''))
+
+    duplicates = []
+    for isbn, pks in groups.items():
+        keeper, *others = pks
+        if others:
+            Thread.objects.filter(book_id__in=others).update(book_id=keeper)
+            duplicates += others
+    if duplicates:
+        # 지워지는 책이 있던 카테고리의 추천만 다시 계산
+        affected = {categories[pk] for pk in duplicates}
+        Book.objects.filter(pk__in=duplicates).delete()
+        dirty = Book.objects.filter(category_id__in=affected - {None})
+        if None in affected:
+            dirty = dirty | Book.objects.filter(category_id__isnull=True)
+        dirty.update(recommendations_dirty=True)
+        if schema_editor.connection.vendor == 'sqlite' and 'books_book_fts' in schema_editor.connection.introspection.table_names():
+            with schema_editor.connection.cursor() as cursor:
+                cursor.executemany("DELETE FROM books_book_fts WHERE rowid = %s", [[pk] for pk in duplicates])
+
+    for isbn, pks in groups.items():
+        Book.objects.filter(pk=pks[0]).update(isbn=isbn)
+    for pk, raw in invalid:
+        Book.objects.filter(pk=pk).update(isbn=None, isbn_raw=raw)
+
+
+def restore_raw_isbn(apps, schema_editor):
+    # 되돌릴 때는 NULL로 둔 잘못된 ISBN만 원래 값으로 (합친 책과 정규화는 되돌리지 않음)
+    Book = apps.get_model('books', 'Book')
+    for pk, raw in Book.objects.filter(isbn__isnull=True).values_list('pk', 'isbn_raw').iterator(chunk_size=2000):
+        Book.objects.filter(pk=pk).update(isbn=raw)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0010_comment_comment_thread_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='isbn_raw',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='book',
+            name='isbn',
+            field=models.TextField(null=True),
+        ),
+        migrations.RunPython(normalize_and_dedupe, restore_raw_isbn),
+        migrations.AlterField(
+            model_name='book',
+            name='isbn',
+            field=models.CharField(blank=True, max_length=13, null=True, unique=True),
+        ),
+    ]
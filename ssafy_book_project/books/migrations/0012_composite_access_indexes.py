@@ -0,0 +1,58 @@
+# Generated by Django 4.2.5 on 2026-10-18 10:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('books', '0011_normalize_book_isbn'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='book',
+            name='recommendations_dirty',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='thread',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='books.thread'),
+        ),
+        migrations.AlterField(
+            model_name='enrichmentjob',
+            name='book',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='enrichment_jobs', to='books.book'),
+        ),
+        migrations.AlterField(
+            model_name='enrichmentjob',
+            name='status',
+            field=models.CharField(choices=[('pending', '대기 중'), ('running', '진행 중'), ('done', '완료'), ('failed', '실패')], default='pending', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='thread',
+            name='book',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='threads', to='books.book'),
+        ),
+        migrations.AlterField(
+            model_name='thread',
+            name='user',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='threads', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(condition=models.Q(('recommendations_dirty', True)), fields=['category'], name='book_dirty_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrichmentjob',
+            index=models.Index(fields=['book', '-created_at'], name='enrichmentjob_book_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrichmentjob',
+            index=models.Index(fields=['status', 'created_at'], name='enrichmentjob_status_idx'),
+        ),
+    ]
@@ -1,3 +1,4 @@
+import numpy as np
 from django.db import models
 from accounts.models import User
 from django.conf import settings
@@ -8,6 +9,12 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+class EnrichmentStatus(models.TextChoices):
+    PENDING = 'pending', '대기 중'
+    RUNNING = 'running', '진행 중'
+    DONE = 'done', '완료'
+    FAILED = 'failed', '실패'
+
 class Book(models.Model):
     title = models.CharField(max_length=20)
     description = models.TextField()
@@ -19,14 +26,102 @@ class Book(models.Model):
     cover_image = models.ImageField(blank=True)
     audio_file = models.FileField(upload_to="tts/", blank=True, null=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True)
-    isbn = models.TextField()
+    # 하이픈 없는 ISBN-13 (books.isbn.normalize_isbn), 중복 등록 방지 + 조회용 unique 인덱스
+    # 정규화할 수 없는 기존 값은 NULL로 두고 원래 값을 isbn_raw에 보관 (NULL끼리는 unique 충돌 없음)
+    isbn = models.CharField(max_length=13, unique=True, null=True, blank=True)
+    isbn_raw = models.TextField(blank=True)
     category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, blank=True)
+    # 위키피디아/GPT/TTS 보강 작업 진행 상태
+    enrichment_status = models.CharField(max_length=10, choices=EnrichmentStatus.choices, default=EnrichmentStatus.DONE)
+    # 임베딩/카테고리가 바뀌어 추천 결과를 다시 계산해야 하는 책
+    recommendations_dirty = models.BooleanField(default=True)
+
+    class Meta:
+        indexes = [
+            # dirty 책만 담는 부분 인덱스: 재계산 대상 카테고리 목록(DISTINCT category_id)과 카테고리별 dirty 책 조회
+            # (filter(recommendations_dirty=True)는 "WHERE recommendations_dirty"로 나가서 일반 인덱스를 못 탐)
+            models.Index(fields=['category'], condition=models.Q(recommendations_dirty=True), name='book_dirty_category_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 저장 시 카테고리/description 변경 여부를 알 수 있도록 불러올 때의 값 보관
+        instance._loaded_category_id = instance.__dict__.get('category_id')
+        instance._loaded_description = instance.__dict__.get('description')
+        return instance
+
+class BookEmbedding(models.Model):
+    # description + 모델 버전 해시가 같으면 재계산하지 않음
+    book = models.OneToOneField(Book, related_name='embedding', on_delete=models.CASCADE)
+    content_hash = models.CharField(max_length=64)
+    model_version = models.CharField(max_length=50)
+    dimension = models.IntegerField()
+    vector = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 저장 시 벡터가 실제로 바뀌었는지 알 수 있도록 불러올 때의 값 보관
+        vector = instance.__dict__.get('vector')
+        instance._loaded_vector = bytes(vector) if vector is not None else None
+        return instance
+
+    def as_array(self):
+        return np.frombuffer(self.vector, dtype=np.float32)
+
+class BookRecommendation(models.Model):
+    # 책별 미리 계산해둔 top-k 유사 도서
+    book = models.ForeignKey(Book, related_name='recommendations', on_delete=models.CASCADE)
+    recommended = models.ForeignKey(Book, related_name='+', on_delete=models.CASCADE)
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['book', 'rank'], name='recommendation_book_rank_uniq'),
+        ]
+
+class AuthorProfile(models.Model):
+    # 작가 단위 위키피디아/GPT 결과 캐시 (같은 작가의 책끼리 공유)
+    key = models.CharField(max_length=64, unique=True)
+    author = models.CharField(max_length=100)
+    wiki_summary = models.TextField(blank=True)
+    profile_img = models.CharField(max_length=255, blank=True)
+    author_info = models.TextField(blank=True)
+    author_works = models.CharField(max_length=255, blank=True)
+    fetched_at = models.DateTimeField()
+    last_used_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.author
+
+class EnrichmentJob(models.Model):
+    # 책 정보 보강 작업 큐 (DB 테이블이 곧 job store)
+    # FK 단일 인덱스 대신 아래 (book, created_at) 인덱스 사용
+    book = models.ForeignKey(Book, related_name='enrichment_jobs', on_delete=models.CASCADE, db_index=False)
+    status = models.CharField(max_length=10, choices=EnrichmentStatus.choices, default=EnrichmentStatus.PENDING)
+    stage = models.CharField(max_length=20, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # 책의 최근 보강 작업 (book_id = ? ORDER BY created_at DESC LIMIT 1)
+            models.Index(fields=['book', '-created_at'], name='enrichmentjob_book_created_idx'),
+            # 대기 중인 작업을 오래된 순으로 (status = ? ORDER BY created_at)
+            models.Index(fields=['status', 'created_at'], name='enrichmentjob_status_idx'),
+        ]
+
 class Thread(models.Model):
-    book = models.ForeignKey(Book, related_name='threads', on_delete=models.CASCADE)
+    # book/user FK는 Meta.indexes의 복합 인덱스가 앞 컬럼으로 대신하므로 단일 인덱스를 만들지 않음
+    book = models.ForeignKey(Book, related_name='threads', on_delete=models.CASCADE, db_index=False)
     title = models.CharField(max_length=20)
     content = models.TextField()
     reading_date = models.DateField()
@@ -34,11 +129,47 @@ class Thread(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     likes = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='liked_threads', blank=True)
-    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, related_name='threads')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, related_name='threads', db_index=False)
+    # 비정규화 카운터 (signals에서 F()로 갱신, reconcile_counters 커맨드로 보정)
+    comment_count = models.PositiveIntegerField(default=0)
+    like_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # 책별 쓰레드 목록 (book_id = ? ORDER BY created_at DESC, id DESC)
+            models.Index(fields=['book', '-created_at', '-id'], name='thread_book_created_idx'),
+            # 작성자별 최근 쓰레드 (홈 피드 fan-out on read)
+            models.Index(fields=['user', '-created_at', '-id'], name='thread_user_created_idx'),
+        ]
+
+class TimelineEntry(models.Model):
+    # 유저별 홈 피드 타임라인 (쓰레드 작성 시 작성자의 팔로워들에게 미리 기록)
+    owner = models.ForeignKey(User, related_name='timeline', on_delete=models.CASCADE)
+    thread = models.ForeignKey(Thread, related_name='+', on_delete=models.CASCADE)
+    author = models.ForeignKey(User, related_name='+', on_delete=models.CASCADE)
+    # 쓰레드 작성 시각 복사본 (thread 조인 없이 인덱스 순서대로 읽기 위함)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'thread'], name='timeline_owner_thread_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['owner', '-created_at', '-thread'], name='timeline_owner_created_idx'),
+            # 언팔로우 시 해당 작성자 항목 삭제
+            models.Index(fields=['owner', 'author'], name='timeline_owner_author_idx'),
+        ]
 
 class Comment(models.Model):
-    thread = models.ForeignKey(Thread, related_name='comments', on_delete=models.CASCADE)
+    # (thread, created_at, id) 인덱스가 thread_id 조회도 처리
+    thread = models.ForeignKey(Thread, related_name='comments', on_delete=models.CASCADE, db_index=False)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, related_name='comments')
+
+    class Meta:
+        indexes = [
+            # 쓰레드별 댓글 목록 (thread_id = ? ORDER BY created_at, id)
+            models.Index(fields=['thread', 'created_at', 'id'], name='comment_thread_created_idx'),
+        ]
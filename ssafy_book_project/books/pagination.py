@@ -0,0 +1,65 @@
+from rest_framework.pagination import CursorPagination
+from rest_framework.serializers import BaseSerializer
+
+
+class BaseCursorPagination(CursorPagination):
+    # 기본 20개, ?page_size= 로 최대 100개
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class BookCursorPagination(BaseCursorPagination):
+    # id는 유일하고 변하지 않아서 커서 기준으로 안정적 (새 책이 추가돼도 페이지가 밀리지 않음)
+    ordering = '-id'
+
+
+class ThreadCursorPagination(BaseCursorPagination):
+    # (book_id, created_at, id) 인덱스 순서 그대로 읽음
+    ordering = ('-created_at', '-id')
+
+
+class CommentCursorPagination(BaseCursorPagination):
+    # 쓰레드 안에서 오래된 댓글부터, (thread_id, created_at, id) 인덱스 순서 그대로 읽음
+    ordering = ('created_at', 'id')
+
+
+def requested_fields(request, serializer_class, default_fields=None):
+    """
+    ?fields=id,title 로 요청한 필드 중 serializer에 있는 필드만
+    (없으면 default_fields, default_fields도 없으면 전체)
+    """
+    available = serializer_class.Meta.fields
+    default = [name for name in available if name in default_fields] if default_fields else list(available)
+    param = request.query_params.get('fields')
+    if not param:
+        return default
+    requested = {name.strip() for name in param.split(',')}
+    return [name for name in available if name in requested] or default
+
+
+def project_queryset(queryset, serializer_class, fields):
+    """
+    응답에 필요한 컬럼만 불러오도록 .only() 적용, 중첩 serializer 관계는 select_related
+    """
+    model = queryset.model
+    declared = serializer_class._declared_fields
+    concrete = {field.name for field in model._meta.concrete_fields}
+    columns, related = ['id'], []
+    for name in fields:
+        if name not in concrete:
+            continue
+        columns.append(name)
+        if isinstance(declared.get(name), BaseSerializer):
+            related.append(name)
+    if related:
+        queryset = queryset.select_related(*related)
+    return queryset.only(*columns)
+
+
+def paginate(request, queryset, serializer_class, pagination_class=BookCursorPagination, default_fields=None):
+    fields = requested_fields(request, serializer_class, default_fields)
+    paginator = pagination_class()
+    page = paginator.paginate_queryset(project_queryset(queryset, serializer_class, fields), request)
+    serializer = serializer_class(page, many=True, fields=fields)
+    return paginator.get_paginated_response(serializer.data)
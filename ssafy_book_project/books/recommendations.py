@@ -0,0 +1,101 @@
+import threading
+import time
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from .models import Book, BookRecommendation
+from .embeddings import load_embeddings
+from .similarity import SimilarityMatrix
+from .ann import search_similar_books
+from .cache import bump_version
+from .jobs import get_executor
+
+_scheduled = threading.Event()
+
+
+def mark_category_dirty(*category_ids):
+    """
+    카테고리 안의 책이 추가/수정/삭제되면 같은 카테고리 책들의 top-k가 바뀔 수 있으므로 모두 dirty 처리
+    """
+    for category_id in set(category_ids):
+        Book.objects.filter(category_id=category_id).update(recommendations_dirty=True)
+    transaction.on_commit(schedule_recompute)
+
+
+def schedule_recompute():
+    # 이미 예약된 재계산이 있으면 그 실행이 새 dirty 책까지 같이 처리
+    if not settings.RECOMMENDATION_ASYNC or _scheduled.is_set():
+        return
+    _scheduled.set()
+    get_executor('recommendations', 1).submit(_run_scheduled)
+
+
+def _run_scheduled():
+    close_old_connections()
+    try:
+        _scheduled.clear()
+        recompute_recommendations()
+    except Exception as e:
+        print("추천 재계산 에러:", e)
+    finally:
+        close_old_connections()
+
+
+def _rank_category(category_id, books, dirty_ids, top_k):
+    vectors = load_embeddings(books)
+    if category_id is None:
+        # 카테고리 없는 책은 전체 카탈로그 ANN 인덱스에서 추천
+        return {pk: search_similar_books(pk, vectors[pk], top_k) for pk in dirty_ids}
+    engine = SimilarityMatrix.from_dict(vectors)
+    return engine.top_k_batch(dirty_ids, top_k)
+
+
+def recompute_category(category_id, top_k=None):
+    """
+    카테고리의 dirty 책들만 다시 계산해서 저장, (카테고리 책 수, 재계산 책 수, 소요 시간) 반환
+    """
+    top_k = top_k or settings.RECOMMENDATION_TOP_K
+    started = time.perf_counter()
+    dirty_books = Book.objects.filter(category_id=category_id, recommendations_dirty=True)
+    dirty_ids = list(dirty_books.values_list('pk', flat=True))
+    if not dirty_ids:
+        return 0, 0, 0.0
+    # 계산 도중 다시 dirty가 된 책은 다음 실행에서 처리되도록 먼저 플래그를 내림
+    Book.objects.filter(pk__in=dirty_ids).update(recommendations_dirty=False)
+    if category_id is None:
+        books = list(Book.objects.filter(pk__in=dirty_ids).only('id', 'description'))
+    else:
+        books = list(Book.objects.filter(category_id=category_id).only('id', 'description'))
+    try:
+        ranked = _rank_category(category_id, books, dirty_ids, top_k)
+    except Exception:
+        Book.objects.filter(pk__in=dirty_ids).update(recommendations_dirty=True)
+        raise
+    rows = [
+        BookRecommendation(book_id=pk, recommended_id=recommended_id, rank=rank, score=score)
+        for pk, neighbours in ranked.items()
+        for rank, (recommended_id, score) in enumerate(neighbours)
+    ]
+    with transaction.atomic():
+        BookRecommendation.objects.filter(book_id__in=dirty_ids).delete()
+        BookRecommendation.objects.bulk_create(rows, batch_size=1000)
+    return len(books), len(dirty_ids), time.perf_counter() - started
+
+
+def recompute_recommendations(top_k=None):
+    """
+    dirty 책이 있는 카테고리만 재계산, [(category_id, 카테고리 책 수, 재계산 책 수, 초)] 반환
+    """
+    category_ids = list(
+        Book.objects.filter(recommendations_dirty=True)
+        .order_by()
+        .values_list('category_id', flat=True)
+        .distinct()
+    )
+    timings = []
+    for category_id in category_ids:
+        size, recomputed, elapsed = recompute_category(category_id, top_k)
+        if recomputed:
+            timings.append((category_id, size, recomputed, elapsed))
+    if timings:
+        bump_version('recommendations')
+    return timings
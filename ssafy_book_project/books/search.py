@@ -0,0 +1,365 @@
+import heapq
+import math
+import re
+import sqlite3
+import sys
+import threading
+import unicodedata
+from collections import defaultdict
+from operator import itemgetter
+from django.conf import settings
+from django.db import close_old_connections, connection as default_connection, connections, router
+
+SEARCH_FIELDS = ('title', 'author', 'description', 'author_works')
+# BM25 필드 가중치 (제목/작가 일치가 설명 일치보다 중요)
+FIELD_WEIGHTS = {'title': 4.0, 'author': 3.0, 'description': 1.0, 'author_works': 2.0}
+FTS_TABLE = 'books_book_fts'
+
+# 영문/숫자 단어와 그 외 문자(한글, 한자 등) 구간을 따로 나눔 ("BTS노래" → "bts", "노래")
+WORD_RE = re.compile(r'[0-9a-z]+|[^\W0-9a-z_]+')
+
+
+def tokenize(text):
+    """
+    검색용 토큰 리스트
+    - 영문/숫자는 단어 그대로
+    - 한글처럼 띄어쓰기/조사로 단어 경계를 알기 어려운 구간은 글자 bigram ("헤르만" → "헤르", "르만")
+    - 한 글자 구간은 그 글자 하나
+    """
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    tokens = []
+    for word in WORD_RE.findall(text):
+        if word.isascii() or len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def book_document(book):
+    return {field: tokenize(getattr(book, field)) for field in SEARCH_FIELDS}
+
+
+class FTS5Backend:
+    """
+    SQLite FTS5 가상 테이블 (rowid = 책 id)
+    토큰화는 tokenize()로 미리 해서 공백으로 이어 저장하고, 점수는 FTS5 내장 bm25()
+    """
+    name = 'fts5'
+
+    def __init__(self, connection=None, table=FTS_TABLE):
+        # connection: 기본은 Django DB 연결, 벤치마크에서는 sqlite3 연결을 직접 넘길 수 있음
+        self.connection = connection
+        self.table = table
+
+    def _execute(self, sql, params=(), many=False, read=False):
+        connection = self.connection or self._django_connection(read)
+        if isinstance(connection, sqlite3.Connection):
+            sql = sql.replace('%s', '?')
+        cursor = connection.cursor()
+        try:
+            if many:
+                cursor.executemany(sql, params)
+                return None
+            cursor.execute(sql, params)
+            return cursor.fetchall() if cursor.description else None
+        finally:
+            cursor.close()
+
+    def _django_connection(self, read):
+        # 검색 조회는 ORM 조회처럼 라우터를 따름 (읽기 요청이면 replica), 색인 변경은 primary
+        from .models import Book
+
+        return connections[router.db_for_read(Book) if read else router.db_for_write(Book)]
+
+    def create_table(self):
+        columns = ', '.join(SEARCH_FIELDS)
+        self._execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5({columns})")
+
+    def _row(self, book_id, document):
+        return [book_id, *(' '.join(document[field]) for field in SEARCH_FIELDS)]
+
+    def index_many(self, documents):
+        # documents: [(책 id, book_document)]
+        documents = list(documents)
+        columns = ', '.join(SEARCH_FIELDS)
+        placeholders = ', '.join(['%s'] * len(SEARCH_FIELDS))
+        self._execute(f"DELETE FROM {self.table} WHERE rowid = %s", [[book_id] for book_id, _ in documents], many=True)
+        self._execute(
+            f"INSERT INTO {self.table}(rowid, {columns}) VALUES (%s, {placeholders})",
+            [self._row(book_id, document) for book_id, document in documents],
+            many=True,
+        )
+
+    def index(self, book_id, document):
+        self.index_many([(book_id, document)])
+
+    def remove(self, book_id):
+        self._execute(f"DELETE FROM {self.table} WHERE rowid = %s", [book_id])
+
+    def clear(self):
+        self._execute(f"DELETE FROM {self.table}")
+
+    def search(self, tokens, limit, fields=None):
+        terms = ' OR '.join(f'"{token}"' for token in dict.fromkeys(tokens))
+        if not terms:
+            return []
+        if fields:
+            terms = f"{{{' '.join(fields)}}}: ({terms})"
+        weights = ', '.join(str(FIELD_WEIGHTS[field]) for field in SEARCH_FIELDS)
+        rows = self._execute(
+            f"SELECT rowid, bm25({self.table}, {weights}) AS score FROM {self.table} "
+            f"WHERE {self.table} MATCH %s ORDER BY score LIMIT %s",
+            [terms, limit],
+            read=True,
+        )
+        # FTS5 bm25()는 관련도가 높을수록 작은(음수) 값
+        return [(book_id, -score) for book_id, score in rows]
+
+
+class SearchIndexNotReady(Exception):
+    """
+    메모리 역색인을 아직 빌드하는 중 (FTS5를 쓸 수 없는 환경에서 프로세스 시작 직후)
+    """
+
+
+class InvertedIndex:
+    """
+    프로세스 메모리 역색인 (FTS5를 쓸 수 없을 때 사용)
+    토큰 → {책 id: 필드별 tf를 8비트씩 묶은 정수}, 필드 가중치를 tf에 곱하는 BM25F 방식으로 점수 계산
+    """
+    name = 'memory'
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(dict)
+        self.doc_lengths = {}  # 책 id → 필드별 토큰 수
+        self.doc_terms = {}  # 책 id → 토큰 목록 (삭제 시 postings 정리용)
+        self.total_lengths = [0] * len(SEARCH_FIELDS)
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def index(self, book_id, document):
+        packed = defaultdict(int)
+        for i, field in enumerate(SEARCH_FIELDS):
+            counts = defaultdict(int)
+            for token in document[field]:
+                counts[token] += 1
+            for token, count in counts.items():
+                packed[token] |= min(count, 0xFF) << (8 * i)
+        lengths = tuple(len(document[field]) for field in SEARCH_FIELDS)
+        with self._lock:
+            self.remove(book_id)
+            terms = []
+            for token, value in packed.items():
+                # 같은 토큰 문자열 객체를 공유해서 메모리 절약
+                token = sys.intern(token)
+                self.postings[token][book_id] = value
+                terms.append(token)
+            self.doc_terms[book_id] = tuple(terms)
+            self.doc_lengths[book_id] = lengths
+            for i, length in enumerate(lengths):
+                self.total_lengths[i] += length
+
+    def index_many(self, documents):
+        for book_id, document in documents:
+            self.index(book_id, document)
+
+    def index_missing(self, documents):
+        # 전체 빌드용: 빌드 도중 시그널로 먼저 색인된 (더 최신) 문서는 덮어쓰지 않음
+        for book_id, document in documents:
+            with self._lock:
+                if book_id not in self.doc_lengths:
+                    self.index(book_id, document)
+
+    def remove(self, book_id):
+        with self._lock:
+            lengths = self.doc_lengths.pop(book_id, None)
+            if lengths is None:
+                return False
+            for token in self.doc_terms.pop(book_id):
+                posting = self.postings[token]
+                posting.pop(book_id, None)
+                if not posting:
+                    del self.postings[token]
+            for i, length in enumerate(lengths):
+                self.total_lengths[i] -= length
+            return True
+
+    def clear(self):
+        with self._lock:
+            self.postings.clear()
+            self.doc_lengths.clear()
+            self.doc_terms.clear()
+            self.total_lengths = [0] * len(SEARCH_FIELDS)
+
+    def search(self, tokens, limit, fields=None):
+        field_ids = [SEARCH_FIELDS.index(field) for field in fields or SEARCH_FIELDS]
+        weights = [FIELD_WEIGHTS[SEARCH_FIELDS[i]] for i in field_ids]
+        k1, b = self.k1, self.b
+        scores = defaultdict(float)
+        norms = {}  # 책 id → 문서 길이 정규화 값 (쿼리 안에서 재사용)
+        with self._lock:
+            n = len(self.doc_lengths)
+            if not n:
+                return []
+            avgdl = sum(w * self.total_lengths[i] for w, i in zip(weights, field_ids)) / n or 1.0
+            for token in dict.fromkeys(tokens):
+                posting = self.postings.get(token)
+                if not posting:
+                    continue
+                # 서로 다른 packed 값은 몇 개 안 되므로 가중 tf를 값 단위로 계산해 재사용
+                weighted_tf = {}
+                matches = []
+                for book_id, packed in posting.items():
+                    tf = weighted_tf.get(packed)
+                    if tf is None:
+                        tf = weighted_tf[packed] = sum(w * ((packed >> (8 * i)) & 0xFF) for w, i in zip(weights, field_ids))
+                    if tf:
+                        matches.append((book_id, tf))
+                idf = math.log(1 + (n - len(matches) + 0.5) / (len(matches) + 0.5))
+                for book_id, tf in matches:
+                    norm = norms.get(book_id)
+                    if norm is None:
+                        lengths = self.doc_lengths[book_id]
+                        dl = sum(w * lengths[i] for w, i in zip(weights, field_ids))
+                        norm = norms[book_id] = k1 * (1 - b + b * dl / avgdl)
+                    scores[book_id] += idf * tf * (k1 + 1) / (tf + norm)
+        return heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+
+
+def fts5_available(connection=None):
+    connection = connection or default_connection
+    return connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names()
+
+
+def iter_book_documents(queryset=None, chunk_size=2000):
+    from .models import Book
+
+    queryset = Book.objects.all() if queryset is None else queryset
+    for book in queryset.only('id', *SEARCH_FIELDS).iterator(chunk_size=chunk_size):
+        yield book.pk, book_document(book)
+
+
+_backend = None
+_backend_lock = threading.RLock()
+_backend_ready = threading.Event()
+
+
+def get_search_backend(build=True):
+    """
+    SEARCH_BACKEND 설정에 따른 프로세스 단위 검색 백엔드
+    auto: FTS5 테이블이 있으면 FTS5, 없으면 메모리 역색인
+    메모리 역색인은 요청 안에서 빌드하지 않고 SEARCH_BUILD_ASYNC면 백그라운드에서 채움 (그동안 검색은 SearchIndexNotReady)
+    build=False면 빈 역색인만 만들고 빌드는 호출한 쪽에 맡김 (rebuild_search_index)
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            backend = settings.SEARCH_BACKEND
+            if backend == 'fts5' or (backend == 'auto' and fts5_available()):
+                _backend = FTS5Backend()
+                _backend_ready.set()
+            else:
+                # 메모리 역색인은 프로세스마다 따로 유지되므로 여러 워커 환경에서는 FTS5 사용 권장
+                _backend = InvertedIndex()
+                _backend_ready.clear()
+                if build:
+                    schedule_build(_backend)
+        return _backend
+
+
+def schedule_build(index):
+    if not settings.SEARCH_BUILD_ASYNC:
+        _build_memory_index(index)
+        return
+    from .jobs import get_executor
+
+    get_executor('search_index', 1).submit(_run_build, index)
+
+
+def _build_memory_index(index):
+    index.index_missing(iter_book_documents())
+    _backend_ready.set()
+
+
+def _run_build(index):
+    close_old_connections()
+    try:
+        _build_memory_index(index)
+    except Exception as e:
+        print("검색 색인 빌드 에러:", e)
+        # 다음 get_search_backend 호출에서 다시 빌드
+        with _backend_lock:
+            if _backend is index:
+                set_search_backend(None)
+    finally:
+        close_old_connections()
+
+
+def warm_search_backend():
+    """
+    웹 프로세스 시작 시(wsgi/asgi) 호출해서 첫 검색 요청 전에 색인 준비를 시작
+    """
+    try:
+        get_search_backend()
+    except Exception as e:
+        print("검색 색인 준비 에러:", e)
+
+
+def search_backend_ready():
+    return _backend is not None and _backend_ready.is_set()
+
+
+def set_search_backend(backend):
+    global _backend
+    with _backend_lock:
+        _backend = backend
+        if backend is None:
+            _backend_ready.clear()
+        else:
+            _backend_ready.set()
+
+
+def update_search_index(book):
+    get_search_backend().index(book.pk, book_document(book))
+
+
+def remove_from_search_index(book_id):
+    get_search_backend().remove(book_id)
+
+
+def rebuild_search_index(batch_size=2000):
+    """
+    전체 책을 다시 색인 (bulk_create/update처럼 시그널을 거치지 않은 변경 반영용), 색인한 책 수 반환
+    """
+    backend = get_search_backend(build=False)
+    backend.clear()
+    count = 0
+    batch = []
+    for item in iter_book_documents(chunk_size=batch_size):
+        batch.append(item)
+        if len(batch) >= batch_size:
+            backend.index_many(batch)
+            count += len(batch)
+            batch = []
+    backend.index_many(batch)
+    _backend_ready.set()
+    return count + len(batch)
+
+
+def search_books(query, limit=20, fields=None):
+    """
+    [(책 id, BM25 점수)] 점수 높은 순
+    메모리 역색인을 빌드하는 중이면 SearchIndexNotReady
+    """
+    tokens = tokenize(query)
+    if not tokens or limit <= 0:
+        return []
+    backend = get_search_backend()
+    if not _backend_ready.is_set():
+        raise SearchIndexNotReady("검색 색인을 준비하는 중입니다.")
+    return backend.search(tokens, limit, fields=fields)
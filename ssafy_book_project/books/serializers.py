@@ -1,7 +1,61 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
-from .models import Book, Thread, Category, Comment
+from rest_framework.validators import UniqueValidator
+from .models import Book, Thread, Category, Comment, EnrichmentJob
+from .isbn import normalize_isbn
 from drf_spectacular.utils import extend_schema_field
 
+
+def _plan_relations(serializer_class, prefix=''):
+    """
+    serializer에 선언된 관계를 따라가며 select_related / prefetch_related 목록 생성
+    - 중첩 serializer(FK) → select_related, 중첩 serializer(many=True) → Prefetch
+    - Meta.select_related / Meta.prefetch_related 로 추가 관계 선언 가능
+    """
+    meta = serializer_class.Meta
+    select = [prefix + name for name in getattr(meta, 'select_related', ())]
+    prefetch = [prefix + name for name in getattr(meta, 'prefetch_related', ())]
+    for name, field in serializer_class._declared_fields.items():
+        many = isinstance(field, serializers.ListSerializer)
+        child = field.child if many else field
+        if not isinstance(child, serializers.ModelSerializer):
+            continue
+        source = prefix + (field.source or name)
+        if many:
+            child_queryset = eager_load(child.Meta.model.objects.all(), type(child))
+            prefetch.append(Prefetch(source, queryset=child_queryset))
+        else:
+            select.append(source)
+            child_select, child_prefetch = _plan_relations(type(child), source + '__')
+            select += child_select
+            prefetch += child_prefetch
+    return select, prefetch
+
+
+def eager_load(queryset, serializer_class):
+    """
+    serializer가 필요로 하는 관계/집계를 미리 불러오는 queryset (N+1 쿼리 방지)
+    """
+    select, prefetch = _plan_relations(serializer_class)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    annotations = getattr(serializer_class.Meta, 'annotations', None)
+    if annotations:
+        queryset = queryset.annotate(**annotations)
+    return queryset
+
+
+class DynamicFieldsMixin:
+    # fields=[...] 로 응답에 포함할 필드를 고를 수 있는 serializer
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
 class BookTitleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Book
@@ -13,31 +67,37 @@ class ThreadTitleSerializer(serializers.ModelSerializer):
         fields = ('title',)
 
 class CommentDetailSerializer(serializers.ModelSerializer):
-    thread = ThreadTitleSerializer(read_only=True)
-
+    # 쓰레드 안의 댓글 목록용 (부모 쓰레드는 이미 알고 있으므로 중첩하지 않음)
     class Meta:
         model = Comment
-        fields = ('id', 'content', 'created_at', 'updated_at', 'thread')
+        fields = ('id', 'content', 'created_at', 'updated_at')
 
 class ThreadListSerializer(serializers.ModelSerializer):
     book = BookTitleSerializer(read_only=True)
+    num_of_comments = serializers.IntegerField(source='comment_count', read_only=True)
+    num_of_likes = serializers.IntegerField(source='like_count', read_only=True)
 
     class Meta:
         model = Thread
-        fields = ('id', 'title', 'book')
+        fields = ('id', 'title', 'book', 'created_at', 'num_of_comments', 'num_of_likes')
+
+class FeedThreadSerializer(ThreadListSerializer):
+    author = serializers.CharField(source='user.username', read_only=True, default=None)
+
+    class Meta(ThreadListSerializer.Meta):
+        fields = ThreadListSerializer.Meta.fields + ('author',)
+        select_related = ('user',)
 
 @extend_schema_field(serializers.IntegerField())
 class ThreadSerializer(serializers.ModelSerializer):
+    # 댓글은 thread_detail에서 첫 페이지만 붙이고 나머지는 댓글 목록 API로 조회
     book = BookTitleSerializer(read_only=True)
-    comments = CommentDetailSerializer(many=True, read_only=True)
-    num_of_comments = serializers.SerializerMethodField()
+    num_of_comments = serializers.IntegerField(source='comment_count', read_only=True)
+    num_of_likes = serializers.IntegerField(source='like_count', read_only=True)
 
     class Meta:
         model = Thread
-        fields = ('id', 'title', 'content', 'book', 'comments', 'num_of_comments')
-
-    def get_num_of_comments(self, obj):
-        return getattr(obj, 'num_of_comments', obj.comments.count())
+        fields = ('id', 'title', 'content', 'book', 'num_of_comments', 'num_of_likes')
 
 class ThreadCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -63,19 +123,33 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
         fields = ('id', 'name')
 
-class BookSerializer(serializers.ModelSerializer):
+class IsbnField(serializers.CharField):
+    # ISBN-10/13 입력을 하이픈 없는 ISBN-13으로 정규화해서 저장
+    def to_internal_value(self, data):
+        try:
+            return normalize_isbn(super().to_internal_value(data))
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+
+class BookSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
+    isbn = IsbnField(validators=[UniqueValidator(queryset=Book.objects.all(), message="이미 등록된 ISBN입니다.")])
 
     class Meta:
         model = Book
         fields = (
             'id', 'title', 'description', 'customer_review_rank', 'author',
             'author_profile_img', 'author_info', 'author_works', 'cover_image',
-            'audio_file', 'user', 'isbn', 'category'
+            'audio_file', 'user', 'isbn', 'category', 'enrichment_status'
         )
-        read_only_fields = ('id', 'user')
+        read_only_fields = ('id', 'user', 'enrichment_status')
+
+class EnrichmentJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EnrichmentJob
+        fields = ('id', 'book', 'status', 'stage', 'error', 'attempts', 'created_at', 'updated_at')
 
-class BookListSerializer(serializers.ModelSerializer):
+class BookListSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Book
         fields = ('id', 'title', 'author', 'isbn', 'cover_image')
@@ -0,0 +1,166 @@
+from django.db.models import F
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+from accounts.counters import changed_pks
+from accounts.models import User
+from accounts.signals import follow_toggled
+from .models import Book, BookEmbedding, BookRecommendation, Category, Comment, Thread
+from .cache import bump_version
+from .embeddings import schedule_embedding
+from .ann import index_book, unindex_book
+from .counters import add_comment_count
+from .recommendations import mark_category_dirty
+from .search import update_search_index, remove_from_search_index
+from .feed import schedule_fan_out, backfill_timeline, prune_timeline
+
+
+@receiver(post_save, sender=Book)
+def update_book_embedding(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # fixture(loaddata)로 들어온 책은 backfill_embeddings 커맨드로 계산
+    if raw or (update_fields is not None and 'description' not in update_fields):
+        return
+    # 보강 job 등의 저장은 description이 그대로이므로 임베딩 API를 다시 부르지 않음
+    if not created and getattr(instance, '_loaded_description', None) == instance.description:
+        return
+    instance._loaded_description = instance.description
+    schedule_embedding(instance)
+
+
+@receiver(post_save, sender=BookEmbedding)
+def add_to_ann_index(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    try:
+        index_book(instance.book_id, instance.as_array())
+    except Exception as e:
+        print("ANN 인덱스 갱신 에러:", e)
+
+
+@receiver(post_save, sender=BookEmbedding)
+def embedding_changed(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    # 같은 벡터를 다시 저장한 경우(모델 버전/해시만 갱신 등)에는 추천이 바뀌지 않음
+    if not created and getattr(instance, '_loaded_vector', None) == bytes(instance.vector):
+        return
+    instance._loaded_vector = bytes(instance.vector)
+    category_id = Book.objects.filter(pk=instance.book_id).values_list('category_id', flat=True).first()
+    mark_category_dirty(category_id)
+
+
+@receiver(post_save, sender=Book)
+def category_changed(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    loaded_category_id = getattr(instance, '_loaded_category_id', instance.category_id)
+    if loaded_category_id != instance.category_id:
+        mark_category_dirty(loaded_category_id, instance.category_id)
+    instance._loaded_category_id = instance.category_id
+
+
+@receiver(post_delete, sender=Book)
+def book_deleted(sender, instance, **kwargs):
+    mark_category_dirty(instance.category_id)
+
+
+@receiver(post_delete, sender=BookEmbedding)
+def remove_from_ann_index(sender, instance, **kwargs):
+    try:
+        unindex_book(instance.book_id)
+    except Exception as e:
+        print("ANN 인덱스 갱신 에러:", e)
+
+
+@receiver(post_save, sender=Book)
+def index_book_text(sender, instance, raw=False, **kwargs):
+    # 저장과 같은 트랜잭션에서 검색 색인도 갱신 (fixture는 rebuild_search_index 커맨드로)
+    if raw:
+        return
+    update_search_index(instance)
+
+
+@receiver(post_delete, sender=Book)
+def unindex_book_text(sender, instance, **kwargs):
+    remove_from_search_index(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        add_comment_count(instance.thread_id, 1)
+
+
+@receiver(pre_delete, sender=Thread)
+def mark_thread_deleting(sender, instance, origin=None, **kwargs):
+    # 책/유저/쓰레드 삭제로 함께 지워지는 쓰레드 (pre_delete는 연쇄 삭제 대상 전부에 먼저 전달됨)
+    if origin is not None:
+        origin.__dict__.setdefault('_deleting_thread_ids', set()).add(instance.pk)
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, origin=None, **kwargs):
+    # 같이 지워지는 쓰레드의 댓글이면 카운터 UPDATE 생략 (댓글 수만큼 쿼리가 나가지 않게)
+    if instance.thread_id in getattr(origin, '_deleting_thread_ids', ()):
+        return
+    add_comment_count(instance.thread_id, -1)
+
+
+@receiver(m2m_changed, sender=Thread.likes.through)
+def update_like_count(sender, instance, action, reverse, pk_set, **kwargs):
+    sign, pks = changed_pks(sender, instance, action, reverse, pk_set, 'thread', 'user')
+    if not pks:
+        return
+    if reverse:
+        # user.liked_threads.add(...)
+        Thread.objects.filter(pk__in=pks).update(like_count=F('like_count') + sign)
+    else:
+        Thread.objects.filter(pk=instance.pk).update(like_count=F('like_count') + sign * len(pks))
+
+
+@receiver(post_save, sender=Thread)
+def fan_out_new_thread(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        schedule_fan_out(instance)
+
+
+@receiver(m2m_changed, sender=User.followers.through)
+def update_timelines(sender, instance, action, reverse, pk_set, **kwargs):
+    # (팔로워, 작성자) 쌍마다 팔로우하면 최근 쓰레드를 채우고, 언팔로우하면 타임라인에서 제거
+    sign, pks = changed_pks(sender, instance, action, reverse, pk_set, 'from_user', 'to_user')
+    if not pks:
+        return
+    pairs = [(instance.pk, pk) for pk in pks] if reverse else [(pk, instance.pk) for pk in pks]
+    for owner_id, author_id in pairs:
+        if sign > 0:
+            backfill_timeline(owner_id, author_id)
+        else:
+            prune_timeline(owner_id, [author_id])
+
+
+@receiver(follow_toggled)
+def update_timeline_on_toggle(sender, follower_id, target_id, following, **kwargs):
+    if following:
+        backfill_timeline(follower_id, target_id)
+    else:
+        prune_timeline(follower_id, [target_id])
+
+
+CACHE_RESOURCES = {
+    Book: 'books',
+    Category: 'categories',
+    Thread: 'threads',
+    Comment: 'comments',
+    BookEmbedding: 'embeddings',
+    BookRecommendation: 'recommendations',
+}
+
+
+def invalidate_response_cache(sender, **kwargs):
+    bump_version(CACHE_RESOURCES[sender])
+
+
+# sender 없이 연결하면 모든 모델에 post_delete 리스너가 생겨서
+# 연쇄 삭제 시 관련 행도 SELECT 후 삭제됨 (fast delete 불가)
+for model in CACHE_RESOURCES:
+    post_save.connect(invalidate_response_cache, sender=model)
+    post_delete.connect(invalidate_response_cache, sender=model)
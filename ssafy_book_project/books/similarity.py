@@ -0,0 +1,81 @@
+import numpy as np
+
+
+def normalize_rows(matrix):
+    """
+    행 단위 L2 정규화 (0 벡터는 그대로 둠)
+    """
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class SimilarityMatrix:
+    """
+    후보 벡터를 정규화된 float32 행렬 하나로 들고 있다가
+    행렬-벡터 곱 한 번 + argpartition으로 top_k를 뽑는 코사인 유사도 엔진
+    """
+
+    def __init__(self, keys, vectors):
+        self.keys = list(keys)
+        if self.keys:
+            self.matrix = normalize_rows(np.vstack(vectors))
+        else:
+            self.matrix = np.empty((0, 0), dtype=np.float32)
+        self._positions = {key: i for i, key in enumerate(self.keys)}
+
+    @classmethod
+    def from_dict(cls, vectors):
+        return cls(vectors.keys(), list(vectors.values()))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def vector(self, key):
+        return self.matrix[self._positions[key]]
+
+    def scores(self, query):
+        query = normalize_rows(query)
+        return self.matrix @ query
+
+    def top_k(self, query, k, exclude=()):
+        """
+        query와 코사인 유사도가 높은 순서대로 [(key, score), ...] 반환
+        """
+        if not self.keys or k <= 0:
+            return []
+        scores = self.scores(query)
+        excluded = list({self._positions[key] for key in exclude if key in self._positions})
+        if excluded:
+            scores[excluded] = -np.inf
+        k = min(k, len(self.keys) - len(excluded))
+        if k <= 0:
+            return []
+        if k < len(scores):
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        order = candidates[np.argsort(-scores[candidates])]
+        return [(self.keys[i], float(scores[i])) for i in order]
+
+    def top_k_batch(self, keys, k, batch_size=256):
+        """
+        keys 각각에 대해 자기 자신을 뺀 top_k를 행렬-행렬 곱으로 한꺼번에 계산
+        {key: [(key, score), ...]}
+        """
+        results = {}
+        k = min(k, len(self.keys) - 1)
+        if k <= 0:
+            return {key: [] for key in keys}
+        keys = list(keys)
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+            rows = np.array([self._positions[key] for key in batch])
+            scores = self.matrix[rows] @ self.matrix.T
+            scores[np.arange(len(rows)), rows] = -np.inf
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            for i, key in enumerate(batch):
+                order = candidates[i][np.argsort(-scores[i, candidates[i]])]
+                results[key] = [(self.keys[j], float(scores[i, j])) for j in order]
+        return results
@@ -1,3 +1,1187 @@
-from django.test import TestCase
+import datetime
+import json
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest import mock
+from pathlib import Path
+import numpy as np
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings, tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.follows import toggle_follow
+from accounts.models import User
+from mypjt.middleware import PRIMARY_PIN_COOKIE
+from mypjt.routers import replica_reads
+from .ann import IVFIndex, build_book_index, set_book_index
+from .bulk import BookImporter, iter_export_lines, iter_rows
+from .cache import bump_version, get_cache
+from .clients import EmbeddingClient, EmbeddingThrottled
+from .counters import reconcile_counters, toggle_like
+from .embeddings import save_embedding
+from .feed import decode_cursor, encode_cursor
+from .isbn import isbn13_check_digit, normalize_isbn
+from .jobs import fetch_author_profile, requeue_stale_jobs, run_job
+from .management.commands import audit_queries
+from .models import Book, BookEmbedding, BookRecommendation, Category, Comment, EnrichmentJob, EnrichmentStatus, Thread, TimelineEntry
+from .recommendations import recompute_recommendations
+from .search import book_document, rebuild_search_index, search_books, set_search_backend, warm_search_backend
+from .utils import WIKI_NOT_FOUND
 
-# Create your tests here.
+
+def isbn13(n):
+    first12 = f"979{n:09d}"
+    return first12 + isbn13_check_digit(first12)
+
+
+def make_books(count, category=None, start=0):
+    # bulk_create는 post_save를 보내지 않으므로 임베딩 API/검색 색인 갱신 없이 책만 만듦
+    return Book.objects.bulk_create([
+        Book(
+            title=f"책 {n}", description=f"설명 {n}", customer_review_rank=n % 10, author=f"작가 {n % 7}",
+            author_info="작가 소개", author_works="대표작", isbn=isbn13(n), category=category,
+            recommendations_dirty=False,
+        )
+        for n in range(start, start + count)
+    ])
+
+
+def make_thread(book, user=None, **kwargs):
+    return Thread.objects.create(
+        book=book, user=user, title=kwargs.pop('title', '쓰레드'), content='내용',
+        reading_date=datetime.date(2024, 1, 1), **kwargs,
+    )
+
+
+def replicate():
+    # SQLite backup API로 default 파일 전체를 replica 파일에 복사 (복제 지연이 끝난 상태)
+    source, target = connections['default'], connections['replica']
+    source.ensure_connection()
+    target.ensure_connection()
+    source.connection.backup(target.connection)
+
+
+def fake_embedding(text, dim):
+    return [sum(map(ord, text)) % 997 / 997.0] * dim
+
+
+class FakeEmbeddingHandler(BaseHTTPRequestHandler):
+    # keep-alive 지원을 위해 HTTP/1.1 + Content-Length 응답
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with server.lock:
+            server.requests += 1
+            failure = server.failures.pop(0) if server.failures else None
+            if server.throttle_every and server.requests % server.throttle_every == 0:
+                failure = '42901'
+        if server.latency:
+            time.sleep(server.latency)
+        status, headers = 200, {}
+        if isinstance(failure, int):
+            status, payload = failure, {'status': {'code': str(failure), 'message': 'error'}}
+            if server.retry_after is not None:
+                headers['Retry-After'] = str(server.retry_after)
+        elif failure:
+            payload = {'status': {'code': failure, 'message': 'Too Many Requests'}}
+        else:
+            payload = {
+                'status': {'code': '20000', 'message': 'OK'},
+                'result': {'embedding': fake_embedding(body['text'], server.dim)},
+            }
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        for name, value in {**headers, 'Content-Type': 'application/json; charset=utf-8'}.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeEmbeddingServer(ThreadingHTTPServer):
+    """
+    로컬 가짜 Clova 임베딩 서버 (EmbeddingClient 테스트와 benchmark_embedding_client 커맨드에서 사용)
+    - failures: 다음 요청들에 차례로 돌려줄 실패 (HTTP 상태 코드 int 또는 Clova 결과 코드 str)
+    - throttle_every: N번째 요청마다 42901 응답
+    - requests / connections: 받은 요청 수 / 새로 맺어진 TCP 연결 수
+    """
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, throttle_every=0, dim=8, failures=(), retry_after=None):
+        super().__init__(('127.0.0.1', 0), FakeEmbeddingHandler)
+        self.lock = threading.Lock()
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.dim = dim
+        self.failures = list(failures)
+        self.retry_after = retry_after
+        self.requests = self.connections = 0
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def handle_error(self, request, client_address):
+        # 타임아웃 테스트에서 클라이언트가 먼저 끊으면 응답 쓰기가 BrokenPipeError로 실패 (예상된 동작)
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+    def client(self, **kwargs):
+        return EmbeddingClient(
+            host='127.0.0.1', port=self.server_address[1], path='/embedding', use_https=False, **kwargs,
+        )
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class StubEmbeddingClient:
+    """
+    Clova 대신 fake_embedding을 돌려주는 EmbeddingClient 대역 (테스트에서 외부 호출이 나가지 않게)
+    texts: 받은 텍스트 (외부 호출 여부 확인용)
+    """
+    dim = 32  # audit_queries 시드 임베딩과 같은 차원
+
+    def __init__(self):
+        self.texts = []
+
+    def embed(self, text):
+        self.texts.append(text)
+        return fake_embedding(text, self.dim)
+
+    def embed_many(self, texts):
+        return [self.embed(text) for text in texts]
+
+
+embedding_client = StubEmbeddingClient()
+
+
+def setUpModule():
+    patcher = mock.patch('books.utils.get_embedding_client', return_value=embedding_client)
+    patcher.start()
+    unittest.addModuleCleanup(patcher.stop)
+
+
+@override_settings(EMBEDDING_ASYNC=False)
+class EmbeddingOnSaveTests(TestCase):
+    def setUp(self):
+        embedding_client.texts.clear()
+
+    def create_book(self, description):
+        return Book.objects.create(
+            title="책", description=description, customer_review_rank=1, author="작가",
+            author_info="작가 소개", author_works="대표작", isbn=isbn13(1),
+        )
+
+    def test_embedding_is_computed_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            book = self.create_book("처음 설명")
+            # 저장 트랜잭션 안에서는 임베딩 API를 부르지 않음
+            self.assertEqual(embedding_client.texts, [])
+        for callback in callbacks:
+            callback()
+        self.assertEqual(embedding_client.texts, ["처음 설명"])
+        self.assertTrue(BookEmbedding.objects.filter(book=book).exists())
+
+    def test_only_description_changes_recompute(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            book = self.create_book("처음 설명")
+        with self.captureOnCommitCallbacks(execute=True):
+            book.title = "새 제목"
+            book.save()
+            book.save(update_fields=['author_info'])
+            Book.objects.get(pk=book.pk).save()
+        self.assertEqual(embedding_client.texts, ["처음 설명"])
+        book = Book.objects.get(pk=book.pk)
+        book.description = "새 설명"
+        with self.captureOnCommitCallbacks(execute=True):
+            book.save()
+        self.assertEqual(embedding_client.texts, ["처음 설명", "새 설명"])
+
+
+class EmbeddingClientTests(SimpleTestCase):
+    def start_server(self, **kwargs):
+        server = FakeEmbeddingServer(**kwargs)
+        self.addCleanup(server.stop)
+        return server
+
+    def make_client(self, server, **kwargs):
+        client = server.client(**kwargs)
+        self.addCleanup(client.close)
+        return client
+
+    def test_reuses_one_connection_across_calls(self):
+        server = self.start_server()
+        client = self.make_client(server, max_connections=1)
+        for i in range(10):
+            np.testing.assert_allclose(client.embed(f"책 {i}"), fake_embedding(f"책 {i}", server.dim), rtol=1e-6)
+        self.assertEqual(server.requests, 10)
+        self.assertEqual(server.connections, 1)
+
+    def test_retries_429_5xx_and_throttle_code_with_backoff(self):
+        server = self.start_server(failures=[429, 503, '42901', 500])
+        client = self.make_client(server, max_retries=4, backoff=0.1)
+        with mock.patch('books.clients.time.sleep') as sleep:
+            vector = client.embed('책')
+        np.testing.assert_allclose(vector, fake_embedding('책', server.dim), rtol=1e-6)
+        self.assertEqual(server.requests, 5)
+        # 지수 백오프: attempt번째 재시도 대기는 backoff * 2^attempt의 절반~전부 (jitter)
+        delays = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(len(delays), 4)
+        for attempt, delay in enumerate(delays):
+            self.assertTrue(0.1 * 2 ** attempt * 0.5 <= delay <= 0.1 * 2 ** attempt, (attempt, delay))
+
+    def test_retry_after_header_overrides_backoff(self):
+        server = self.start_server(failures=[429], retry_after=3)
+        client = self.make_client(server, backoff=0.1)
+        with mock.patch('books.clients.time.sleep') as sleep:
+            client.embed('책')
+        self.assertTrue(1.5 <= sleep.call_args.args[0] <= 3)
+
+    def test_gives_up_after_max_retries(self):
+        server = self.start_server(failures=[503] * 10)
+        client = self.make_client(server, max_retries=2)
+        with mock.patch('books.clients.time.sleep'), self.assertRaises(EmbeddingThrottled):
+            client.embed('책')
+        self.assertEqual(server.requests, 3)
+
+    def test_times_out_slow_responses(self):
+        server = self.start_server(latency=1.0)
+        client = self.make_client(server, timeout=0.1, max_retries=0)
+        started = time.perf_counter()
+        with self.assertRaises(TimeoutError):
+            client.embed('책')
+        self.assertLess(time.perf_counter() - started, 0.9)
+
+    def test_embed_many_runs_batches_concurrently_in_order(self):
+        server = self.start_server(latency=0.05)
+        client = self.make_client(server, max_connections=4)
+        texts = [f"책 설명 {i}" for i in range(20)]
+        started = time.perf_counter()
+        vectors = client.embed_many(texts)
+        elapsed = time.perf_counter() - started
+        np.testing.assert_allclose(vectors, [fake_embedding(text, server.dim) for text in texts], rtol=1e-6)
+        self.assertEqual(server.requests, 20)
+        # 풀 크기만큼만 연결하고, 순차 실행(20 × 50ms)보다 확실히 빠름
+        self.assertLessEqual(server.connections, 4)
+        self.assertLess(elapsed, 20 * 0.05 / 2)
+
+
+@unittest.skipUnless('replica' in settings.DATABASES, "replica 설정 필요 (--settings=mypjt.test_settings)")
+@override_settings(FEED_FANOUT_ASYNC=False, RECOMMENDATION_ASYNC=False)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    default/replica를 서로 다른 SQLite 파일 두 개로 두고 요청마다 어느 DB에서 읽는지 확인
+    replica는 replicate()를 부를 때만 따라오므로 그 사이의 쓰기는 replica에 없음
+    (TestCase는 default를 트랜잭션으로 감싸서 라우터가 항상 primary를 고르므로 TransactionTestCase 사용)
+    """
+    # replica가 없는 설정에서도 테스트 러너가 DB 목록을 모을 수 있게 (이때 클래스는 skip)
+    databases = {'default', 'replica'} & set(settings.DATABASES)
+
+    def setUp(self):
+        get_cache().clear()
+        self.user = User.objects.create_user(email='reader@example.com', username='reader', password='pw-1234-test')
+        self.category = Category.objects.create(name='소설')
+        self.book, self.other = make_books(2, category=self.category)
+        BookRecommendation.objects.create(book=self.book, recommended=self.other, rank=0, score=0.9)
+        self.thread = Thread.objects.create(
+            book=self.book, user=self.user, title='쓰레드', content='내용', reading_date=datetime.date(2024, 1, 1),
+        )
+        self.comment = Comment.objects.create(thread=self.thread, user=self.user, content='댓글')
+        replicate()
+        self.client = APIClient()
+
+    def request(self, method, url, **kwargs):
+        # (응답, default 쿼리 수, replica 쿼리 수)
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = getattr(self.client, method)(url, **kwargs)
+        return response, len(primary), len(replica)
+
+    def thread_url(self, name, **kwargs):
+        return reverse(f'books:{name}', kwargs={'book_pk': self.book.pk, 'thread_pk': self.thread.pk, **kwargs})
+
+    def test_get_views_read_from_replica(self):
+        urls = [
+            reverse('books:index'),
+            reverse('books:book_list'),
+            reverse('books:category_list'),
+            reverse('books:detail', args=[self.book.pk]),
+            reverse('books:recommend', args=[self.book.pk]),
+            reverse('books:thread_list', args=[self.book.pk]),
+            self.thread_url('thread_detail'),
+            self.thread_url('comment_list'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response, primary, replica = self.request('get', url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(primary, 0)
+                self.assertGreater(replica, 0)
+
+    def test_get_sees_replica_lag_and_does_not_cache_it(self):
+        Category.objects.create(name='에세이')
+        response, primary, _ = self.request('get', reverse('books:category_list'))
+        self.assertEqual([row['name'] for row in response.json()], ['소설'])
+        self.assertEqual(primary, 0)
+        # 복제가 끝나면 바로 보여야 함 (지연된 응답이 새 버전 키로 캐시되지 않음)
+        replicate()
+        response, _, _ = self.request('get', reverse('books:category_list'))
+        self.assertEqual(sorted(row['name'] for row in response.json()), ['소설', '에세이'])
+
+    def test_writes_use_primary(self):
+        self.client.force_login(self.user)
+        writes = [
+            ('post', self.thread_url('create_comment'), {'content': '새 댓글'}, 201),
+            ('put', self.thread_url('thread_update'), {'title': '수정'}, 200),
+            ('delete', self.thread_url('delete_comment', comment_pk=self.comment.pk), None, 200),
+        ]
+        for method, url, data, expected in writes:
+            with self.subTest(method=method, url=url):
+                response, primary, replica = self.request(method, url, data=data, format='json')
+                self.assertEqual(response.status_code, expected)
+                self.assertGreater(primary, 0)
+                self.assertEqual(replica, 0)
+
+    def test_pin_cookie_keeps_next_get_on_primary(self):
+        self.client.force_login(self.user)
+        response, _, _ = self.request('post', self.thread_url('create_comment'), data={'content': '새 댓글'})
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(PRIMARY_PIN_COOKIE, response.cookies)
+
+        response, primary, replica = self.request('get', self.thread_url('thread_detail'))
+        self.assertEqual(replica, 0)
+        self.assertGreater(primary, 0)
+        self.assertEqual(response.json()['num_of_comments'], 2)
+
+        # 고정 시간이 지나면(쿠키 만료) 다시 replica
+        del self.client.cookies[PRIMARY_PIN_COOKIE]
+        _, primary, replica = self.request('get', self.thread_url('comment_list'))
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_reads_inside_atomic_use_primary(self):
+        with replica_reads():
+            with CaptureQueriesContext(connections['replica']) as replica:
+                Category.objects.count()
+            self.assertEqual(len(replica), 1)
+            with transaction.atomic(), CaptureQueriesContext(connections['default']) as primary, \
+                    CaptureQueriesContext(connections['replica']) as replica:
+                Category.objects.count()
+            self.assertEqual(len(primary), 1)
+            self.assertEqual(len(replica), 0)
+
+
+class IVFIndexTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.vectors = rng.standard_normal((2000, 16)).astype(np.float32)
+        self.index = IVFIndex(nprobe=4).build(range(2000), list(self.vectors))
+        for key in range(2000, 2100):
+            self.index.add(key, rng.standard_normal(16).astype(np.float32))
+        for key in range(0, 300, 3):
+            self.index.remove(key)
+
+    def test_posting_lists_follow_add_and_remove(self):
+        positions = sorted(position for members in self.index._lists for position in members)
+        self.assertEqual(positions, list(range(len(self.index))))
+        for centroid, members in enumerate(self.index._lists):
+            self.assertTrue(all(self.index.assignments[position] == centroid for position in members))
+
+    def test_probing_every_list_matches_exact_search(self):
+        query = self.vectors[1]
+        keys = self.index.keys[:len(self.index)]
+        scores = [float(self.index.vector(key) @ (query / np.linalg.norm(query))) for key in keys]
+        exact = [key for _, key in sorted(zip(scores, keys), reverse=True)[:10]]
+        found = [key for key, _ in self.index.search(query, 10, nprobe=self.index.nlist)]
+        self.assertEqual(found, exact)
+
+    def test_out_of_range_nprobe_is_clamped(self):
+        query = self.vectors[1]
+        exact = self.index.search(query, 10, nprobe=self.index.nlist)
+        for nprobe in (-100, 0, 1):
+            with self.subTest(nprobe=nprobe):
+                self.assertEqual(len(self.index.search(query, 10, nprobe=nprobe)), 10)
+        self.assertEqual(self.index.search(query, 10, nprobe=10 ** 6), exact)
+
+
+
+@override_settings(
+    CACHES={**settings.CACHES, 'no_cache': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+    RESPONSE_CACHE_ALIAS='no_cache',
+    FEED_FANOUT_ASYNC=False,
+)
+class ConstantQueryCountTests(TestCase):
+    """
+    책/쓰레드/댓글을 N → 10N으로 늘려도 목록/상세/쓰레드 뷰의 쿼리 수가 그대로인지
+    (eager_load가 serializer에 선언된 관계를 미리 불러오므로 행마다 쿼리가 늘지 않아야 함)
+    """
+    N = 8  # 10N이 한 페이지(page_size=100) 안에 들어가도록, 페이지의 행 수가 같이 늘어나야 N+1이 드러남
+
+    def setUp(self):
+        self.category = Category.objects.create(name='소설')
+        self.book, = make_books(1, category=self.category)
+        self.thread = Thread.objects.create(book=self.book, title='쓰레드', content='내용', reading_date='2024-01-01')
+        self.comment = Comment.objects.create(thread=self.thread, content='댓글')
+        self.client = APIClient()
+
+    def seed(self, count):
+        start = Book.objects.count()
+        books = make_books(count, category=self.category, start=start)
+        users = User.objects.bulk_create([
+            User(username=f"user{n}", email=f"user{n}@example.com", password='!') for n in range(start, start + count)
+        ])
+        threads = Thread.objects.bulk_create([
+            Thread(book=self.book if n % 2 else book, user=user, title=f"t{n}", content='-', reading_date='2024-01-01')
+            for n, (book, user) in enumerate(zip(books, users))
+        ])
+        Comment.objects.bulk_create([
+            Comment(thread=self.thread if n % 2 else thread, user=user, content='-')
+            for n, (thread, user) in enumerate(zip(threads, users))
+        ])
+
+    def urls(self):
+        thread = {'book_pk': self.book.pk, 'thread_pk': self.thread.pk}
+        return [
+            reverse('books:index') + '?page_size=100',
+            reverse('books:book_list') + '?page_size=100',
+            reverse('books:detail', args=[self.book.pk]),
+            reverse('books:thread_list', args=[self.book.pk]) + '?page_size=100',
+            reverse('books:thread_detail', kwargs=thread) + '?page_size=100',
+            reverse('books:comment_list', kwargs=thread) + '?page_size=100',
+            reverse('books:comment_detail', kwargs={**thread, 'comment_pk': self.comment.pk}),
+        ]
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.seed(self.N)
+        counts = {}
+        for url in self.urls():
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            counts[url] = len(queries)
+
+        self.seed(self.N * 9)
+        for url in self.urls():
+            with self.subTest(url=url):
+                with self.assertNumQueries(counts[url]):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                rows = response.json().get('results') or response.json().get('comments')
+                if rows is not None:
+                    # 목록 페이지의 행 수도 같이 늘었는지 (페이지가 처음부터 꽉 차 있으면 N+1이 안 드러남)
+                    self.assertGreater(len(rows), self.N)
+
+
+@override_settings(
+    CACHES={**settings.CACHES, 'no_cache': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+    RESPONSE_CACHE_ALIAS='no_cache',
+)
+class NeighborBookListTests(TestCase):
+    def setUp(self):
+        self.books = make_books(20)
+        # 저장 시그널이 프로세스 인덱스에 추가하므로 빈 인덱스에서 시작
+        set_book_index(IVFIndex())
+        self.addCleanup(set_book_index, None)
+        rng = np.random.default_rng(0)
+        for book in self.books:
+            save_embedding(book, rng.standard_normal(StubEmbeddingClient.dim))
+        set_book_index(build_book_index(nlist=4))
+
+    def test_k_and_nprobe_are_clamped(self):
+        client = APIClient()
+        url = reverse('books:neighbors', args=[self.books[0].pk])
+        for params, expected in (({'k': -5, 'nprobe': -100}, 1), ({'k': 3, 'nprobe': 0}, 3), ({'k': 500, 'nprobe': 99}, 19)):
+            with self.subTest(params=params):
+                response = client.get(url, params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.json()['recommendations']), expected)
+
+    def test_missing_index_file_is_not_built_in_request(self):
+        set_book_index(None)
+        with tempfile.TemporaryDirectory() as tmp, override_settings(ANN_INDEX_PATH=Path(tmp) / 'missing.npz'), \
+                mock.patch('books.ann.build_book_index') as build, mock.patch('builtins.print'):
+            response = APIClient().get(reverse('books:neighbors', args=[self.books[0].pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['recommendations'], [])
+        build.assert_not_called()
+
+
+@override_settings(
+    RECOMMENDATION_ASYNC=False,
+    CACHES={**settings.CACHES, 'no_cache': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+    RESPONSE_CACHE_ALIAS='no_cache',
+)
+class RecommendBookListTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name='소설')
+        self.books = make_books(8, category=self.category)
+        self.other = make_books(2, category=Category.objects.create(name='시'), start=8)
+        set_book_index(IVFIndex())
+        self.addCleanup(set_book_index, None)
+        rng = np.random.default_rng(0)
+        self.vectors = {}
+        for book in self.books + self.other:
+            self.vectors[book.pk] = rng.standard_normal(StubEmbeddingClient.dim)
+            save_embedding(book, self.vectors[book.pk])
+        self.target = self.books[0]
+        self.url = reverse('books:recommend', args=[self.target.pk])
+
+    def recommend(self):
+        with mock.patch('books.views.schedule_recompute') as schedule:
+            response = APIClient().get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return [row['title'] for row in response.json()['recommendations']], schedule
+
+    def dirty_ids(self):
+        return set(Book.objects.filter(recommendations_dirty=True).values_list('pk', flat=True))
+
+    def test_dirty_book_is_ranked_live_and_schedules_recompute(self):
+        self.assertTrue(Book.objects.get(pk=self.target.pk).recommendations_dirty)
+        titles, schedule = self.recommend()
+        schedule.assert_called_once_with()
+        # 같은 카테고리에서 자기 자신을 뺀 5권
+        self.assertEqual(len(titles), 5)
+        self.assertTrue(set(titles) <= {book.title for book in self.books[1:]})
+
+    def test_precomputed_rows_are_served_in_rank_order(self):
+        live, _ = self.recommend()
+        recompute_recommendations(top_k=5)
+        self.assertEqual(self.dirty_ids(), set())
+        titles, schedule = self.recommend()
+        schedule.assert_not_called()
+        self.assertEqual(titles, live)
+        # 저장된 순위를 그대로 읽는지 확인
+        BookRecommendation.objects.filter(book=self.target).delete()
+        BookRecommendation.objects.create(book=self.target, recommended=self.books[3], rank=0, score=0.1)
+        BookRecommendation.objects.create(book=self.target, recommended=self.books[2], rank=1, score=0.2)
+        self.assertEqual(self.recommend()[0], [self.books[3].title, self.books[2].title])
+
+    def test_only_changed_vector_marks_category_dirty(self):
+        recompute_recommendations(top_k=5)
+        save_embedding(self.target, self.vectors[self.target.pk])
+        self.assertEqual(self.dirty_ids(), set())
+        save_embedding(self.target, -self.vectors[self.target.pk])
+        self.assertEqual(self.dirty_ids(), {book.pk for book in self.books})
+
+
+@override_settings(
+    CACHES={**settings.CACHES, 'no_cache': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+    RESPONSE_CACHE_ALIAS='no_cache',
+)
+class BookListFieldsTests(TestCase):
+    def test_wide_fields_are_opt_in(self):
+        make_books(2, category=Category.objects.create(name='소설'))
+        client = APIClient()
+        response = client.get(reverse('books:book_list'))
+        self.assertEqual(response.status_code, 200)
+        for row in response.json()['results']:
+            self.assertEqual(set(row), {'id', 'title', 'author', 'isbn', 'cover_image'})
+        response = client.get(reverse('books:book_list'), {'fields': 'id,description,category'})
+        row = response.json()['results'][0]
+        self.assertEqual(set(row), {'id', 'description', 'category'})
+        self.assertEqual(row['category']['name'], '소설')
+
+
+@override_settings(
+    CACHES={**settings.CACHES, 'no_cache': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+    RESPONSE_CACHE_ALIAS='no_cache',
+)
+class BookSearchLimitTests(TestCase):
+    def setUp(self):
+        make_books(5)
+        set_search_backend(None)
+        self.addCleanup(set_search_backend, None)
+        rebuild_search_index()
+
+    def test_limit_is_clamped_to_at_least_one(self):
+        client = APIClient()
+        for limit, expected in (('-1', 1), ('0', 1), ('3', 3), ('1000', 5)):
+            with self.subTest(limit=limit):
+                response = client.get(reverse('books:search'), {'q': '설명', 'limit': limit})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()['count'], expected)
+
+    @override_settings(SEARCH_LATENCY_BUDGET=0)
+    def test_hybrid_limit_is_clamped_to_at_least_one(self):
+        client = APIClient()
+        with mock.patch('books.hybrid_search.cached_query_embedding', return_value=None), \
+                mock.patch('books.hybrid_search.compute_query_embedding', return_value=None):
+            for limit, expected in (('-1', 1), ('0', 1), ('3', 3)):
+                with self.subTest(limit=limit):
+                    response = client.get(reverse('books:hybrid_search'), {'q': '책', 'limit': limit})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.json()['count'], expected)
+
+
+@override_settings(
+    SEARCH_BACKEND='memory', SEARCH_BUILD_ASYNC=True,
+    CACHES={**settings.CACHES, 'no_cache': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+    RESPONSE_CACHE_ALIAS='no_cache',
+)
+class MemorySearchBackendTests(TestCase):
+    def setUp(self):
+        make_books(5)
+        set_search_backend(None)
+        self.addCleanup(set_search_backend, None)
+        self.client = APIClient()
+
+    def search(self):
+        return self.client.get(reverse('books:search'), {'q': '설명'})
+
+    def test_index_is_built_in_background_not_in_request(self):
+        with mock.patch('books.jobs.get_executor') as get_executor:
+            warm_search_backend()
+            response = self.search()
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+        [(build, index), _] = get_executor.return_value.submit.call_args
+        self.assertEqual(len(index), 0)
+        get_executor.return_value.submit.assert_called_once()
+        with mock.patch('books.search.close_old_connections'):
+            build(index)
+        response = self.search()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 5)
+
+    def test_build_keeps_documents_indexed_while_building(self):
+        [book] = make_books(1, start=5)
+        with mock.patch('books.jobs.get_executor') as get_executor:
+            warm_search_backend()
+        [(build, index), _] = get_executor.return_value.submit.call_args
+        # 빌드 도중 저장 시그널로 들어온 최신 문서는 빌드가 덮어쓰지 않음
+        index.index(book.pk, book_document(Book(title='새 제목', description='', author='', author_works='')))
+        with mock.patch('books.search.close_old_connections'):
+            build(index)
+        self.assertEqual([pk for pk, _ in search_books('새 제목')], [book.pk])
+        self.assertEqual(len(index), 6)
+
+    @override_settings(SEARCH_BUILD_ASYNC=False)
+    def test_synchronous_build(self):
+        response = self.search()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 5)
+
+
+@override_settings(
+    CACHES={**settings.CACHES, 'no_cache': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+    RESPONSE_CACHE_ALIAS='no_cache',
+)
+class ThreadCounterTests(TestCase):
+    def setUp(self):
+        [self.book] = make_books(1)
+        self.users = [
+            User.objects.create_user(username=f'user{n}', email=f'user{n}@example.com', password='pw') for n in range(3)
+        ]
+        self.thread = make_thread(self.book, self.users[0])
+        self.other = make_thread(self.book, self.users[0])
+
+    def counts(self, thread):
+        thread.refresh_from_db()
+        return thread.comment_count, thread.like_count
+
+    def test_comment_count_follows_create_and_delete(self):
+        comments = [Comment.objects.create(thread=self.thread, user=self.users[0], content=f'댓글 {n}') for n in range(3)]
+        self.assertEqual(self.counts(self.thread), (3, 0))
+        comments[0].delete()
+        self.assertEqual(self.counts(self.thread), (2, 0))
+        self.assertEqual(self.counts(self.other), (0, 0))
+        # 쓰레드와 함께 지워지는 댓글은 카운터를 건드리지 않음
+        self.thread.delete()
+        self.assertFalse(Comment.objects.exists())
+
+    def test_like_count_follows_m2m_changes_from_both_sides(self):
+        alice, bob, carol = self.users
+        self.thread.likes.add(alice, bob)
+        self.thread.likes.add(bob)  # 이미 있는 행은 다시 세지 않음
+        carol.liked_threads.add(self.thread, self.other)
+        self.assertEqual(self.counts(self.thread), (0, 3))
+        self.assertEqual(self.counts(self.other), (0, 1))
+        self.thread.likes.remove(alice, alice)
+        carol.liked_threads.remove(self.other)
+        self.assertEqual(self.counts(self.thread), (0, 2))
+        self.assertEqual(self.counts(self.other), (0, 0))
+        bob.liked_threads.add(self.other)
+        bob.liked_threads.clear()
+        self.assertEqual(self.counts(self.thread), (0, 1))
+        self.assertEqual(self.counts(self.other), (0, 0))
+        self.thread.likes.clear()
+        self.assertEqual(self.counts(self.thread), (0, 0))
+
+    def test_serializers_return_stored_counters(self):
+        Comment.objects.create(thread=self.thread, user=self.users[0], content='댓글')
+        self.thread.likes.add(*self.users[:2])
+        data = APIClient().get(reverse('books:thread_detail', args=[self.book.pk, self.thread.pk])).json()
+        self.assertEqual((data['num_of_comments'], data['num_of_likes']), (1, 2))
+        rows = APIClient().get(reverse('books:thread_list', args=[self.book.pk])).json()['results']
+        self.assertEqual({row['id']: (row['num_of_comments'], row['num_of_likes']) for row in rows},
+                         {self.thread.pk: (1, 2), self.other.pk: (0, 0)})
+
+    def test_reconcile_fixes_drifted_counters(self):
+        Comment.objects.create(thread=self.thread, user=self.users[0], content='댓글')
+        self.thread.likes.add(self.users[1])
+        Thread.objects.filter(pk=self.thread.pk).update(comment_count=9, like_count=9)
+        User.objects.filter(pk=self.users[0].pk).update(follower_count=4)
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        self.assertIn("쓰레드 1개, 유저 1명", out.getvalue())
+        self.assertEqual(self.counts(self.thread), (1, 1))
+        self.assertEqual(self.counts(self.other), (0, 0))
+        self.assertEqual(User.objects.get(pk=self.users[0].pk).follower_count, 0)
+        self.assertEqual(reconcile_counters(), {'threads': 0, 'users': 0})
+
+
+class ThreadLikeToggleTests(TestCase):
+    def setUp(self):
+        [self.book] = make_books(1)
+        self.user = User.objects.create_user(username='liker', email='liker@example.com', password='pw')
+        self.thread = make_thread(self.book)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('books:thread_like', args=[self.book.pk, self.thread.pk])
+
+    def state(self):
+        return self.thread.likes.filter(pk=self.user.pk).exists(), Thread.objects.get(pk=self.thread.pk).like_count
+
+    def test_toggle_twice(self):
+        self.assertEqual(self.client.post(self.url).json(), {'liked': True, 'like_count': 1})
+        self.assertEqual(self.state(), (True, 1))
+        self.assertEqual(self.client.post(self.url).json(), {'liked': False, 'like_count': 0})
+        self.assertEqual(self.state(), (False, 0))
+        ids = f"{self.thread.pk},{self.thread.pk + 1}"
+        self.client.post(self.url)
+        response = self.client.get(reverse('books:thread_like_status'), {'ids': ids})
+        self.assertEqual(response.json(), {'liked': {str(self.thread.pk): True, str(self.thread.pk + 1): False}})
+
+    def test_concurrent_insert_does_not_count_twice(self):
+        toggle_like(self.thread.pk, self.user.pk)
+        # 다른 요청이 먼저 INSERT 한 상황: 이쪽 DELETE는 아직 행을 못 봤고 INSERT는 unique 제약에 걸림
+        with mock.patch('django.db.models.query.QuerySet.delete', return_value=(0, {})):
+            self.assertEqual(toggle_like(self.thread.pk, self.user.pk), (True, 1))
+        self.assertEqual(self.state(), (True, 1))
+        self.assertEqual(Thread.likes.through.objects.count(), 1)
+        # 바깥 트랜잭션은 savepoint 덕분에 계속 사용 가능
+        self.assertEqual(toggle_like(self.thread.pk, self.user.pk), (False, 0))
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.addCleanup(get_cache().clear)
+        self.category = Category.objects.create(name='소설')
+        make_books(2, category=self.category)
+        self.client = APIClient()
+        self.url = reverse('books:index')
+
+    def test_hit_returns_same_body_without_queries(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertIn('Accept', second['Vary'])
+
+    def test_hit_goes_through_content_negotiation(self):
+        for _ in range(2):
+            self.assertEqual(self.client.get(self.url)['Content-Type'], 'application/json')
+            response = self.client.get(self.url, {'format': 'api'})
+            self.assertTrue(response['Content-Type'].startswith('text/html'))
+            response = self.client.get(self.url, HTTP_ACCEPT='text/html')
+            self.assertTrue(response['Content-Type'].startswith('text/html'))
+        # 표현마다 ETag가 다름
+        self.assertNotEqual(
+            self.client.get(self.url)['ETag'], self.client.get(self.url, HTTP_ACCEPT='text/html')['ETag']
+        )
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_write_invalidates_cached_response(self):
+        first = self.client.get(self.url)
+        # bulk_create가 아닌 save()라서 post_save가 books 버전을 올림
+        Book.objects.create(
+            title='새 책', description='설명', customer_review_rank=5, author='작가', isbn=isbn13(99), category=self.category,
+        )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertEqual(len(response.json()['results']), len(first.json()['results']) + 1)
+
+    def test_bump_version_changes_key(self):
+        first = self.client.get(self.url)['ETag']
+        bump_version('categories')  # index는 books에만 의존
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=first).status_code, 304)
+        Book.objects.filter(pk=Book.objects.first().pk).update(title='바뀐 제목')
+        bump_version('books')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('바뀐 제목', [row['title'] for row in response.json()['results']])
+
+
+@override_settings(
+    CACHES={**settings.CACHES, 'no_cache': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+    RESPONSE_CACHE_ALIAS='no_cache',
+)
+class CommentListTests(TestCase):
+    def setUp(self):
+        [self.book] = make_books(1)
+        self.thread = make_thread(self.book)
+        other = make_thread(self.book, title='다른 쓰레드')
+        Comment.objects.create(thread=other, content='다른 쓰레드 댓글')
+        comments = [Comment.objects.create(thread=self.thread, content=f'댓글 {n}') for n in range(25)]
+        # 작성 순서와 반대로 created_at을 주고, 가장 오래된 두 개(23, 24)는 같은 시각이라 id로 순서가 갈림
+        base = timezone.now()
+        for n, comment in enumerate(comments):
+            Comment.objects.filter(pk=comment.pk).update(created_at=base - datetime.timedelta(minutes=min(n, 23)))
+        self.expected = [comments[23].pk, comments[24].pk] + [comment.pk for comment in reversed(comments[:23])]
+        self.url = reverse('books:comment_list', args=[self.book.pk, self.thread.pk])
+        self.client = APIClient()
+
+    def test_default_page_size_and_flat_rows(self):
+        with self.assertNumQueries(2):
+            body = self.client.get(self.url).json()
+        self.assertEqual(len(body['results']), 20)
+        self.assertIsNotNone(body['next'])
+        # 부모 쓰레드는 URL로 이미 알고 있으므로 중첩하지 않음
+        for row in body['results']:
+            self.assertEqual(set(row), {'id', 'content', 'created_at', 'updated_at'})
+
+    def test_cursor_walks_oldest_first(self):
+        ids, url, params = [], self.url, {'page_size': 7}
+        while url:
+            body = self.client.get(url, params).json()
+            self.assertLessEqual(len(body['results']), 7)
+            ids += [row['id'] for row in body['results']]
+            url, params = body['next'], None
+        self.assertEqual(ids, self.expected)
+
+    def test_page_size_is_capped(self):
+        body = self.client.get(self.url, {'page_size': 1000}).json()
+        self.assertEqual(len(body['results']), 25)
+        self.assertIsNone(body['next'])
+
+    def test_thread_of_another_book_is_404(self):
+        [other_book] = make_books(1, start=1)
+        response = self.client.get(reverse('books:comment_list', args=[other_book.pk, self.thread.pk]))
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(
+    FEED_FANOUT_ASYNC=False, FEED_FANOUT_MAX_FOLLOWERS=1,
+    CACHES={**settings.CACHES, 'no_cache': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+    RESPONSE_CACHE_ALIAS='no_cache',
+)
+class HomeFeedTests(TestCase):
+    def setUp(self):
+        [self.book] = make_books(1)
+        self.reader, self.writer, self.celebrity, self.fan, self.stranger = (
+            User.objects.create_user(username=name, email=f'{name}@example.com', password='pw')
+            for name in ('reader', 'writer', 'celebrity', 'fan', 'stranger')
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def post(self, user):
+        # fan-out은 커밋 후 실행
+        with self.captureOnCommitCallbacks(execute=True):
+            return make_thread(self.book, user).pk
+
+    def read_all(self, page_size):
+        ids, url, params = [], reverse('books:home_feed'), {'page_size': page_size}
+        while url:
+            body = self.client.get(url, params).json()
+            self.assertLessEqual(len(body['results']), page_size)
+            ids += [row['id'] for row in body['results']]
+            url, params = body['next'], None
+        return ids
+
+    def test_fan_out_and_high_follower_merge_in_order(self):
+        toggle_follow(self.reader.pk, self.writer.pk)
+        toggle_follow(self.reader.pk, self.celebrity.pk)
+        toggle_follow(self.fan.pk, self.celebrity.pk)  # 팔로워 2명 > FEED_FANOUT_MAX_FOLLOWERS
+        posted = [self.post(user) for user in
+                  (self.writer, self.celebrity, self.stranger, self.writer, self.celebrity, self.writer)]
+        expected = [pk for pk, user in zip(posted, 'wcswcw') if user != 's'][::-1]
+        # 팔로워 많은 작성자의 쓰레드는 타임라인에 쓰지 않고 읽을 때 합침
+        self.assertEqual(
+            set(TimelineEntry.objects.filter(owner=self.reader).values_list('author_id', flat=True)), {self.writer.pk}
+        )
+        for page_size in (1, 2, 5, 100):
+            with self.subTest(page_size=page_size):
+                self.assertEqual(self.read_all(page_size), expected)
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        older = [self.post(self.writer) for _ in range(3)]
+        toggle_follow(self.reader.pk, self.writer.pk)
+        self.assertEqual(self.read_all(2), older[::-1])
+        toggle_follow(self.reader.pk, self.writer.pk)
+        self.assertFalse(TimelineEntry.objects.filter(owner=self.reader).exists())
+        self.assertEqual(self.read_all(2), [])
+
+    def test_cursor_round_trip_and_invalid_cursor(self):
+        created_at = timezone.now()
+        self.assertEqual(decode_cursor(encode_cursor(created_at, 42)), (created_at, 42))
+        response = self.client.get(reverse('books:home_feed'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+
+class BookImportRoundTripTests(TestCase):
+    def import_lines(self, lines):
+        return BookImporter().run(iter_rows(StringIO(''.join(lines)), 'jsonl'))
+
+    def test_numeric_category_name_survives_export_import(self):
+        Category.objects.create(name='소설')
+        category = Category.objects.create(name=str(Category.objects.get().pk))
+        make_books(3, category=category)
+        lines = list(iter_export_lines())
+        Book.objects.update(category=None)
+        stats = self.import_lines(lines)
+        self.assertEqual((stats.updated, stats.invalid), (3, 0))
+        self.assertEqual(set(Book.objects.values_list('category', flat=True)), {category.pk})
+        self.assertEqual(Category.objects.count(), 2)
+
+    def test_books_without_isbn_survive_export_import(self):
+        make_books(2)
+        Book.objects.update(isbn=None, isbn_raw='abc')
+        lines = list(iter_export_lines())
+        stats = self.import_lines(lines)
+        self.assertEqual((stats.created, stats.updated, stats.invalid), (0, 2, 0))
+        self.assertEqual(Book.objects.filter(isbn__isnull=True, isbn_raw='abc').count(), 2)
+        # isbn_raw 컬럼이 없는 행은 여전히 isbn 필수
+        row = {key: value for key, value in json.loads(lines[0]).items() if key != 'isbn_raw'}
+        stats = self.import_lines([json.dumps(row) + '\n'])
+        self.assertEqual(stats.invalid, 1)
+        self.assertIn('isbn', stats.errors[0][1])
+
+    def test_category_pk_only_from_category_id_column(self):
+        category = Category.objects.create(name='소설')
+        [book] = make_books(1)
+        row = json.loads(next(iter_export_lines()))
+        dumped = {'model': 'books.book', 'pk': book.pk, 'fields': {**row, 'category': category.pk}}
+        stats = self.import_lines([json.dumps(dumped) + '\n', json.dumps({**row, 'category_id': 999}) + '\n'])
+        self.assertEqual((stats.updated, stats.invalid), (1, 1))
+        self.assertIn('category_id', stats.errors[0][1])
+        book.refresh_from_db()
+        self.assertEqual(book.category_id, category.pk)
+
+
+class IsbnTests(SimpleTestCase):
+    def test_normalize_isbn(self):
+        for value, expected in (
+            ('0-306-40615-2', '9780306406157'),
+            ('978-0-306-40615-7', '9780306406157'),
+            (' 978 0306 40615 7 ', '9780306406157'),
+            ('0-8044-2957-x', '9780804429573'),
+        ):
+            with self.subTest(value=value):
+                self.assertEqual(normalize_isbn(value), expected)
+
+    def test_invalid_isbn_raises(self):
+        for value in ('0-306-40615-3', '9780306406158', '030640615', 'abc', '', None):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                normalize_isbn(value)
+
+
+@override_settings(
+    CACHES={**settings.CACHES, 'no_cache': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+    RESPONSE_CACHE_ALIAS='no_cache',
+)
+class IsbnLookupTests(TestCase):
+    def setUp(self):
+        [self.book] = make_books(1)
+        Book.objects.filter(pk=self.book.pk).update(isbn='9780306406157')
+
+    def test_lookup_accepts_isbn10_and_hyphens(self):
+        client = APIClient()
+        for value in ('0-306-40615-2', '978-0-306-40615-7', '9780306406157'):
+            with self.subTest(value=value):
+                response = client.get(reverse('books:isbn_lookup', args=[value]))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()['id'], self.book.pk)
+        self.assertEqual(client.get(reverse('books:isbn_lookup', args=['0-306-40615-3'])).status_code, 400)
+        self.assertEqual(client.get(reverse('books:isbn_lookup', args=['9780306406164'])).status_code, 404)
+
+    def test_create_with_known_isbn_returns_existing_book(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='writer', email='writer@example.com', password='pw'))
+        data = {
+            'title': "다른 제목", 'description': "설명", 'customer_review_rank': 1, 'author': "작가",
+            'author_info': "소개", 'author_works': "대표작", 'isbn': '0-306-40615-2',
+        }
+        response = client.post(reverse('books:create'), data, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['id'], self.book.pk)
+        self.assertTrue(response['Location'].endswith(reverse('books:detail', args=[self.book.pk])))
+        self.assertEqual(Book.objects.count(), 1)
+        self.assertFalse(EnrichmentJob.objects.exists())
+
+
+class IsbnMigrationTests(TransactionTestCase):
+    before = [('books', '0010_comment_comment_thread_created_idx')]
+    after = [('books', '0011_normalize_book_isbn')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def setUp(self):
+        apps = self.migrate(self.before)
+        self.addCleanup(lambda: self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes()))
+        Category, Book, Thread = (apps.get_model('books', name) for name in ('Category', 'Book', 'Thread'))
+        merged, untouched = Category.objects.create(name='합쳐짐'), Category.objects.create(name='그대로')
+
+        def book(isbn, category=None):
+            return Book.objects.create(
+                title=f"책 {isbn}", description="설명", customer_review_rank=1, author="작가", author_info="소개",
+                author_works="대표작", isbn=isbn, category=category, recommendations_dirty=False,
+            ).pk
+
+        self.keeper = book('0-306-40615-2', merged)
+        self.duplicate = book('9780306406157', merged)
+        self.other = book(isbn13(5), untouched)
+        self.invalid = [book('abc'), book(''), book('abc')]
+        self.thread = Thread.objects.create(
+            book_id=self.duplicate, title="쓰레드", content="내용", reading_date=datetime.date(2024, 1, 1),
+        ).pk
+
+    def test_duplicates_are_merged_into_the_first_book(self):
+        apps = self.migrate(self.after)
+        Book, Thread = apps.get_model('books', 'Book'), apps.get_model('books', 'Thread')
+        self.assertFalse(Book.objects.filter(pk=self.duplicate).exists())
+        self.assertEqual(Book.objects.get(pk=self.keeper).isbn, '9780306406157')
+        self.assertEqual(Thread.objects.get(pk=self.thread).book_id, self.keeper)
+        # 합쳐진 카테고리의 추천만 다시 계산
+        dirty = dict(Book.objects.values_list('pk', 'recommendations_dirty'))
+        self.assertTrue(dirty[self.keeper])
+        self.assertFalse(dirty[self.other])
+
+    def test_invalid_isbns_become_null_and_keep_the_raw_value(self):
+        Book = self.migrate(self.after).get_model('books', 'Book')
+        rows = list(Book.objects.filter(pk__in=self.invalid).order_by('pk').values_list('isbn', 'isbn_raw'))
+        self.assertEqual(rows, [(None, 'abc'), (None, ''), (None, 'abc')])
+        self.assertEqual(Book.objects.get(pk=self.other).isbn, isbn13(5))
+
+    def test_reverse_restores_raw_values(self):
+        self.migrate(self.after)
+        Book = self.migrate(self.before).get_model('books', 'Book')
+        rows = list(Book.objects.filter(pk__in=self.invalid).order_by('pk').values_list('isbn', flat=True))
+        self.assertEqual(rows, ['abc', '', 'abc'])
+
+
+@override_settings(ENRICHMENT_ASYNC=False, ENRICHMENT_MAX_ATTEMPTS=2)
+class EnrichmentJobTests(TestCase):
+    def setUp(self):
+        [self.book] = make_books(1)
+        self.job = EnrichmentJob.objects.create(book=self.book)
+
+    def test_failed_job_is_requeued_until_max_attempts(self):
+        with mock.patch('books.jobs.enrich_book', side_effect=RuntimeError('boom')), \
+                mock.patch('books.jobs.traceback.print_exc'):
+            for attempts, status in ((1, EnrichmentStatus.PENDING), (2, EnrichmentStatus.FAILED)):
+                self.assertFalse(run_job(self.job.pk))
+                self.job.refresh_from_db()
+                self.book.refresh_from_db()
+                self.assertEqual((self.job.attempts, self.job.status), (attempts, status))
+                self.assertEqual(self.book.enrichment_status, status)
+                self.assertEqual(self.job.error, 'boom')
+            # 최대 횟수를 넘긴 job은 다시 가져가지 않음
+            self.assertFalse(run_job(self.job.pk))
+            self.job.refresh_from_db()
+            self.assertEqual(self.job.attempts, 2)
+
+    @override_settings(ENRICHMENT_STALE_SECONDS=60)
+    def test_stale_running_jobs_are_reclaimed(self):
+        [fresh_book, spent_book] = make_books(2, start=1)
+        fresh = EnrichmentJob.objects.create(book=fresh_book, status=EnrichmentStatus.RUNNING, attempts=1)
+        spent = EnrichmentJob.objects.create(book=spent_book, status=EnrichmentStatus.RUNNING, attempts=2)
+        EnrichmentJob.objects.filter(pk=self.job.pk).update(status=EnrichmentStatus.RUNNING, attempts=1)
+        stale_at = timezone.now() - datetime.timedelta(minutes=5)
+        EnrichmentJob.objects.exclude(pk=fresh.pk).update(updated_at=stale_at)
+
+        self.assertEqual(requeue_stale_jobs(), 1)
+        statuses = dict(EnrichmentJob.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses, {
+            self.job.pk: EnrichmentStatus.PENDING, fresh.pk: EnrichmentStatus.RUNNING, spent.pk: EnrichmentStatus.FAILED,
+        })
+        self.assertEqual(Book.objects.get(pk=spent_book.pk).enrichment_status, EnrichmentStatus.FAILED)
+        # 되살린 job은 다시 가져갈 수 있음
+        with mock.patch('books.jobs.enrich_book'):
+            self.assertTrue(run_job(self.job.pk))
+
+    def test_create_returns_before_any_outbound_call(self):
+        EnrichmentJob.objects.all().delete()
+        embedding_client.texts.clear()
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='writer', email='writer@example.com', password='pw'))
+        data = {
+            'title': "새 책", 'description': "새 설명", 'customer_review_rank': 5, 'author': "새 작가",
+            'author_info': "소개", 'author_works': "대표작", 'isbn': isbn13(100),
+        }
+        with mock.patch('socket.getaddrinfo', side_effect=AssertionError("외부 호출")) as lookup, \
+                self.captureOnCommitCallbacks() as callbacks:
+            response = client.post(reverse('books:create'), data, format='json')
+        self.assertEqual(response.status_code, 202)
+        lookup.assert_not_called()
+        self.assertEqual(embedding_client.texts, [])
+        # 임베딩 계산과 보강 job은 커밋 후로 미뤄짐
+        self.assertTrue(callbacks)
+        self.assertEqual(EnrichmentJob.objects.get().status, EnrichmentStatus.PENDING)
+
+    def test_author_image_is_kept_without_wikipedia_summary(self):
+        with mock.patch('books.jobs.get_wikipedia_content', return_value=None), \
+                mock.patch('books.jobs.fetch_author_image', return_value='author_profiles/작가.jpg'), \
+                mock.patch('books.jobs.generate_author_gpt_info', return_value=('소개', '대표작')):
+            self.assertEqual(fetch_author_profile(self.job, self.book), WIKI_NOT_FOUND)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.author_profile_img.name, 'author_profiles/작가.jpg')
+
+
+@tag('slow')
+class QueryAuditTests(TestCase):
+    """
+    audit_queries와 같은 URL 목록을 작은 데이터로 감사
+    기준 쿼리 수는 books/query_audit_baseline.json (쿼리가 줄었으면 파일도 같이 갱신)
+    """
+    SEED = {'users': 300, 'books': 600, 'threads': 1200, 'comments': 2400, 'likes': 900, 'follows': 600}
+    BASELINE = Path(__file__).resolve().parent / 'query_audit_baseline.json'
+
+    def test_no_unallowed_full_scans_or_query_growth(self):
+        command = audit_queries.Command(stdout=StringIO())
+        with tempfile.TemporaryDirectory() as tmp, audit_queries.audit_settings(tmp):
+            try:
+                report = command.run(self.SEED)
+            finally:
+                set_search_backend(None)
+                set_book_index(None)
+        baseline = audit_queries.load_baseline(self.BASELINE)
+        self.assertEqual({(row['name'], row['method']) for row in report}, set(baseline))
+        problems = {
+            f"{row['method']} {row['path']}": audit_queries.find_problems(row, 20, baseline)
+            for row in report
+        }
+        self.assertEqual({path: found for path, found in problems.items() if found}, {})
@@ -0,0 +1,125 @@
+import os
+import re
+import time
+import hashlib
+import tempfile
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.utils.module_loading import import_string
+from gtts import gTTS
+
+
+class GTTSBackend:
+    """
+    Google TTS (네트워크 필요)
+    """
+    name = 'gtts'
+
+    def __init__(self, lang='ko'):
+        self.lang = lang
+
+    def synthesize(self, text, output_path):
+        gTTS(text=text, lang=self.lang).save(str(output_path))
+
+
+class OfflineTTSBackend:
+    """
+    테스트/벤치마크용 오프라인 스텁 (텍스트를 그대로 바이트로 기록, latency로 합성 지연 흉내)
+    """
+    name = 'offline'
+
+    def __init__(self, lang='ko', latency=0.0):
+        self.lang = lang
+        self.latency = latency
+
+    def synthesize(self, text, output_path):
+        if self.latency:
+            time.sleep(self.latency)
+        Path(output_path).write_bytes(text.encode('utf-8'))
+
+
+def get_tts_backend():
+    backend_class = import_string(settings.TTS_BACKEND)
+    return backend_class(**settings.TTS_BACKEND_OPTIONS)
+
+
+SENTENCE_END = re.compile(r'(?<=[.!?。])\s+|\n+')
+
+
+def split_sentences(text, max_chars=None):
+    """
+    문장 단위로 나눈 뒤 max_chars를 넘지 않게 이어 붙인 청크 리스트
+    """
+    max_chars = max_chars or settings.TTS_CHUNK_MAX_CHARS
+    chunks, current = [], ''
+    for sentence in SENTENCE_END.split(text.strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def audio_hash(backend, text):
+    payload = f"{backend.name}:{backend.lang}:{text}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _relative_audio_path(digest, directory):
+    return Path(directory) / digest[:2] / f"{digest}.mp3"
+
+
+def _synthesize_chunk(backend, text):
+    # 문장 청크도 해시로 저장해두면 스크립트 일부만 바뀌었을 때 나머지는 재사용됨
+    relative_path = _relative_audio_path(audio_hash(backend, text), "tts/chunks")
+    output_path = Path(settings.MEDIA_ROOT) / relative_path
+    if not output_path.exists():
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=output_path.parent, suffix=".part")
+        os.close(fd)
+        try:
+            backend.synthesize(text, tmp_name)
+            os.replace(tmp_name, output_path)
+        finally:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+    return relative_path.as_posix()
+
+
+def synthesize_script(script, backend=None, on_chunk=None):
+    """
+    스크립트 전체 해시가 같으면 기존 mp3를 그대로 반환하고,
+    아니면 문장 청크를 병렬로 합성해서 순서대로 이어 붙임
+    on_chunk(index, path): 앞 청크부터 순서대로 완성될 때마다 호출 (첫 청크를 먼저 재생 가능)
+    """
+    backend = backend or get_tts_backend()
+    relative_path = _relative_audio_path(audio_hash(backend, script), "tts")
+    output_path = Path(settings.MEDIA_ROOT) / relative_path
+    if output_path.exists():
+        return relative_path.as_posix()
+
+    chunks = split_sentences(script) or [script]
+    media_root = Path(settings.MEDIA_ROOT)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=output_path.parent, suffix=".part")
+    try:
+        with os.fdopen(fd, 'wb') as output, ThreadPoolExecutor(max_workers=settings.TTS_WORKERS) as pool:
+            futures = [pool.submit(_synthesize_chunk, backend, chunk) for chunk in chunks]
+            for index, future in enumerate(futures):
+                chunk_path = future.result()
+                if on_chunk:
+                    on_chunk(index, chunk_path)
+                # mp3는 프레임 단위 스트림이라 바이트를 이어 붙여도 재생됨
+                output.write((media_root / chunk_path).read_bytes())
+        os.replace(tmp_name, output_path)
+    finally:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+    return relative_path.as_posix()
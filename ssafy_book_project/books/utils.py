@@ -1,16 +1,18 @@
 import os
 import json
+import hashlib
+import tempfile
 import requests
 import openai
-import http.client
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from pathlib import Path
+from urllib.parse import urlparse
 from django.conf import settings
-from gtts import gTTS
 import wikipediaapi
 from pydantic import BaseModel
-from dotenv import load_dotenv
+from .similarity import SimilarityMatrix
+from .clients import get_embedding_client
+from .tts import synthesize_script
 
 
 class AuthorInfo(BaseModel):
@@ -54,26 +56,83 @@ def get_wikipedia_content(book_author):
     }
 
 
+WIKI_NOT_FOUND = "위키피디아에서 정보를 찾을 수 없습니다."
+
+
+AUTHOR_IMAGE_DIR = "author_profiles"
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def store_content_addressed(src_path, suffix, directory=AUTHOR_IMAGE_DIR, digest=None):
+    """
+    파일을 sha256 해시 경로(directory/ab/abcdef....ext)로 옮기고 MEDIA_ROOT 기준 경로 반환
+    같은 내용의 파일이 이미 있으면 src_path는 지우고 기존 파일을 재사용
+    """
+    src_path = Path(src_path)
+    if digest is None:
+        hasher = hashlib.sha256()
+        with src_path.open('rb') as f:
+            for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+    relative_path = Path(directory) / digest[:2] / f"{digest}{suffix}"
+    target = Path(settings.MEDIA_ROOT) / relative_path
+    if target.exists():
+        src_path.unlink()
+    else:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(src_path, target)
+    return relative_path.as_posix()
+
+
+def download_author_image(img_url):
+    """
+    이미지를 메모리에 통째로 올리지 않고 청크 단위로 디스크에 저장 (내용 해시로 중복 제거)
+    """
+    output_dir = Path(settings.MEDIA_ROOT) / AUTHOR_IMAGE_DIR
+    output_dir.mkdir(parents=True, exist_ok=True)
+    suffix = Path(urlparse(img_url).path).suffix.lower() or ".jpg"
+    hasher = hashlib.sha256()
+    with requests.get(img_url, stream=True, timeout=30) as response_img:
+        response_img.raise_for_status()
+        with tempfile.NamedTemporaryFile(dir=output_dir, suffix=".part", delete=False) as tmp:
+            try:
+                for chunk in response_img.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    hasher.update(chunk)
+                    tmp.write(chunk)
+            except Exception:
+                tmp.close()
+                os.unlink(tmp.name)
+                raise
+    return store_content_addressed(tmp.name, suffix, digest=hasher.hexdigest())
+
+
+def fetch_author_image(author):
+    """
+    위키피디아 작가 사진을 내려받아 MEDIA_ROOT 기준 경로 반환 (없으면 None)
+    """
+    img_url = get_wikipedia_image(author)
+    if not img_url:
+        return None
+    try:
+        return download_author_image(img_url)
+    except Exception as e:
+        print("작가 사진 다운로드 에러:", e)
+        return None
+
+
 def process_wikipedia_info(book):
     wiki_data = get_wikipedia_content(book.author)
     if wiki_data:
         wiki_summary = wiki_data.get("summary", "")
-        img_url = get_wikipedia_image(book.author)
         if not book.pk:
             book.save()
-        if img_url:
-            response_img = requests.get(img_url)
-            print(response_img)
-            output_dir = Path(settings.MEDIA_ROOT) / "author_profiles"
-            output_dir.mkdir(parents=True, exist_ok=True)
-            original_filename = Path(img_url).name
-            file_name = f"author_{book.pk}_{original_filename}"
-            file_path = output_dir / file_name
-            file_path.write_bytes(response_img.content)
-            book.author_profile_img = str(Path("author_profiles") / file_name)
+        img_path = fetch_author_image(book.author)
+        if img_path:
+            book.author_profile_img = img_path
             book.save()
     else:
-        wiki_summary = "위키피디아에서 정보를 찾을 수 없습니다."
+        wiki_summary = WIKI_NOT_FOUND
     return wiki_summary
 
 
@@ -157,71 +216,31 @@ def generate_audio_script(book, wiki_summary):
     return audio_script
 
 
-def create_tts_audio(book, audio_script):
+def create_tts_audio(book, audio_script, on_chunk=None):
     try:
-        tts = gTTS(text=audio_script, lang='ko')
-        file_name = f"tts_{book.pk}.mp3"
-        output_dir = Path(settings.MEDIA_ROOT) / "tts"
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_path = output_dir / file_name
-        tts.save(str(output_path))
-        return str(Path("tts") / file_name)
+        return synthesize_script(audio_script, on_chunk=on_chunk)
     except Exception as e:
-        print("gTTS 음성 파일 생성 에러:", e)
+        print("TTS 음성 파일 생성 에러:", e)
         return None
 
 def get_embedding(text):
-    load_dotenv()
-
-    host = 'clovastudio.stream.ntruss.com'
-    api_key = os.getenv('CLOVA_API_KEY')
-    request_id = 'cb74c8fb916a4ebbba73c47fe99e8c83'  # UUID 추천
-
-    headers = {
-        'Content-Type': 'application/json; charset=utf-8',
-        'Authorization': api_key,
-        'X-NCP-CLOVASTUDIO-REQUEST-ID': request_id
-    }
+    return get_embedding_client().embed(text)
 
-    body = { "text": text }
 
-    conn = http.client.HTTPSConnection(host)
-    conn.request('POST', '/testapp/v1/api-tools/embedding/v2', json.dumps(body), headers)
-    response = conn.getresponse()
-    result = json.loads(response.read().decode('utf-8'))
-    conn.close()
+def get_embeddings(texts):
+    return get_embedding_client().embed_many(texts)
 
-    if result['status']['code'] != '20000':
-        raise ValueError(f"Embedding API Error: {result['status']['message']}")
 
-    return np.array(result['result']['embedding'])
-
-
-def recommend_books(target_book, all_books, embedding_fn, top_k):
+def recommend_books(target_book, all_books, vectors, top_k):
     """
     주어진 책을 기준으로 유사한 책 top_k권 추천
+    vectors: {book.pk: 임베딩} (books.embeddings.load_embeddings 결과)
     """
-    vectors = []
-    target_vec = None
-
-    for book in all_books:
-        vec = embedding_fn(book.description)
-
-        if book.pk == target_book.pk:
-            target_vec = vec
-            continue
-
-        vectors.append((book, vec))
-
+    target_vec = vectors.get(target_book.pk)
     if target_vec is None:
         raise ValueError("target_book 벡터가 포함되어 있지 않습니다.")
 
-    similarities = []
-    for book, vec in vectors:
-        if book.pk != target_book.pk:
-            sim = cosine_similarity(target_vec.reshape(1, -1), vec.reshape(1, -1))[0][0]
-            similarities.append((book, sim))
-
-    similarities.sort(key=lambda x: x[1], reverse=True)
-    
-    return similarities[:top_k]
+    books = {book.pk: book for book in all_books}
+    engine = SimilarityMatrix(books.keys(), [vectors[pk] for pk in books])
+    ranked = engine.top_k(target_vec, top_k, exclude=(target_book.pk,))
+    return [(books[pk], score) for pk, score in ranked]
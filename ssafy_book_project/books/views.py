@@ -1,72 +1,136 @@
+import time
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import StreamingHttpResponse
+from django.db import transaction, IntegrityError
+from django.urls import reverse
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from .models import Book, Thread, Category, Comment
+from .models import Book, Thread, Category, Comment, EnrichmentJob, BookRecommendation
 from accounts.models import User
-from django.db.models import Count
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework import status, permissions
-from .utils import (
-    process_wikipedia_info,
-    generate_author_gpt_info,
-    generate_audio_script,
-    create_tts_audio,
-    get_embedding,
-    recommend_books,
-)
+from .utils import recommend_books
+from .jobs import enqueue_enrichment
+from .author_cache import cache_stats
+from .pagination import paginate, ThreadCursorPagination, BaseCursorPagination, CommentCursorPagination
+from .counters import toggle_like, liked_thread_ids
+from .cache import cache_response
+from .recommendations import schedule_recompute
+from .embeddings import load_embeddings, ensure_embedding
+from .ann import search_similar_books
+from .search import SearchIndexNotReady, search_books
+from .hybrid_search import hybrid_search
+from .feed import read_feed
+from .bulk import iter_export_lines
+from .isbn import normalize_isbn
+from mypjt.routers import replica_reads
 
+from rest_framework.utils.urls import replace_query_param
 from drf_spectacular.utils import extend_schema
 from .serializers import(
     ThreadListSerializer,
+    FeedThreadSerializer,
     ThreadSerializer,
     CommentSerializer,
+    CommentDetailSerializer,
     CommentCreateSerializer,
     BookSerializer,
     CategorySerializer,
     BookListSerializer,
     ThreadCreateSerializer,
     RecommendedBookSerializer,
+    EnrichmentJobSerializer,
+    eager_load,
 )
 
-@extend_schema(summary="책 목록 조회", responses=BookListSerializer)
+@extend_schema(summary="책 목록 조회", responses=BookListSerializer(many=True))
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cache_response('books')
 def index(request):
-    books = Book.objects.all()
-    serializer = BookListSerializer(books, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return paginate(request, Book.objects.all(), BookListSerializer)
+
+def existing_book_response(request, book):
+    # 이미 등록된 ISBN이면 새로 만들거나 보강하지 않고 기존 책을 돌려줌
+    return Response(
+        BookSerializer(book).data,
+        status=status.HTTP_200_OK,
+        headers={'Location': request.build_absolute_uri(reverse('books:detail', args=[book.pk]))},
+    )
 
-@extend_schema(summary="책 생성", request=BookSerializer, responses=BookSerializer)
+def find_by_isbn(value):
+    try:
+        isbn = normalize_isbn(value)
+    except ValueError:
+        return None
+    return eager_load(Book.objects.all(), BookSerializer).filter(isbn=isbn).first()
+
+@extend_schema(summary="책 생성", request=BookSerializer, responses={200: BookSerializer, 202: BookSerializer})
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def create(request):
+    book = find_by_isbn(request.data.get('isbn'))
+    if book is not None:
+        return existing_book_response(request, book)
     serializer = BookSerializer(data=request.data)
     if serializer.is_valid(raise_exception=True):
-        book = serializer.save(user=request.user)
-        
-        wiki_summary = process_wikipedia_info(book)
-        author_info, author_works = generate_author_gpt_info(book, wiki_summary)
-        book.author_info = author_info
-        book.author_works = author_works
-        book.save()
-
-        audio_script = generate_audio_script(book, wiki_summary)
-        audio_file_path = create_tts_audio(book, audio_script)
-        if audio_file_path:
-            book.audio_file = audio_file_path
-            book.save()
-
-        return Response(BookSerializer(book).data, status=status.HTTP_201_CREATED)
+        try:
+            with transaction.atomic():
+                book = serializer.save(user=request.user)
+        except IntegrityError:
+            # 검사와 저장 사이에 같은 ISBN이 먼저 저장된 경우
+            book = find_by_isbn(serializer.validated_data['isbn'])
+            if book is None:
+                raise
+            return existing_book_response(request, book)
+        # 위키피디아/GPT/TTS 보강은 백그라운드 job으로 처리하고 바로 응답
+        job = enqueue_enrichment(book)
+        data = BookSerializer(book).data
+        data['enrichment_job'] = job.pk
+        return Response(
+            data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': request.build_absolute_uri(reverse('books:enrichment_status', args=[book.pk]))},
+        )
+
+@extend_schema(summary="책 정보 보강 작업 상태 조회", responses=EnrichmentJobSerializer)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def enrichment_status(request, book_pk):
+    job = EnrichmentJob.objects.filter(book_id=book_pk).order_by('-created_at').first()
+    if job is None:
+        return Response({"detail": "보강 작업이 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+    return Response(EnrichmentJobSerializer(job).data, status=status.HTTP_200_OK)
+
+@extend_schema(summary="작가 정보 캐시 통계", responses={200: None})
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def author_cache_stats(request):
+    return Response(cache_stats(), status=status.HTTP_200_OK)
 
 @extend_schema(summary="책 상세 조회", responses=BookSerializer)
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cache_response('books', 'categories')
 def detail(request, book_pk):
-    book = get_object_or_404(Book, pk=book_pk)
+    book = get_object_or_404(eager_load(Book.objects.all(), BookSerializer), pk=book_pk)
     serializer = BookSerializer(book)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
+@extend_schema(summary="ISBN으로 책 조회 (ISBN-10/13, 하이픈 허용)", responses=BookSerializer)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@cache_response('books', 'categories')
+def book_by_isbn(request, isbn):
+    try:
+        isbn = normalize_isbn(isbn)
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    book = get_object_or_404(eager_load(Book.objects.all(), BookSerializer), isbn=isbn)
+    return Response(BookSerializer(book).data, status=status.HTTP_200_OK)
+
 @extend_schema(summary="책 수정", request=BookSerializer, responses=BookSerializer)
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -88,12 +152,32 @@ def delete(request, book_pk):
         book.delete()
     return Response(status=status.HTTP_200_OK)
 
-@extend_schema(summary="전체 쓰레드 조회", responses=ThreadListSerializer(many=True))
+@extend_schema(summary="책별 쓰레드 조회", responses=ThreadListSerializer(many=True))
 @api_view(['GET'])
-def thread_list(request):
-    threads = Thread.objects.all()
-    serializer = ThreadListSerializer(threads, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+@cache_response('books', 'threads', 'comments')
+def thread_list(request, book_pk):
+    threads = eager_load(Thread.objects.filter(book_id=book_pk), ThreadListSerializer)
+    paginator = ThreadCursorPagination()
+    page = paginator.paginate_queryset(threads, request)
+    serializer = ThreadListSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+@extend_schema(summary="팔로우한 유저들의 최근 쓰레드 (홈 피드)", responses=FeedThreadSerializer(many=True))
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def home_feed(request):
+    paginator = BaseCursorPagination()
+    page_size = paginator.get_page_size(request)
+    try:
+        rows, next_cursor = read_feed(request.user, page_size, request.query_params.get('cursor'))
+    except ValueError:
+        return Response({"detail": "잘못된 커서입니다."}, status=status.HTTP_400_BAD_REQUEST)
+    threads = eager_load(Thread.objects.all(), FeedThreadSerializer).in_bulk([thread_id for thread_id, _ in rows])
+    serializer = FeedThreadSerializer([threads[thread_id] for thread_id, _ in rows if thread_id in threads], many=True)
+    next_url = None
+    if next_cursor:
+        next_url = replace_query_param(request.build_absolute_uri(), paginator.cursor_query_param, next_cursor)
+    return Response({"next": next_url, "previous": None, "results": serializer.data}, status=status.HTTP_200_OK)
 
 @extend_schema(summary="쓰레드 생성", request=ThreadCreateSerializer, responses=ThreadSerializer)
 @api_view(['POST'])
@@ -107,10 +191,27 @@ def create_thread(request, book_pk):
 
 @extend_schema(summary="쓰레드 상세 조회", responses=ThreadSerializer)
 @api_view(['GET'])
+@cache_response('books', 'threads', 'comments')
 def thread_detail(request, book_pk, thread_pk):
-    thread = Thread.objects.annotate(num_of_comments=Count('comments')).get(pk=thread_pk)
-    serializer = ThreadSerializer(thread)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    thread = get_object_or_404(eager_load(Thread.objects.all(), ThreadSerializer), pk=thread_pk)
+    data = ThreadSerializer(thread).data
+    # 댓글은 첫 페이지만, 다음 페이지 링크는 댓글 목록 API를 가리킴
+    paginator = CommentCursorPagination()
+    page = paginator.paginate_queryset(Comment.objects.filter(thread=thread), request)
+    paginator.base_url = request.build_absolute_uri(reverse('books:comment_list', args=[book_pk, thread_pk]))
+    data['comments'] = CommentDetailSerializer(page, many=True).data
+    data['comments_next'] = paginator.get_next_link()
+    return Response(data, status=status.HTTP_200_OK)
+
+@extend_schema(summary="쓰레드 댓글 목록", responses=CommentDetailSerializer(many=True))
+@api_view(['GET'])
+@cache_response('threads', 'comments')
+def comment_list(request, book_pk, thread_pk):
+    get_object_or_404(Thread.objects.only('id'), pk=thread_pk, book_id=book_pk)
+    paginator = CommentCursorPagination()
+    page = paginator.paginate_queryset(Comment.objects.filter(thread_id=thread_pk), request)
+    serializer = CommentDetailSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
 
 @extend_schema(summary="쓰레드 수정", request=ThreadSerializer, responses=ThreadSerializer)
 @api_view(['PUT'])
@@ -140,13 +241,15 @@ def create_comment(request, book_pk, thread_pk):
     thread = get_object_or_404(Thread, pk=thread_pk)
     serializer = CommentCreateSerializer(data=request.data)
     if serializer.is_valid(raise_exception=True):
-        serializer.save(thread=thread, user=request.user)
+        # 댓글 저장과 쓰레드 comment_count 증가를 한 트랜잭션으로
+        with transaction.atomic():
+            serializer.save(thread=thread, user=request.user)
         return Response(CommentSerializer(serializer.instance).data, status=status.HTTP_201_CREATED)
 
 @extend_schema(summary="댓글 상세 조회", responses=CommentSerializer)
 @api_view(['GET'])
 def comment_detail(request, book_pk, thread_pk, comment_pk):
-    comment = get_object_or_404(Comment, pk=comment_pk)
+    comment = get_object_or_404(eager_load(Comment.objects.all(), CommentSerializer), pk=comment_pk)
     serializer = CommentSerializer(comment)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -168,48 +271,168 @@ def update_comment(request, book_pk, thread_pk, comment_pk):
 def delete_comment(request, book_pk, thread_pk, comment_pk):
     comment = get_object_or_404(Comment, pk=comment_pk)
     if request.user == comment.user:
-        comment.delete()
+        with transaction.atomic():
+            comment.delete()
     return Response(status=status.HTTP_200_OK)
 
-# @extend_schema(summary="쓰레드 좋아요/좋아요 취소")
-# @api_view(['POST'])
-# @permission_classes([IsAuthenticated])
-# def thread_like(request, book_pk, thread_pk):
-#     thread = get_object_or_404(Thread, pk=thread_pk)
-#     if thread.likes.filter(id=request.user.id).exists():
-#         thread.likes.remove(request.user)
-#     else:
-#         thread.likes.add(request.user)
-#     return Response(status=status.HTTP_200_OK)
+@extend_schema(summary="쓰레드 좋아요/좋아요 취소", request=None, responses={200: None})
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def thread_like(request, book_pk, thread_pk):
+    get_object_or_404(Thread.objects.only('id'), pk=thread_pk, book_id=book_pk)
+    liked, like_count = toggle_like(thread_pk, request.user.pk)
+    return Response({"liked": liked, "like_count": like_count}, status=status.HTTP_200_OK)
+
+@extend_schema(summary="쓰레드 목록 좋아요 여부 일괄 조회", responses={200: None})
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def thread_like_status(request):
+    try:
+        thread_ids = [int(pk) for pk in request.query_params.get('ids', '').split(',') if pk]
+    except ValueError:
+        return Response({"detail": "ids는 쉼표로 구분한 정수여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+    if len(thread_ids) > 100:
+        return Response({"detail": "한 번에 최대 100개까지 조회할 수 있습니다."}, status=status.HTTP_400_BAD_REQUEST)
+    liked = liked_thread_ids(request.user.pk, thread_ids)
+    return Response({"liked": {str(pk): pk in liked for pk in thread_ids}}, status=status.HTTP_200_OK)
 
 @extend_schema(summary="카테고리 전체 조회", responses=CategorySerializer(many=True))
 @api_view(['GET'])
+@cache_response('categories')
 def category_list(request):
     categories = Category.objects.all()
     serializer = CategorySerializer(categories, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
-@extend_schema(summary="도서 전체 조회", responses=BookSerializer(many=True))
+@extend_schema(summary="도서 검색 (제목/작가/설명/대표작)", responses=BookListSerializer(many=True))
+@api_view(['GET'])
+@cache_response('books')
+def book_search(request):
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({"detail": "검색어(q)를 입력해 주세요."}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        # SQLite의 LIMIT -1은 제한 없음이므로 1 미만은 1로
+        limit = max(1, min(int(request.query_params.get('limit', 20)), settings.SEARCH_MAX_RESULTS))
+    except ValueError:
+        return Response({"detail": "limit는 정수여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        ranked = search_books(query, limit=limit)
+    except SearchIndexNotReady as e:
+        return Response({"detail": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '5'})
+    books = eager_load(Book.objects.all(), BookListSerializer).in_bulk([pk for pk, _ in ranked])
+    results = []
+    for pk, score in ranked:
+        if pk in books:
+            data = BookListSerializer(books[pk]).data
+            data['score'] = round(score, 4)
+            results.append(data)
+    return Response({"query": query, "count": len(results), "results": results}, status=status.HTTP_200_OK)
+
+@extend_schema(summary="도서 하이브리드 검색 (제목/작가 + 주제 유사도)", responses=BookListSerializer(many=True))
+@api_view(['GET'])
+def book_hybrid_search(request):
+    # 검색어 임베딩이 예산 안에 안 오면 lexical 결과만 나가므로 응답 캐시 대신 임베딩 캐시만 사용
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({"detail": "검색어(q)를 입력해 주세요."}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', 20)), settings.SEARCH_MAX_RESULTS))
+    except ValueError:
+        return Response({"detail": "limit는 정수여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+    started = time.perf_counter()
+    ranked, semantic = hybrid_search(query, limit=limit)
+    books = eager_load(Book.objects.all(), BookListSerializer).in_bulk([row['id'] for row in ranked])
+    results = []
+    for row in ranked:
+        if row['id'] in books:
+            data = BookListSerializer(books[row['id']]).data
+            data.update(
+                score=round(row['score'], 6),
+                lexical_rank=row['lexical_rank'],
+                semantic_rank=row['semantic_rank'],
+            )
+            results.append(data)
+    return Response({
+        "query": query,
+        "semantic": semantic,
+        "took_ms": round((time.perf_counter() - started) * 1000, 1),
+        "count": len(results),
+        "results": results,
+    }, status=status.HTTP_200_OK)
+
+@extend_schema(summary="도서 카탈로그 JSON Lines 내보내기", responses={200: None})
 @api_view(['GET'])
+@permission_classes([IsAdminUser])
+def book_export(request):
+    # 한 줄씩 스트리밍 (카탈로그 전체를 메모리에 올리지 않음)
+    response = StreamingHttpResponse(iter_export_lines(), content_type='application/x-ndjson; charset=utf-8')
+    response['Content-Disposition'] = 'attachment; filename="books.jsonl"'
+    return response
+
+@extend_schema(summary="도서 전체 조회 (기본은 목록 필드만, 설명/작가 소개 등은 ?fields= 로 요청)", responses=BookListSerializer(many=True))
+@api_view(['GET'])
+@cache_response('books', 'categories')
 def book_list(request):
-    books = Book.objects.all()
-    serializer = BookSerializer(books, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    # 긴 텍스트 필드는 기본 응답에서 빼고 ?fields=description,author_info 처럼 요청할 때만 포함
+    return paginate(request, Book.objects.all(), BookSerializer, default_fields=BookListSerializer.Meta.fields)
+
+def catalog_neighbors(target_book, k, nprobe=None):
+    """
+    카테고리와 상관없이 ANN 인덱스에서 target_book과 가까운 책 k권
+    """
+    # 임베딩이 없으면 만들어서 저장하므로 책/임베딩 확인은 primary에서
+    # (replica가 늦으면 방금 저장된 임베딩을 못 보고 임베딩 API를 다시 호출하게 됨)
+    with replica_reads(False):
+        target_book = Book.objects.get(pk=target_book.pk)
+        vector = ensure_embedding(target_book).as_array()
+    ranked = search_similar_books(target_book.pk, vector, k, nprobe=nprobe)
+    books = Book.objects.in_bulk([pk for pk, _ in ranked])
+    return [books[pk] for pk, _ in ranked if pk in books]
 
 @api_view(['GET'])
+@cache_response('books', 'categories', 'embeddings', 'recommendations')
 def recommend_book_list(request, book_pk):
     try:
         target_book = Book.objects.get(pk=book_pk)
     except Book.DoesNotExist:
         return Response({"detail": "해당 책을 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
 
-    category_books = list(Book.objects.filter(category=target_book.category))
+    if not target_book.recommendations_dirty:
+        # 미리 계산된 top-k (book_id, rank 인덱스 조회 한 번)
+        precomputed = BookRecommendation.objects.filter(book=target_book).select_related('recommended').order_by('rank')
+        recommended_books = [row.recommended for row in precomputed]
+        if recommended_books:
+            serializer = RecommendedBookSerializer(recommended_books, many=True)
+            return Response({
+                "message": f"{len(recommended_books)}권을 추천합니다.",
+                "recommendations": serializer.data,
+            })
+    # 아직 계산되지 않은 책은 즉석에서 계산하고, 백그라운드 재계산 예약
+    schedule_recompute()
+
+    if target_book.category is None:
+        # 카테고리가 없는 책은 전체 카탈로그에서 추천
+        recommended_books = catalog_neighbors(target_book, k=5)
+        serializer = RecommendedBookSerializer(recommended_books, many=True)
+        return Response({
+            "message": f"전체 도서 중 {len(recommended_books)}권을 추천합니다.",
+            "recommendations": serializer.data,
+        })
+
+    # 없는 임베딩은 계산해서 저장하므로 primary에서 읽음 (catalog_neighbors와 같은 이유)
+    with replica_reads(False):
+        target_book = get_object_or_404(Book, pk=book_pk)
+        category_books = list(Book.objects.filter(category=target_book.category))
+        vectors = load_embeddings(category_books)
     category_count = len(category_books) - 1
 
     recommended = recommend_books(
         target_book=target_book,
         all_books=category_books,
-        embedding_fn=get_embedding,
+        vectors=vectors,
         top_k=5
     )
     recommended_books = [book for book, _ in recommended]
@@ -217,4 +440,24 @@ def recommend_book_list(request, book_pk):
     return Response({
         "message": f"같은 카테고리 내 {category_count}권 중 {len(recommended_books)}권을 추천합니다.",
         "recommendations": serializer.data,
-    })
\ No newline at end of file
+    })
+
+@extend_schema(summary="전체 도서 대상 유사 도서 조회", responses=RecommendedBookSerializer(many=True))
+@api_view(['GET'])
+@cache_response('books', 'embeddings')
+def neighbor_book_list(request, book_pk):
+    target_book = get_object_or_404(Book, pk=book_pk)
+    try:
+        k = max(1, min(int(request.query_params.get('k', 10)), 100))
+        nprobe = request.query_params.get('nprobe')
+        # 위쪽은 인덱스가 nlist로 자름
+        nprobe = max(1, int(nprobe)) if nprobe else None
+    except ValueError:
+        return Response({"detail": "k, nprobe는 정수여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+    recommended_books = catalog_neighbors(target_book, k=k, nprobe=nprobe)
+    serializer = RecommendedBookSerializer(recommended_books, many=True)
+    return Response({
+        "message": f"전체 도서 중 {len(recommended_books)}권을 추천합니다.",
+        "recommendations": serializer.data,
+    })
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mypjt.settings")
 
 application = get_asgi_application()
+
+# 메모리 검색 역색인(FTS5가 없을 때)을 첫 검색 요청 전에 빌드하기 시작
+from books.search import warm_search_backend  # noqa: E402
+
+warm_search_backend()
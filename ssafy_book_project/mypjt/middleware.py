@@ -0,0 +1,26 @@
+from django.conf import settings
+from .routers import replica_alias, replica_reads
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PRIMARY_PIN_COOKIE = 'db_primary_pin'
+
+
+class ReplicaRoutingMiddleware:
+    """
+    GET/HEAD/OPTIONS 요청만 replica에서 읽고, 쓰기 요청은 요청 전체를 primary에 고정
+    쓰기 요청 후 DATABASE_REPLICA_PIN_SECONDS 동안은 같은 클라이언트의 읽기도 primary에서 처리
+    (복제 지연 때문에 방금 쓴 댓글/좋아요가 안 보이는 일이 없게)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        safe = request.method in SAFE_METHODS
+        with replica_reads(safe and PRIMARY_PIN_COOKIE not in request.COOKIES):
+            response = self.get_response(request)
+        if not safe and replica_alias() and settings.DATABASE_REPLICA_PIN_SECONDS:
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE, '1', max_age=settings.DATABASE_REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
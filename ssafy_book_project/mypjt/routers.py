@@ -0,0 +1,49 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# 지금 실행 중인 코드가 replica에서 읽어도 되는지 (ReplicaRoutingMiddleware가 읽기 요청에서만 켬)
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def replica_alias():
+    # 설정된 replica DB 별칭, 없으면 None
+    alias = settings.DATABASE_REPLICA_ALIAS
+    return alias if alias in settings.DATABASES else None
+
+
+def reading_from_replica():
+    # 지금 ORM 조회가 replica로 가는지 (트랜잭션 안이면 primary)
+    return replica_alias() is not None and _replica_reads.get() and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    쓰기는 항상 primary(default), 읽기는 허용된 경우에만 replica
+    - 관리 커맨드, 백그라운드 job 스레드, 쓰기 요청은 replica_reads가 꺼져 있어 primary에서 읽음
+    - primary에서 트랜잭션이 열려 있으면 방금 쓴 행을 봐야 하므로 primary에서 읽음
+    """
+
+    def db_for_read(self, model, **hints):
+        return replica_alias() if reading_from_replica() else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replica는 primary의 복제본이라 어느 쪽에서 불러온 객체든 같은 데이터
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replica 스키마는 복제로 따라옴
+        return db == DEFAULT_DB_ALIAS
@@ -50,6 +50,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "mypjt.middleware.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     # "django.middleware.csrf.CsrfViewMiddleware",
@@ -84,12 +85,66 @@ WSGI_APPLICATION = "mypjt.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# DB_* 환경 변수로 primary(default)를, DB_REPLICA_* 로 읽기 전용 replica를 설정 (없는 값은 DB_* 를 따름)
+# 로컬에서는 SQLite 파일 두 개로 대신할 수 있음:
+#   sqlite3 db.sqlite3 ".backup db_replica.sqlite3" 후 DB_REPLICA_NAME=db_replica.sqlite3
+# 테스트는 mypjt.test_settings가 replica를 SQLite 파일 두 개(test_db.sqlite3, test_db_replica.sqlite3)로 설정
+
+
+def database_settings(prefix, default_name="db.sqlite3"):
+    def env(key, default=None):
+        return os.getenv(f"{prefix}_{key}", os.getenv(f"DB_{key}", default))
+
+    engine = env("ENGINE", "django.db.backends.sqlite3")
+    config = {
+        "ENGINE": engine,
+        "NAME": env("NAME", default_name),
+        # 요청마다 다시 연결하지 않고 재사용, 재사용 전에 끊긴 연결인지 확인
+        "CONN_MAX_AGE": int(env("CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": True,
+    }
+    if engine.endswith("sqlite3"):
+        # SQLite는 파일 경로별로 primary/replica를 구분 (replica 이름은 DB_NAME을 따르지 않음)
+        config["NAME"] = BASE_DIR / os.getenv(f"{prefix}_NAME", default_name)
+        config["TEST"] = {"NAME": BASE_DIR / f"test_{config['NAME'].name}"}
+    for key in ("HOST", "PORT", "USER", "PASSWORD"):
+        if env(key):
+            config[key] = env(key)
+    return config
+
+
 DATABASES = {
+    "default": database_settings("DB"),
+}
+
+
+def replica_settings():
+    config = database_settings("DB_REPLICA", default_name="db_replica.sqlite3")
+    if "TEST" not in config:
+        # 읽기 전용 서버 replica에는 테스트 DB를 만들 수 없으므로 default 테스트 DB를 그대로 사용
+        config["TEST"] = {"MIRROR": "default"}
+    return config
+
+
+DATABASE_REPLICA_ALIAS = None
+if os.getenv("DB_REPLICA_NAME") or os.getenv("DB_REPLICA_HOST"):
+    DATABASE_REPLICA_ALIAS = "replica"
+    DATABASES["replica"] = replica_settings()
+# 쓰기는 primary, 읽기 요청(GET/HEAD/OPTIONS)의 조회만 replica로 (mypjt.middleware.ReplicaRoutingMiddleware)
+DATABASE_ROUTERS = ["mypjt.routers.PrimaryReplicaRouter"]
+DATABASE_REPLICA_PIN_SECONDS = 5  # 쓰기 요청 후 이 시간(초) 동안은 같은 클라이언트의 읽기도 primary에서
+
+
+# Cache
+# 기본은 프로세스 로컬 메모리, 운영에서는 Redis/Memcached 등으로 교체
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "mypjt-default"),
     }
 }
+RESPONSE_CACHE_ALIAS = "default"  # 읽기 API 응답 캐시에 사용할 CACHES 별칭
+RESPONSE_CACHE_TIMEOUT = 60 * 5  # 초 단위, 모델 변경 시에는 버전이 바뀌어 즉시 무효화
 
 
 # Password validation
@@ -130,6 +185,8 @@ STATIC_URL = "/static/"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Django가 직접 미디어 파일을 제공할지 (운영에서는 웹 서버/CDN이 MEDIA_ROOT를 제공)
+SERVE_MEDIA = os.getenv("SERVE_MEDIA", str(DEBUG)).lower() in ("1", "true", "yes")
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
@@ -169,4 +226,63 @@ SPECTACULAR_SETTINGS = {
      # https://www.npmjs.com/package/swagger-ui-dist 해당 링크에서 최신버전을 확인후 취향에 따라 version을 수정해서 사용하세요.
     'SWAGGER_UI_DIST': '//unpkg.com/swagger-ui-dist@3.38.0',  # Swagger UI 버전을 조절할수 있습니다.
     
-}
\ No newline at end of file
+}
+
+# 책 임베딩 설정 (모델이 바뀌면 버전을 올려서 저장된 임베딩을 재계산)
+EMBEDDING_MODEL_VERSION = os.getenv("EMBEDDING_MODEL_VERSION", "clova-embedding-v2")
+CLOVA_API_KEY = os.getenv("CLOVA_API_KEY")
+CLOVA_EMBEDDING_HOST = "clovastudio.stream.ntruss.com"
+CLOVA_EMBEDDING_PATH = "/testapp/v1/api-tools/embedding/v2"
+EMBEDDING_MAX_CONNECTIONS = 8  # 동시 요청 수 (keep-alive 커넥션 풀 크기)
+EMBEDDING_MAX_RETRIES = 4  # 429/5xx 재시도 횟수 (지수 백오프)
+EMBEDDING_ASYNC = True  # 책 저장 커밋 후 백그라운드에서 임베딩 계산 (False면 커밋 직후 같은 스레드에서)
+EMBEDDING_WORKERS = 2
+
+# 전체 카탈로그 근사 최근접 이웃(IVF) 인덱스 설정
+ANN_INDEX_PATH = BASE_DIR / "indexes" / "books_ivf.npz"
+ANN_NPROBE = 8  # 검색할 클러스터 수 (클수록 recall↑ latency↑)
+# True면 책 추가/수정/삭제 때마다 이 프로세스가 인덱스 파일 전체를 다시 씀 (프로세스가 하나일 때만)
+# 기본은 build_ann_index/recompute_recommendations 커맨드만 파일을 저장하고, 각 프로세스는 mtime이 바뀌면 다시 불러옴
+ANN_INDEX_AUTOSAVE = False
+
+# 책 정보 보강(위키피디아/GPT/TTS) 백그라운드 작업 설정
+ENRICHMENT_ASYNC = True  # False면 요청 스레드에서 바로 실행
+ENRICHMENT_WORKERS = 4  # 동시에 처리할 job 수
+ENRICHMENT_STAGE_WORKERS = 8  # job 내부에서 동시에 실행할 단계 수
+ENRICHMENT_MAX_ATTEMPTS = 3  # 실패한 job을 다시 시도하는 최대 횟수 (넘으면 failed)
+ENRICHMENT_RETRY_BACKOFF = 30  # 첫 재시도까지 대기 시간(초), 재시도마다 2배
+ENRICHMENT_STALE_SECONDS = 60 * 10  # running job이 이 시간(초) 동안 단계 갱신이 없으면 워커가 죽은 것으로 보고 되살림
+
+# 작가 정보(위키피디아 요약/사진/GPT 소개) 캐시
+AUTHOR_CACHE_TTL = 60 * 60 * 24 * 30  # 초 단위 (30일)
+AUTHOR_CACHE_MAX_ENTRIES = 5000  # 넘으면 가장 오래 안 쓰인 작가부터 삭제
+
+# TTS 설정 (테스트/벤치마크에서는 books.tts.OfflineTTSBackend 사용 가능)
+TTS_BACKEND = "books.tts.GTTSBackend"
+TTS_BACKEND_OPTIONS = {"lang": "ko"}
+TTS_CHUNK_MAX_CHARS = 200  # 문장 청크 최대 길이
+TTS_WORKERS = 4  # 청크 병렬 합성 수
+
+# 미디어 파일 브라우저 캐시 시간 (초)
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24
+
+# 미리 계산해두는 책별 추천 수
+RECOMMENDATION_TOP_K = 5
+RECOMMENDATION_ASYNC = True  # dirty 책이 생기면 백그라운드에서 재계산
+
+# 도서 검색 역색인: auto(FTS5 테이블이 있으면 FTS5, 없으면 메모리) | fts5 | memory
+SEARCH_BACKEND = "auto"
+SEARCH_BUILD_ASYNC = True  # 메모리 역색인을 백그라운드에서 빌드 (False면 처음 쓰는 스레드에서 바로)
+SEARCH_MAX_RESULTS = 100
+# 하이브리드(lexical + 임베딩) 검색
+SEARCH_LATENCY_BUDGET = 0.8  # 초, 검색어 임베딩이 이 안에 안 오면 lexical 결과만 반환
+SEARCH_CANDIDATES = 50  # RRF로 합치기 전 lexical/벡터 검색 각각의 후보 수
+SEARCH_EMBEDDING_WORKERS = 4
+SEARCH_EMBEDDING_CACHE_ALIAS = "default"
+SEARCH_EMBEDDING_CACHE_TIMEOUT = 60 * 60 * 24  # 같은 검색어 임베딩 재사용 (초)
+
+# 홈 피드 (쓰레드 작성 시 팔로워 타임라인에 기록)
+FEED_FANOUT_MAX_FOLLOWERS = 10000  # 팔로워가 이보다 많으면 쓰기 대신 읽을 때 합침
+FEED_FANOUT_ASYNC = True  # 커밋 후 백그라운드에서 fan-out
+FEED_FANOUT_WORKERS = 2
+FEED_BACKFILL = 50  # 새로 팔로우한 작성자의 최근 쓰레드를 타임라인에 채우는 수
@@ -0,0 +1,9 @@
+"""
+테스트 설정 (python manage.py test --settings=mypjt.test_settings)
+DB_REPLICA_* 환경 변수가 없어도 replica를 켜서 primary/replica 라우팅을 SQLite 파일 두 개로 확인
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, replica_settings
+
+DATABASE_REPLICA_ALIAS = "replica"
+DATABASES = {**DATABASES, "replica": replica_settings()}
@@ -0,0 +1,76 @@
+import tempfile
+from pathlib import Path
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.utils.http import http_date
+from .media import media_urlpatterns, serve_media
+
+
+class ServeMediaTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.content = bytes(range(256)) * 4
+        (Path(tmp.name) / 'tts').mkdir()
+        (Path(tmp.name) / 'tts' / 'audio.mp3').write_bytes(self.content)
+        settings_override = override_settings(MEDIA_ROOT=tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.factory = RequestFactory()
+
+    def get(self, **headers):
+        return serve_media(self.factory.get('/media/tts/audio.mp3', headers=headers), 'tts/audio.mp3')
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_full_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Type'], 'audio/mpeg')
+        self.assertEqual(self.body(response), self.content)
+
+    def test_range_returns_partial_content(self):
+        for header, start, end in (('bytes=10-19', 10, 19), ('bytes=1000-', 1000, 1023), ('bytes=-4', 1020, 1023)):
+            with self.subTest(header=header):
+                response = self.get(range=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/{len(self.content)}')
+                self.assertEqual(response['Content-Length'], str(end - start + 1))
+                self.assertEqual(self.body(response), self.content[start:end + 1])
+
+    def test_unsatisfiable_range_is_416(self):
+        for header in ('bytes=2000-', 'bytes=-0', 'bytes=20-10'):
+            with self.subTest(header=header):
+                response = self.get(range=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_if_range_with_stale_validator_returns_full_file(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(range='bytes=0-9', if_range=etag).status_code, 206)
+        response = self.get(range='bytes=0-9', if_range='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.content)
+
+    def test_conditional_requests_return_304(self):
+        first = self.get()
+        response = self.get(if_none_match=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], first['ETag'])
+        self.assertEqual(self.get(if_modified_since=first['Last-Modified']).status_code, 304)
+        self.assertEqual(self.get(if_none_match='"other"').status_code, 200)
+        self.assertEqual(self.get(if_modified_since=http_date(0)).status_code, 200)
+
+    def test_missing_or_outside_paths_are_404(self):
+        for path in ('tts/missing.mp3', '../secret.txt'):
+            with self.subTest(path=path), self.assertRaises(Http404):
+                serve_media(self.factory.get('/media/' + path), path)
+
+    def test_routed_only_when_serve_media(self):
+        with override_settings(SERVE_MEDIA=False):
+            self.assertEqual(media_urlpatterns(), [])
+        with override_settings(SERVE_MEDIA=True):
+            [pattern] = media_urlpatterns()
+            self.assertIsNotNone(pattern.resolve('media/tts/audio.mp3'))
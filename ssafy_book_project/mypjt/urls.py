@@ -1,8 +1,7 @@
 from django.contrib import admin
 from django.urls import path, include
-from django.conf import settings
-from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from .media import media_urlpatterns
 
 urlpatterns = [
     path("admin/", admin.site.urls),  # 관리자 페이지 URL
@@ -10,5 +9,4 @@ urlpatterns = [
     path("accounts/", include("accounts.urls")),  # accounts 앱의 URL 포함
     path('schema/', SpectacularAPIView.as_view(), name='schema'),
     path('swagger/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
-
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)  # 미디어 파일 제공
+] + media_urlpatterns()  # 미디어 파일 제공 (SERVE_MEDIA일 때만, Range/206, ETag/Last-Modified 지원)